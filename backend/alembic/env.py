@@ -12,7 +12,8 @@ sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
 from app.config import settings
 from app.database import Base
-from app.models import User, Student, Lesson, Payment, AIHomework
+from app.models import User, Student, Lesson, LessonSeries, Payment, AIHomework, WebhookEvent, TelegramDelivery
+from app.services.partitions import is_partition
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -30,6 +31,14 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Partitions are created at runtime (services/partitions.py), not by migrations"""
+    if type_ == "table" and reflected and compare_to is None and is_partition(name):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +62,7 @@ def run_migrations_offline() -> None:
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -75,7 +85,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,26 @@
+"""user data version
+
+Revision ID: 5c2e8f0a4d13
+Revises: a3d9e5b7c21f
+Create Date: 2026-10-19 11:04:27.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f0a4d13'
+down_revision: Union[str, None] = 'a3d9e5b7c21f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
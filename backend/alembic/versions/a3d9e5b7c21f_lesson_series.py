@@ -0,0 +1,51 @@
+"""lesson series
+
+Revision ID: a3d9e5b7c21f
+Revises: f1c37d12a709
+Create Date: 2026-10-19 10:12:41.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e5b7c21f'
+down_revision: Union[str, None] = 'f1c37d12a709'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('lesson_series',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('dtstart', sa.DateTime(), nullable=False),
+    sa.Column('until', sa.DateTime(), nullable=True),
+    sa.Column('rrule', sa.String(length=255), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('exdates', postgresql.ARRAY(sa.DateTime()), nullable=False, server_default='{}'),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lesson_series_user_id'), 'lesson_series', ['user_id'], unique=False)
+    op.add_column('lessons', sa.Column('series_id', sa.UUID(), nullable=True))
+    op.add_column('lessons', sa.Column('original_start', sa.DateTime(), nullable=True))
+    op.create_foreign_key('lessons_series_id_fkey', 'lessons', 'lesson_series', ['series_id'], ['id'], ondelete='SET NULL')
+    op.create_unique_constraint('uq_lessons_series_occurrence', 'lessons', ['series_id', 'original_start'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_lessons_series_occurrence', 'lessons', type_='unique')
+    op.drop_constraint('lessons_series_id_fkey', 'lessons', type_='foreignkey')
+    op.drop_column('lessons', 'original_start')
+    op.drop_column('lessons', 'series_id')
+    op.drop_index(op.f('ix_lesson_series_user_id'), table_name='lesson_series')
+    op.drop_table('lesson_series')
@@ -0,0 +1,35 @@
+"""lesson time range
+
+Revision ID: a9e4b2c7d815
+Revises: f5c1d8e3a270
+Create Date: 2026-10-19 20:26:37.184402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4b2c7d815'
+down_revision: Union[str, None] = 'f5c1d8e3a270'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GiST operator classes for the uuid column of the composite index
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('lessons', sa.Column(
+        'time_range',
+        postgresql.TSRANGE(),
+        sa.Computed("tsrange(datetime_start, datetime_end, '[)')", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_lessons_user_time_range', 'lessons', ['user_id', 'time_range'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lessons_user_time_range', table_name='lessons', postgresql_using='gist')
+    op.drop_column('lessons', 'time_range')
@@ -0,0 +1,165 @@
+"""partition lessons and payments
+
+Revision ID: b6f3a1d8e492
+Revises: a9e4b2c7d815
+Create Date: 2026-10-19 22:41:09.573118
+
+Rebuilds lessons and payments as tables range-partitioned by month
+(services/partitions.py) and copies the rows over. Partitions are created
+from the first month with data to PARTITIONS_AHEAD months from now, plus a
+default partition. The partition key joins the primary keys, the
+payments.lesson_id foreign key is dropped and the series occurrence unique
+constraint becomes a plain index: PostgreSQL does not support them on a
+partitioned table without the partition key.
+
+Downgrade copies the attached partitions back into plain tables; partitions
+moved to the archive schema are left there.
+"""
+from datetime import date
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f3a1d8e492'
+down_revision: Union[str, None] = 'a9e4b2c7d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+# Rows older than this go to the default partition instead of a partition each
+MAX_MONTHS_BACK = 120
+
+LESSON_COLUMNS = [
+    'id', 'user_id', 'student_id', 'datetime_start', 'datetime_end', 'status',
+    'payment_status', 'amount', 'notes', 'series_id', 'original_start',
+]
+PAYMENT_COLUMNS = [
+    'id', 'user_id', 'student_id', 'lesson_id', 'amount', 'payment_method', 'payment_date', 'status',
+]
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_lessons(name: str, primary_key: List[str], **kw) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('datetime_start', sa.DateTime(), nullable=False),
+    sa.Column('datetime_end', sa.DateTime(), nullable=False),
+    sa.Column('time_range', postgresql.TSRANGE(), sa.Computed("tsrange(datetime_start, datetime_end, '[)')", persisted=True), nullable=True),
+    sa.Column('status', postgresql.ENUM('SCHEDULED', 'COMPLETED', 'CANCELLED', 'MISSED', name='lessonstatus', create_type=False), nullable=False),
+    sa.Column('payment_status', postgresql.ENUM('PAID', 'UNPAID', 'PARTIAL', name='paymentstatus', create_type=False), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('series_id', sa.UUID(), nullable=True),
+    sa.Column('original_start', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['series_id'], ['lesson_series.id'], name='lessons_series_id_fkey', ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint(*primary_key, name='lessons_pkey'),
+    **kw
+    )
+
+
+def _create_payments(name: str, primary_key: List[str], **kw) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('lesson_id', sa.UUID(), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('payment_method', postgresql.ENUM('CASH', 'CARD', 'TRANSFER', name='paymentmethod', create_type=False), nullable=False),
+    sa.Column('payment_date', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('COMPLETED', 'PENDING', 'FAILED', name='paymentstatusenum', create_type=False), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint(*primary_key, name='payments_pkey'),
+    **kw
+    )
+
+
+def _create_partitions(table: str, column: str, source: str) -> None:
+    first = op.get_bind().execute(sa.text(f"SELECT min({column}) FROM {source}")).scalar()
+    today = date.today()
+    month = _add_months(today, 0)
+    if first is not None:
+        month = max(min(_add_months(first, 0), month), _add_months(today, -MAX_MONTHS_BACK))
+    last = _add_months(today, PARTITIONS_AHEAD)
+    while month <= last:
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table}"
+            f" FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _set_aside(table: str, suffix: str) -> None:
+    """Rename a table and its primary key out of the way of the new one"""
+    op.rename_table(table, f'{table}_{suffix}')
+    op.execute(f"ALTER TABLE {table}_{suffix} RENAME CONSTRAINT {table}_pkey TO {table}_{suffix}_pkey")
+
+
+def _copy(table: str, source: str, columns: List[str]) -> None:
+    names = ', '.join(columns)
+    op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {source}")
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_lessons_datetime_start'), 'lessons', ['datetime_start'], unique=False)
+    op.create_index('ix_lessons_series_occurrence', 'lessons', ['series_id', 'original_start'], unique=False)
+    op.create_index('ix_lessons_user_start', 'lessons', ['user_id', 'datetime_start'], unique=False)
+    op.create_index('ix_lessons_student_start', 'lessons', ['student_id', 'datetime_start'], unique=False)
+    op.create_index('ix_lessons_user_time_range', 'lessons', ['user_id', 'time_range'], unique=False, postgresql_using='gist')
+    op.create_index(op.f('ix_payments_payment_date'), 'payments', ['payment_date'], unique=False)
+    op.create_index('ix_payments_user_date', 'payments', ['user_id', 'payment_date'], unique=False)
+    op.create_index('ix_payments_student_date', 'payments', ['student_id', 'payment_date'], unique=False)
+    op.create_index(op.f('ix_payments_lesson_id'), 'payments', ['lesson_id'], unique=False)
+
+
+def upgrade() -> None:
+    op.drop_constraint('payments_lesson_id_fkey', 'payments', type_='foreignkey')
+    _set_aside('lessons', 'unpartitioned')
+    _set_aside('payments', 'unpartitioned')
+
+    _create_lessons('lessons', ['id', 'datetime_start'], postgresql_partition_by='RANGE (datetime_start)')
+    _create_payments('payments', ['id', 'payment_date'], postgresql_partition_by='RANGE (payment_date)')
+    _create_partitions('lessons', 'datetime_start', 'lessons_unpartitioned')
+    _create_partitions('payments', 'payment_date', 'payments_unpartitioned')
+
+    _copy('lessons', 'lessons_unpartitioned', LESSON_COLUMNS)
+    _copy('payments', 'payments_unpartitioned', PAYMENT_COLUMNS)
+    op.drop_table('payments_unpartitioned')
+    op.drop_table('lessons_unpartitioned')
+    # Built once over the copied rows; cascades to every partition
+    _create_indexes()
+
+
+def downgrade() -> None:
+    _set_aside('lessons', 'partitioned')
+    _set_aside('payments', 'partitioned')
+
+    _create_lessons('lessons', ['id'])
+    _create_payments('payments', ['id'])
+    _copy('lessons', 'lessons_partitioned', LESSON_COLUMNS)
+    _copy('payments', 'payments_partitioned', PAYMENT_COLUMNS)
+    op.drop_table('payments_partitioned')
+    op.drop_table('lessons_partitioned')
+
+    _create_indexes()
+    op.drop_index('ix_lessons_series_occurrence', table_name='lessons')
+    op.create_unique_constraint('uq_lessons_series_occurrence', 'lessons', ['series_id', 'original_start'])
+    # Lessons may have been archived or deleted without a foreign key in place
+    op.execute(
+        "UPDATE payments SET lesson_id = NULL"
+        " WHERE lesson_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM lessons WHERE lessons.id = payments.lesson_id)"
+    )
+    op.create_foreign_key('payments_lesson_id_fkey', 'payments', 'lessons', ['lesson_id'], ['id'])
@@ -0,0 +1,49 @@
+"""telegram deliveries
+
+Revision ID: c4a7e2d9b631
+Revises: b8d2f6a1c4e9
+Create Date: 2026-10-19 16:40:51.207334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e2d9b631'
+down_revision: Union[str, None] = 'b8d2f6a1c4e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('telegram_deliveries',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('homework_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('chat_id', sa.BigInteger(), nullable=False),
+    sa.Column('chunks', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('sent_chunks', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'SENT', 'DEAD', name='telegramdeliverystatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['homework_id'], ['ai_homework.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_telegram_deliveries_due', 'telegram_deliveries', ['status', 'next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_telegram_deliveries_homework_id'), 'telegram_deliveries', ['homework_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_telegram_deliveries_homework_id'), table_name='telegram_deliveries')
+    op.drop_index('ix_telegram_deliveries_due', table_name='telegram_deliveries')
+    op.drop_table('telegram_deliveries')
+    sa.Enum(name='telegramdeliverystatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""link code expiry
+
+Revision ID: d7b3f9a2e614
+Revises: c4a7e2d9b631
+Create Date: 2026-10-19 18:12:05.418266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3f9a2e614'
+down_revision: Union[str, None] = 'c4a7e2d9b631'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('students', sa.Column('telegram_link_code_expires_at', sa.DateTime(), nullable=True))
+    # Codes issued before expiry existed get one default lifetime from now
+    op.execute(
+        "UPDATE students SET telegram_link_code_expires_at = "
+        "(now() AT TIME ZONE 'utc') + interval '24 hours' "
+        "WHERE telegram_link_code IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('students', 'telegram_link_code_expires_at')
@@ -0,0 +1,29 @@
+"""dashboard indexes
+
+Revision ID: e2a8c5f1b907
+Revises: d7b3f9a2e614
+Create Date: 2026-10-19 19:03:48.751920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a8c5f1b907'
+down_revision: Union[str, None] = 'd7b3f9a2e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_lessons_user_start', 'lessons', ['user_id', 'datetime_start'], unique=False)
+    op.create_index('ix_payments_user_date', 'payments', ['user_id', 'payment_date'], unique=False)
+    op.create_index(op.f('ix_students_user_id'), 'students', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_students_user_id'), table_name='students')
+    op.drop_index('ix_payments_user_date', table_name='payments')
+    op.drop_index('ix_lessons_user_start', table_name='lessons')
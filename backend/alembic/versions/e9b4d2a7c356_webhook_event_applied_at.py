@@ -0,0 +1,31 @@
+"""webhook event applied_at
+
+Revision ID: e9b4d2a7c356
+Revises: b6f3a1d8e492
+Create Date: 2026-10-19 23:18:42.106529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b4d2a7c356'
+down_revision: Union[str, None] = 'b6f3a1d8e492'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_events', sa.Column('applied_at', sa.DateTime(), nullable=True))
+    # Succeeded payments processed so far have been applied; replays must not grant them again
+    op.execute(
+        "UPDATE webhook_events SET applied_at = processed_at "
+        "WHERE status = 'DONE' AND event_type = 'payment.succeeded'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('webhook_events', 'applied_at')
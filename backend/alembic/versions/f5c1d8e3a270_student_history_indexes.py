@@ -0,0 +1,31 @@
+"""student history indexes
+
+Revision ID: f5c1d8e3a270
+Revises: e2a8c5f1b907
+Create Date: 2026-10-19 19:41:12.306589
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c1d8e3a270'
+down_revision: Union[str, None] = 'e2a8c5f1b907'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_lessons_student_start', 'lessons', ['student_id', 'datetime_start'], unique=False)
+    op.create_index('ix_payments_student_date', 'payments', ['student_id', 'payment_date'], unique=False)
+    op.create_index(op.f('ix_payments_lesson_id'), 'payments', ['lesson_id'], unique=False)
+    op.create_index('ix_ai_homework_student_created', 'ai_homework', ['student_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_homework_student_created', table_name='ai_homework')
+    op.drop_index(op.f('ix_payments_lesson_id'), table_name='payments')
+    op.drop_index('ix_payments_student_date', table_name='payments')
+    op.drop_index('ix_lessons_student_start', table_name='lessons')
@@ -1,11 +1,33 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas; sessions on them are handed out by utils.read_replicas.get_read_db
+replica_engines = [
+    create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        # A standby being restarted or promoted drops its connections
+        pool_pre_ping=True,
+    )
+    for url in settings.REPLICA_URLS
+]
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Connections of utils.leader_lock, outside the request pool: the leader holds
+# one for the life of the process, the other workers open one per attempt
+lock_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
 Base = declarative_base()
 
 
@@ -1,39 +1,92 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi.exceptions import RequestValidationError
 
 from .config import settings
-from .database import engine, Base
-from .middleware import SecurityHeadersMiddleware, RateLimitMiddleware
+from .database import engine, replica_engines
+from .middleware import (
+    SecurityHeadersMiddleware,
+    RateLimitMiddleware,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    RequestIdMiddleware
+)
 from .middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
     sqlalchemy_exception_handler,
     general_exception_handler
 )
-from .utils.logging_config import setup_logging
+from .utils.logging_config import setup_logging, stop_logging
+from .utils.fast_json import FastJSONResponse
+from .utils.password_hashing import password_hasher
+from .services.ai_generator import close_clients
+from .services import yukassa, webhook_inbox, telegram, telegram_outbox, partitions
+from .warmup import warm_up
+from .utils.metrics import init_worker_metrics
+from .utils.read_replicas import lag_worker
 from .routers import (
     auth_router,
     students_router,
     lessons_router,
+    lesson_series_router,
     payments_router,
     homework_router,
-    subscription_router
+    subscription_router,
+    imports_router,
+    metrics_router,
+    telegram_bot_router,
+    dashboard_router
 )
 
-# Setup centralized logging
+# Setup centralized logging (writes happen on a background thread)
 setup_logging(
-    log_level="INFO",
-    log_file=None  # Set to a path like "/var/log/tutorai-crm/app.log" for file logging
+    log_level=settings.LOG_LEVEL,
+    log_file=settings.LOG_FILE,  # e.g. "/var/log/tutorai-crm/app.log" for file logging
+    json_format=settings.LOG_FORMAT == "json"
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are managed by Alembic migrations (alembic upgrade head)
+    init_worker_metrics()
+    if settings.WARM_UP_ON_STARTUP:
+        await run_in_threadpool(warm_up)
+    if settings.PARTITION_MAINTENANCE_ON_STARTUP:
+        await run_in_threadpool(partitions.run_startup_maintenance)
+    if settings.BILLING_ENABLED and settings.WEBHOOK_WORKER_ENABLED:
+        webhook_inbox.inbox_worker.start()
+    if settings.TELEGRAM_ENABLED and settings.TELEGRAM_WORKER_ENABLED:
+        telegram_outbox.outbox_worker.start()
+    if replica_engines:
+        lag_worker.start()
+    yield
+    # The server has drained in-flight requests by now (see gunicorn.conf.py)
+    await webhook_inbox.inbox_worker.stop()
+    await telegram_outbox.stop_worker()
+    await lag_worker.stop()
+    password_hasher.shutdown()
+    close_clients()
+    await yukassa.close_client()
+    await telegram.close_client()
+    engine.dispose()
+    for replica_engine in replica_engines:
+        replica_engine.dispose()
+    stop_logging()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="TutorAI CRM API",
     description="API for TutorAI CRM - AI-powered homework generator for tutors",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Register global exception handlers
@@ -60,13 +113,34 @@ app.add_middleware(SecurityHeadersMiddleware)
 # Add rate limiting
 app.add_middleware(RateLimitMiddleware)
 
+# SQL statement counts per request (debug headers / budget warnings)
+if settings.SQL_DEBUG_HEADERS or settings.SQL_QUERY_BUDGET:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        debug_headers=settings.SQL_DEBUG_HEADERS,
+        budget=settings.SQL_QUERY_BUDGET,
+    )
+
+# Request metrics (so rate limit rejections are measured too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Request id for logs (outermost, so every record of a request carries it)
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(students_router)
 app.include_router(lessons_router)
+app.include_router(lesson_series_router)
 app.include_router(payments_router)
 app.include_router(homework_router)
 app.include_router(subscription_router)
+app.include_router(imports_router)
+app.include_router(telegram_bot_router)
+app.include_router(dashboard_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -100,10 +174,3 @@ def get_features():
         "ai_proxy_enabled": bool(settings.OPENAI_PROXY),
     }
 
-
-# Create tables on startup (for development only)
-# In production, use Alembic migrations
-@app.on_event("startup")
-def startup():
-    # Base.metadata.create_all(bind=engine)
-    pass
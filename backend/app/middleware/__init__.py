@@ -1,4 +1,13 @@
 from .security_headers import SecurityHeadersMiddleware
 from .rate_limit import RateLimitMiddleware
+from .metrics import MetricsMiddleware
+from .query_stats import QueryStatsMiddleware
+from .request_id import RequestIdMiddleware
 
-__all__ = ["SecurityHeadersMiddleware", "RateLimitMiddleware"]
+__all__ = [
+    "SecurityHeadersMiddleware",
+    "RateLimitMiddleware",
+    "MetricsMiddleware",
+    "QueryStatsMiddleware",
+    "RequestIdMiddleware",
+]
@@ -4,7 +4,7 @@ Global error handlers for the application.
 import logging
 import traceback
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.exc import SQLAlchemyError
@@ -13,8 +13,12 @@ from pydantic import ValidationError
 logger = logging.getLogger(__name__)
 
 
-async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
     """Handle HTTP exceptions."""
+    # 304 Not Modified / 204 No Content must not carry a body
+    if exc.status_code in (status.HTTP_204_NO_CONTENT, status.HTTP_304_NOT_MODIFIED):
+        return Response(status_code=exc.status_code, headers=getattr(exc, "headers", None))
+
     logger.warning(
         f"HTTP {exc.status_code}: {exc.detail} - Path: {request.url.path} - Method: {request.method}"
     )
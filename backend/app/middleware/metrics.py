@@ -0,0 +1,62 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils.metrics import (
+    HTTP_REQUEST_DB_DURATION,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    ensure_request_stats,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_label(scope: Scope) -> str:
+    """Route template (/api/lessons/{lesson_id}) rather than the raw path, to bound label cardinality"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, openapi.json) have fixed paths
+    if scope.get("endpoint") is not None:
+        return scope["path"]
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency, in-flight requests and
+    per-request SQL statistics (see utils.metrics).
+
+    Added last so it wraps every other middleware, including rate limit rejections.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = ensure_request_stats()
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = _route_label(scope)
+            HTTP_REQUEST_DURATION.labels(method, route, str(status_code)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(stats.db_queries)
+            HTTP_REQUEST_DB_DURATION.labels(route).observe(stats.db_seconds)
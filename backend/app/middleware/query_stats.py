@@ -0,0 +1,46 @@
+import logging
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..utils.metrics import ensure_request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Per-request SQL statistics for catching N+1 and round-trip regressions.
+
+    - debug_headers: adds X-DB-Queries and Server-Timing (db;dur=<ms>) to every
+      response, so tests and the browser devtools can read them
+    - budget: logs a warning when a request runs more statements than this (0 disables)
+
+    Statements are counted by the engine events in utils.metrics; the response
+    starts after the handler and its dependencies have finished their queries.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False, budget: int = 0):
+        self.app = app
+        self.debug_headers = debug_headers
+        self.budget = budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = ensure_request_stats()
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                if self.budget and stats.db_queries > self.budget:
+                    logger.warning(
+                        f"{scope['method']} {scope['path']} ran {stats.db_queries} SQL queries "
+                        f"in {stats.db_seconds * 1000:.1f} ms (budget {self.budget})"
+                    )
+                if self.debug_headers:
+                    message["headers"] = list(message.get("headers", ())) + [
+                        (b"x-db-queries", str(stats.db_queries).encode()),
+                        (b"server-timing", f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"'.encode()),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_stats)
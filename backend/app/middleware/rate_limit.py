@@ -1,123 +1,133 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Dict, Tuple
-import asyncio
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+from jose import JWTError, jwt
+from ..config import settings
+from ..utils.rate_limiter import (
+    RateLimiter,
+    RateLimitRule,
+    InMemoryRateLimitBackend,
+    RedisRateLimitBackend,
+)
+from ..utils.redis_client import get_async_redis
+from ..utils.metrics import record_rate_limit_rejection
+
+# Default limits per route group; override with RATE_LIMITS in .env, e.g.
+# RATE_LIMITS='{"general": {"ip_limit": 200, "user_limit": 600}}'
+DEFAULT_RULES = (
+    # Auth endpoints: stricter limits
+    RateLimitRule("auth", ("/api/auth/login", "/api/auth/register"), window=60, ip_limit=5),
+    # AI homework generation: moderate limits
+    RateLimitRule("ai_homework", ("/api/homework/generate",), window=60, ip_limit=10, user_limit=10),
+    # Default category (catch-all, must be last)
+    RateLimitRule("general", ("/",), window=60, ip_limit=100, user_limit=300),
+)
+
+
+def build_rules() -> Tuple[RateLimitRule, ...]:
+    """Default rules with per-rule overrides from settings applied"""
+    rules = []
+    for rule in DEFAULT_RULES:
+        override = settings.RATE_LIMITS.get(rule.name, {})
+        rules.append(RateLimitRule(
+            name=rule.name,
+            path_prefixes=rule.path_prefixes,
+            window=override.get("window", rule.window),
+            ip_limit=override.get("ip_limit", rule.ip_limit),
+            user_limit=override.get("user_limit", rule.user_limit),
+        ))
+    return tuple(rules)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter; rejections are exported as rate_limit_rejections_total"""
+    local = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    client = get_async_redis()
+    if client is None:
+        return RateLimiter(build_rules(), local, on_rejection=record_rate_limit_rejection)
+    return RateLimiter(
+        build_rules(),
+        RedisRateLimitBackend(client),
+        fallback=local,
+        on_rejection=record_rate_limit_rejection,
+    )
+
+
+def _user_id_from_token(scope: Scope) -> Optional[str]:
+    """User id from the bearer token without touching the database; None if absent/invalid"""
+    authorization = b""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            authorization = value
+            break
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+class RateLimitMiddleware:
     """
-    Simple in-memory rate limiting middleware.
-
-    Limits:
-    - General: 100 requests per minute per IP
-    - Auth endpoints: 5 requests per minute per IP
-    - AI homework: 10 requests per minute per IP
+    Pure ASGI rate limiting middleware (sliding window counter, O(1) per request).
 
-    Each endpoint type has independent rate limits.
-
-    Note: For production with multiple workers, consider using Redis for shared state.
+    Limits are configured per route group, per IP and per authenticated user
+    (see DEFAULT_RULES). State is per process unless REDIS_URL is set, in which
+    case all workers share counters. Rejections are exported via /metrics.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        # Format: {ip: [(timestamp, endpoint_type), ...]}
-        self.request_history: Dict[str, list] = defaultdict(list)
-        # Clean up old entries every 5 minutes
-        asyncio.create_task(self._cleanup_task())
-
-    async def _cleanup_task(self):
-        """Background task to clean up old request history"""
-        while True:
-            await asyncio.sleep(300)  # 5 minutes
-            cutoff = datetime.now() - timedelta(minutes=5)
-            for ip in list(self.request_history.keys()):
-                self.request_history[ip] = [
-                    (ts, endpoint_type) for ts, endpoint_type in self.request_history[ip]
-                    if ts > cutoff
-                ]
-                if not self.request_history[ip]:
-                    del self.request_history[ip]
-
-    def _get_endpoint_type(self, path: str) -> str:
-        """
-        Determine endpoint type for rate limiting categories.
-
-        Returns: endpoint_type string
-        """
-        # Auth endpoints: stricter limits
-        if "/api/auth/login" in path or "/api/auth/register" in path:
-            return "auth"
-
-        # AI homework generation: moderate limits
-        if "/api/homework/generate" in path:
-            return "ai_homework"
-
-        # Default category
-        return "general"
-
-    def _get_rate_limits(self, endpoint_type: str) -> Tuple[int, int]:
-        """
-        Get rate limit for specific endpoint type.
-
-        Returns: (max_requests, window_seconds)
-        """
-        limits = {
-            "auth": (5, 60),       # 5 per minute
-            "ai_homework": (10, 60),  # 10 per minute
-            "general": (100, 60)   # 100 per minute
-        }
-        return limits.get(endpoint_type, (100, 60))
-
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
-        path = request.url.path
-
-        # Determine endpoint type
-        endpoint_type = self._get_endpoint_type(path)
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or get_rate_limiter()
 
-        # Get rate limits for this endpoint type
-        max_requests, window_seconds = self._get_rate_limits(endpoint_type)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
 
-        # Clean up old requests (outside the time window)
-        cutoff = datetime.now() - timedelta(seconds=window_seconds)
-        self.request_history[client_ip] = [
-            (ts, ep_type) for ts, ep_type in self.request_history[client_ip]
-            if ts > cutoff
-        ]
+        # Get client IP
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        user_id = _user_id_from_token(scope)
 
-        # Count recent requests ONLY for this endpoint type
-        recent_requests = sum(
-            1 for ts, ep_type in self.request_history[client_ip]
-            if ep_type == endpoint_type
-        )
+        rule, result = await self.limiter.check(scope["path"], client_ip, user_id)
 
         # Check if rate limit exceeded
-        if recent_requests >= max_requests:
-            return JSONResponse(
+        if not result.allowed:
+            response = JSONResponse(
                 status_code=429,
                 content={
-                    "detail": f"Rate limit exceeded. Maximum {max_requests} requests per {window_seconds} seconds."
+                    "detail": f"Rate limit exceeded. Maximum {result.limit} requests per {rule.window} seconds."
                 },
                 headers={
-                    "Retry-After": str(window_seconds),
-                    "X-RateLimit-Limit": str(max_requests),
+                    "Retry-After": str(result.reset_after),
+                    "X-RateLimit-Limit": str(result.limit),
                     "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int((cutoff + timedelta(seconds=window_seconds)).timestamp()))
+                    "X-RateLimit-Reset": str(int(time.time()) + result.reset_after),
                 }
             )
+            await response(scope, receive, send)
+            return
 
-        # Record this request with its endpoint type
-        self.request_history[client_ip].append((datetime.now(), endpoint_type))
-
-        # Process request
-        response = await call_next(request)
+        if not result.limit:
+            await self.app(scope, receive, send)
+            return
 
         # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(max_requests - recent_requests - 1)
+        limit_headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + limit_headers
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_headers)
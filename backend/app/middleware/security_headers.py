@@ -1,63 +1,87 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, RedirectResponse
+from typing import List, Optional, Tuple
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from ..config import settings
 
+Header = Tuple[bytes, bytes]
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+SECURITY_HEADERS: List[Header] = [
+    # Prevent MIME type sniffing
+    (b"x-content-type-options", b"nosniff"),
+    # Prevent clickjacking
+    (b"x-frame-options", b"DENY"),
+    # Enable XSS protection (legacy browsers)
+    (b"x-xss-protection", b"1; mode=block"),
+    # Content Security Policy (basic policy)
+    (
+        b"content-security-policy",
+        b"default-src 'self'; "
+        b"script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+        b"style-src 'self' 'unsafe-inline'; "
+        b"img-src 'self' data: https:; "
+        b"font-src 'self' data:; "
+        b"connect-src 'self'",
+    ),
+    # Referrer Policy
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Permissions Policy (formerly Feature-Policy)
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+]
+
+# HSTS: max-age=31536000 (1 year), includeSubDomains, preload - only for HTTPS
+HSTS_HEADER: Header = (b"strict-transport-security", b"max-age=31536000; includeSubDomains; preload")
+
+
+def _is_https(scope: Scope) -> bool:
+    if scope.get("scheme") == "https":
+        return True
+    # Behind a proxy (X-Forwarded-Proto header)
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-proto":
+            return value == b"https"
+    return False
+
+
+class SecurityHeadersMiddleware:
     """
-    Middleware to add security headers to all responses.
+    Pure ASGI middleware that adds security headers to all responses.
     Includes HTTPS enforcement and HSTS.
+
+    Header byte pairs are precomputed once and injected into
+    http.response.start; body messages (streaming, SSE) pass through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # HTTPS enforcement: redirect HTTP to HTTPS in production
-        # Check if we're behind a proxy (X-Forwarded-Proto header)
-        forwarded_proto = request.headers.get("X-Forwarded-Proto", "")
-        is_https = request.url.scheme == "https" or forwarded_proto == "https"
-        
+    def __init__(self, app: ASGIApp, enforce_https: Optional[bool] = None):
+        self.app = app
         # Only enforce HTTPS in production (when FRONTEND_URL uses https)
-        enforce_https = settings.FRONTEND_URL.startswith("https://")
-        
-        if enforce_https and not is_https:
-            # Redirect to HTTPS
-            https_url = str(request.url).replace("http://", "https://", 1)
-            return RedirectResponse(url=https_url, status_code=301)
-
-        response: Response = await call_next(request)
-
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Enable XSS protection (legacy browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Content Security Policy (basic policy)
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self' data:; "
-            "connect-src 'self'"
-        )
-
-        # Referrer Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Permissions Policy (formerly Feature-Policy)
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(), camera=()"
-        )
-
-        # HSTS (HTTP Strict Transport Security) - only for HTTPS
-        if is_https or enforce_https:
-            # HSTS: max-age=31536000 (1 year), includeSubDomains, preload
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains; preload"
-            )
-
-        return response
+        if enforce_https is None:
+            enforce_https = settings.FRONTEND_URL.startswith("https://")
+        self.enforce_https = enforce_https
+        self.headers = SECURITY_HEADERS
+        self.https_headers = SECURITY_HEADERS + [HSTS_HEADER]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        is_https = _is_https(scope)
+
+        if self.enforce_https and not is_https:
+            # Redirect HTTP to HTTPS
+            https_url = URL(scope=scope).replace(scheme="https")
+            await RedirectResponse(url=str(https_url), status_code=301)(scope, receive, send)
+            return
+
+        extra_headers = self.https_headers if is_https or self.enforce_https else self.headers
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                present = {name.lower() for name, _ in headers}
+                headers.extend(header for header in extra_headers if header[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
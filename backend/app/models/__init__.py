@@ -1,7 +1,10 @@
 from .user import User
 from .student import Student
 from .lesson import Lesson
+from .lesson_series import LessonSeries
 from .payment import Payment
 from .homework import AIHomework
+from .webhook_event import WebhookEvent
+from .telegram_delivery import TelegramDelivery
 
-__all__ = ["User", "Student", "Lesson", "Payment", "AIHomework"]
+__all__ = ["User", "Student", "Lesson", "LessonSeries", "Payment", "AIHomework", "WebhookEvent", "TelegramDelivery"]
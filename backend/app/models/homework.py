@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -16,6 +16,10 @@ class DifficultyLevel(str, enum.Enum):
 
 class AIHomework(Base):
     __tablename__ = "ai_homework"
+    __table_args__ = (
+        # One student's history (profile)
+        Index("ix_ai_homework_student_created", "student_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, Enum as SQLEnum, DateTime, ForeignKey, Numeric
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, Text, Enum as SQLEnum, DateTime, ForeignKey, Numeric, Index
+from sqlalchemy.dialects.postgresql import TSRANGE, UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -21,13 +21,33 @@ class PaymentStatus(str, enum.Enum):
 
 
 class Lesson(Base):
+    """
+    Range-partitioned by month of datetime_start (services/partitions.py).
+
+    The partition key has to be part of every unique constraint, so the table
+    primary key is (id, datetime_start) while the mapper identifies rows by id
+    alone; payments.lesson_id cannot have a foreign key to it. A series
+    occurrence is unique through its deterministic id (occurrence_id), which
+    is inserted with datetime_start = original_start.
+    """
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_series_occurrence", "series_id", "original_start"),
+        # Per-user date ranges (calendar, dashboard)
+        Index("ix_lessons_user_start", "user_id", "datetime_start"),
+        # One student's history (profile)
+        Index("ix_lessons_student_start", "student_id", "datetime_start"),
+        # Overlap checks and free slots (services/scheduling.py); needs btree_gist
+        Index("ix_lessons_user_time_range", "user_id", "time_range", postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (datetime_start)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
-    datetime_start = Column(DateTime, nullable=False, index=True)
+    datetime_start = Column(DateTime, primary_key=True, index=True)
     datetime_end = Column(DateTime, nullable=False)
+    time_range = Column(TSRANGE, Computed("tsrange(datetime_start, datetime_end, '[)')", persisted=True))
     status = Column(
         SQLEnum(LessonStatus),
         default=LessonStatus.SCHEDULED,
@@ -40,8 +60,14 @@ class Lesson(Base):
     )
     amount = Column(Numeric(10, 2))
     notes = Column(Text)
+    # Set when the lesson is a materialized occurrence of a LessonSeries
+    series_id = Column(UUID(as_uuid=True), ForeignKey("lesson_series.id", ondelete="SET NULL"), nullable=True)
+    original_start = Column(DateTime, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="lessons")
     student = relationship("Student", back_populates="lessons")
-    payments = relationship("Payment", back_populates="lesson")
+    series = relationship("LessonSeries", back_populates="lessons")
+    payments = relationship("Payment", back_populates="lesson", primaryjoin="Lesson.id == foreign(Payment.lesson_id)")
+
+    __mapper_args__ = {"primary_key": [id]}
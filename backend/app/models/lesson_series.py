@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Numeric
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+import uuid
+from ..database import Base
+
+
+class LessonSeries(Base):
+    """
+    Recurring lesson schedule.
+
+    Occurrences are expanded lazily for the requested calendar window and
+    become real Lesson rows (series_id + original_start) only when they are
+    completed, paid or edited.
+    """
+    __tablename__ = "lesson_series"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
+    dtstart = Column(DateTime, nullable=False)
+    # Cached upper bound of the last occurrence (from UNTIL/COUNT), NULL for open-ended series
+    until = Column(DateTime, nullable=True)
+    rrule = Column(String(255), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    amount = Column(Numeric(10, 2))
+    notes = Column(Text)
+    # Cancelled occurrences (original start datetimes)
+    exdates = Column(ARRAY(DateTime), nullable=False, default=list)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    user = relationship("User", back_populates="lesson_series")
+    student = relationship("Student", back_populates="lesson_series")
+    lessons = relationship("Lesson", back_populates="series")
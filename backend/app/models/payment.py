@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Enum as SQLEnum, ForeignKey, Numeric
+from sqlalchemy import Column, Date, Enum as SQLEnum, ForeignKey, Index, Numeric
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -19,15 +19,24 @@ class PaymentStatusEnum(str, enum.Enum):
 
 
 class Payment(Base):
+    """Range-partitioned by month of payment_date; primary key (id, payment_date), see Lesson"""
     __tablename__ = "payments"
+    __table_args__ = (
+        # Per-user date ranges (monthly income)
+        Index("ix_payments_user_date", "user_id", "payment_date"),
+        # One student's history (profile)
+        Index("ix_payments_student_date", "student_id", "payment_date"),
+        {"postgresql_partition_by": "RANGE (payment_date)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
-    lesson_id = Column(UUID(as_uuid=True), ForeignKey("lessons.id"), nullable=True)
+    # No foreign key: lessons is partitioned (checked by the endpoints that set it)
+    lesson_id = Column(UUID(as_uuid=True), nullable=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
     payment_method = Column(SQLEnum(PaymentMethod), nullable=False)
-    payment_date = Column(Date, nullable=False, index=True)
+    payment_date = Column(Date, primary_key=True, index=True)
     status = Column(
         SQLEnum(PaymentStatusEnum),
         default=PaymentStatusEnum.COMPLETED,
@@ -37,4 +46,6 @@ class Payment(Base):
     # Relationships
     user = relationship("User", back_populates="payments")
     student = relationship("Student", back_populates="payments")
-    lesson = relationship("Lesson", back_populates="payments")
+    lesson = relationship("Lesson", back_populates="payments", primaryjoin="foreign(Payment.lesson_id) == Lesson.id")
+
+    __mapper_args__ = {"primary_key": [id]}
@@ -18,11 +18,12 @@ class Student(Base):
     __tablename__ = "students"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     phone = Column(String(20))
     telegram_id = Column(BigInteger, unique=True, index=True)
     telegram_link_code = Column(String(6), unique=True, index=True)
+    telegram_link_code_expires_at = Column(DateTime)
     parent_name = Column(String(100))
     parent_phone = Column(String(20))
     subject = Column(String(50), nullable=False)
@@ -33,5 +34,6 @@ class Student(Base):
     # Relationships
     user = relationship("User", back_populates="students")
     lessons = relationship("Lesson", back_populates="student", cascade="all, delete-orphan")
+    lesson_series = relationship("LessonSeries", back_populates="student", cascade="all, delete-orphan")
     payments = relationship("Payment", back_populates="student", cascade="all, delete-orphan")
     ai_homeworks = relationship("AIHomework", back_populates="student", cascade="all, delete-orphan")
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, BigInteger, Text, DateTime, Enum as SQLEnum, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime, timezone
+import uuid
+import enum
+from ..database import Base
+
+
+class TelegramDeliveryStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class TelegramDelivery(Base):
+    """
+    Outbound queue of worksheets sent to students' Telegram chats.
+
+    One row per homework and recipient; the rendered messages are stored in
+    chunks and sent in order, sent_chunks recording progress so a retry resumes
+    after the last delivered message. Processed by services/telegram_outbox.py.
+    """
+    __tablename__ = "telegram_deliveries"
+    __table_args__ = (
+        Index("ix_telegram_deliveries_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    homework_id = Column(UUID(as_uuid=True), ForeignKey("ai_homework.id", ondelete="CASCADE"), nullable=False, index=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    chat_id = Column(BigInteger, nullable=False)
+    chunks = Column(JSONB, nullable=False)
+    sent_chunks = Column(Integer, default=0, nullable=False)
+    status = Column(SQLEnum(TelegramDeliveryStatus), default=TelegramDeliveryStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # When a PENDING row is due; for PROCESSING rows, when the claim expires
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    sent_at = Column(DateTime)
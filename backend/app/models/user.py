@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, String, Integer, BigInteger, Enum as SQLEnum, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -29,9 +29,12 @@ class User(Base):
     ai_credits_left = Column(Integer, default=10, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     last_login = Column(DateTime)
+    # Incremented on every write to the user's data; used for ETag / 304 responses
+    data_version = Column(BigInteger, default=0, server_default="0", nullable=False)
 
     # Relationships
     students = relationship("Student", back_populates="user", cascade="all, delete-orphan")
     lessons = relationship("Lesson", back_populates="user", cascade="all, delete-orphan")
+    lesson_series = relationship("LessonSeries", back_populates="user", cascade="all, delete-orphan")
     payments = relationship("Payment", back_populates="user", cascade="all, delete-orphan")
     ai_homeworks = relationship("AIHomework", back_populates="user", cascade="all, delete-orphan")
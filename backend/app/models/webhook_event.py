@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum as SQLEnum, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime, timezone
+import uuid
+import enum
+from ..database import Base
+
+
+class WebhookEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    DEAD = "dead"
+
+
+class WebhookEvent(Base):
+    """
+    Inbox of received YooKassa webhook deliveries.
+
+    A delivery is stored once per (payment_id, event_type); repeated deliveries
+    of the same event are acknowledged without being stored again. The
+    background worker (services/webhook_inbox.py) claims due rows, verifies and
+    applies them, and moves rows that keep failing to DEAD. applied_at is set
+    when a succeeded payment has been applied, so a replayed or reclaimed
+    event never grants the subscription twice.
+    """
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        UniqueConstraint("payment_id", "event_type", name="uq_webhook_events_payment_event"),
+        Index("ix_webhook_events_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    payment_id = Column(String(64), nullable=False)
+    event_type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(SQLEnum(WebhookEventStatus), default=WebhookEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # When a PENDING row is due; for PROCESSING rows, when the claim expires
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text)
+    received_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    processed_at = Column(DateTime)
+    applied_at = Column(DateTime)
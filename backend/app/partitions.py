@@ -0,0 +1,41 @@
+"""
+Create upcoming monthly partitions of lessons and payments and archive old ones.
+
+The app does the same on startup (PARTITION_MAINTENANCE_ON_STARTUP); run this
+from cron for long-lived workers, e.g. on the first day of every month.
+--archive-before detaches every month before the given one into the archive
+schema; archived rows no longer count towards debts and stats.
+
+Run from backend/:
+    python -m app.partitions
+    python -m app.partitions --months-ahead 6
+    python -m app.partitions --archive-before 2024-01
+"""
+import argparse
+from datetime import date, datetime
+from .config import settings
+from .database import SessionLocal
+from .services.partitions import archive_partitions, ensure_partitions
+
+
+def _month(value: str) -> date:
+    """YYYY-MM"""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--archive-before", type=_month, default=None, help="first month to keep (YYYY-MM)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        created = ensure_partitions(db, date.today(), args.months_ahead)
+        archived = archive_partitions(db, args.archive_before) if args.archive_before else []
+        db.commit()
+    print(f"{len(created)} partition(s) created: {', '.join(created) or '-'}")
+    print(f"{len(archived)} partition(s) archived: {', '.join(archived) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Put YooKassa webhook events of a time range back into the inbox queue.
+
+By default only dead-lettered events are replayed; --status done verifies
+already processed events again. A payment that was applied once is not
+applied again, so replaying never grants AI credits twice.
+The running app workers pick the events up on their next poll.
+
+Run from backend/:
+    python -m app.replay_webhooks --since 2026-10-01T00:00 --until 2026-10-02T00:00
+    python -m app.replay_webhooks --since 2026-10-01 --status dead --status done --dry-run
+"""
+import argparse
+from datetime import datetime, timezone
+from sqlalchemy import func
+from .database import SessionLocal
+from .models import WebhookEvent
+from .models.webhook_event import WebhookEventStatus
+from .services.webhook_inbox import replay_events
+from .utils.clock import utcnow
+
+
+def _utc(value: str) -> datetime:
+    """ISO 8601 date/datetime; naive values are taken as UTC"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--since", type=_utc, required=True, help="received at or after (UTC)")
+    parser.add_argument("--until", type=_utc, default=None, help="received before (UTC), default now")
+    parser.add_argument(
+        "--status",
+        action="append",
+        choices=[s.value for s in WebhookEventStatus if s != WebhookEventStatus.PENDING],
+        help="statuses to replay, repeatable (default: dead)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only count matching events")
+    args = parser.parse_args()
+
+    until = args.until or utcnow()
+    statuses = [WebhookEventStatus(value) for value in (args.status or ["dead"])]
+
+    with SessionLocal() as db:
+        if args.dry_run:
+            count = (
+                db.query(func.count(WebhookEvent.id))
+                .filter(
+                    WebhookEvent.received_at >= args.since,
+                    WebhookEvent.received_at < until,
+                    WebhookEvent.status.in_(statuses),
+                )
+                .scalar()
+            )
+            print(f"{count} event(s) would be replayed")
+            return
+        count = replay_events(db, args.since, until, statuses)
+    print(f"{count} event(s) queued for reprocessing")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 from .auth import router as auth_router
 from .students import router as students_router
 from .lessons import router as lessons_router
+from .lesson_series import router as lesson_series_router
 from .payments import router as payments_router
 from .homework import router as homework_router
 from .subscription import router as subscription_router
+from .imports import router as imports_router
+from .metrics import router as metrics_router
+from .telegram_bot import router as telegram_bot_router
+from .dashboard import router as dashboard_router
 
 __all__ = [
     "auth_router",
     "students_router",
     "lessons_router",
+    "lesson_series_router",
     "payments_router",
     "homework_router",
-    "subscription_router"
+    "subscription_router",
+    "imports_router",
+    "metrics_router",
+    "telegram_bot_router",
+    "dashboard_router"
 ]
@@ -1,29 +1,47 @@
 from datetime import datetime, timedelta, timezone
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserCreate, UserLogin, UserResponse, Token
-from ..utils.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    get_current_user
-)
+from ..utils.security import create_access_token, get_current_user
+from ..utils.password_hashing import password_hasher
+from ..utils.data_version import check_not_modified
 from ..config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _find_user_by_email(db: Session, normalized_email: str):
+    return db.query(User).filter(func.lower(User.email) == normalized_email).first()
+
+
+def _save_new_user(db: Session, new_user: User) -> None:
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+
+
+def _record_login(db: Session, user: User, new_password_hash: Optional[str]) -> None:
+    user.last_login = datetime.now(timezone.utc)
+    # Hash uses an outdated scheme or bcrypt cost: replace it transparently
+    if new_password_hash:
+        user.password_hash = new_password_hash
+    db.commit()
+
+
+# Handlers are async so bcrypt runs in the dedicated process pool without
+# occupying a request thread; blocking DB calls go to the threadpool.
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register new user"""
     # Check if user exists
     normalized_email = user_data.email.strip().lower()
-    existing_user = db.query(User).filter(func.lower(User.email) == normalized_email).first()
+    existing_user = await run_in_threadpool(_find_user_by_email, db, normalized_email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,26 +51,24 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     new_user = User(
         email=normalized_email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
         name=user_data.name,
         phone=user_data.phone
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(_save_new_user, db, new_user)
 
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db)
 ):
     """Login and get JWT token"""
     normalized_email = form_data.username.strip().lower()
-    user = db.query(User).filter(func.lower(User.email) == normalized_email).first()
+    user = await run_in_threadpool(_find_user_by_email, db, normalized_email)
 
     if not user:
         raise HTTPException(
@@ -61,27 +77,31 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user.password_hash):
+    is_valid, new_password_hash = await password_hasher.verify_and_update(
+        form_data.password, user.password_hash
+    )
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user_id = str(user.id)
+
     # Update last login
-    user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    await run_in_threadpool(_record_login, db, user, new_password_hash)
 
     # Create access token
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": user_id},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(check_not_modified)])
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
     return current_user
@@ -0,0 +1,20 @@
+from datetime import date
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..models.user import User
+from ..schemas.dashboard import DashboardSummary
+from ..services.dashboard import build_summary
+from ..utils.security import get_current_user
+from ..utils.data_version import check_not_modified
+from ..utils.read_replicas import get_read_db
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary, dependencies=[Depends(check_not_modified)])
+def get_dashboard_summary(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Students, this week's lessons, monthly income, top debtors and AI credits in one response"""
+    return build_summary(db, current_user, date.today())
@@ -1,20 +1,30 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import DataError, SQLAlchemyError
 from ..database import get_db
 from ..models.user import User
 from ..models.student import Student
 from ..models.homework import AIHomework
-from ..schemas.homework import HomeworkGenerate, HomeworkResponse
+from ..schemas.homework import HomeworkGenerate, HomeworkResponse, HomeworkSend, HomeworkSendResult
+from ..schemas.serializers import HOMEWORK_SERIALIZER
 from ..utils.security import get_current_user
+from ..utils.data_version import check_not_modified
+from ..utils.read_replicas import get_read_db
+from ..utils.tracing import span, traced
+from ..utils.fast_json import trusted_response
+from ..utils.file_response import ranged_file_response
+from ..utils.worksheet import TEMPLATE_VERSION
 from ..services.ai_generator import generate_homework, test_connection
+from ..services.telegram_outbox import enqueue_homework, outbox_worker
+from ..services.worksheet_cache import WORKSHEET_MEDIA_TYPES, cached_worksheet, render_to_cache
 from ..config import settings
 
 router = APIRouter(prefix="/api/homework", tags=["homework"])
 
 
 @router.post("/generate", response_model=HomeworkResponse, status_code=status.HTTP_201_CREATED)
+@traced("homework.request")
 def generate_homework_tasks(
     homework_data: HomeworkGenerate,
     current_user: User = Depends(get_current_user),
@@ -56,8 +66,16 @@ def generate_homework_tasks(
 
     credits_needed = required_credits(homework_data.tasks_count, provider)
 
-    # Lock user row and check AI credits to prevent race condition
-    user_locked = db.query(User).filter(User.id == current_user.id).with_for_update().first()
+    # Lock user row and check AI credits to prevent race condition.
+    # current_user may come from the principal cache, so always re-read the row.
+    with span("db.lock_user"):
+        user_locked = (
+            db.query(User)
+            .filter(User.id == current_user.id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
     if not user_locked or user_locked.ai_credits_left < credits_needed:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
@@ -114,8 +132,9 @@ def generate_homework_tasks(
         # Deduct AI credits from locked user
         user_locked.ai_credits_left -= credits_needed
 
-        db.commit()
-        db.refresh(new_homework)
+        with span("db.commit", tasks=len(generated_tasks.get("tasks", []))):
+            db.commit()
+            db.refresh(new_homework)
 
         return new_homework
 
@@ -159,24 +178,25 @@ def test_ai_connection(
         )
 
 
-@router.get("/", response_model=List[HomeworkResponse])
+@router.get("/", response_model=List[HomeworkResponse], dependencies=[Depends(check_not_modified)])
 def get_homework_history(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get homework generation history"""
     homeworks = db.query(AIHomework).filter(
         AIHomework.user_id == current_user.id
     ).order_by(AIHomework.created_at.desc()).all()
 
-    return homeworks
+    return trusted_response(HOMEWORK_SERIALIZER, homeworks, response)
 
 
-@router.get("/{homework_id}", response_model=HomeworkResponse)
+@router.get("/{homework_id}", response_model=HomeworkResponse, dependencies=[Depends(check_not_modified)])
 def get_homework(
     homework_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get specific homework by ID"""
     homework = db.query(AIHomework).filter(
@@ -191,3 +211,106 @@ def get_homework(
         )
 
     return homework
+
+
+@router.get("/{homework_id}/worksheet")
+def download_worksheet(
+    homework_id: str,
+    request: Request,
+    variant: Literal["student", "tutor"] = "student",
+    fmt: Literal["html", "pdf"] = Query("html", alias="format"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Printable worksheet (student variant without solutions); rendered once, then served from disk"""
+    # Ownership check without loading generated_tasks
+    owned = db.query(AIHomework.id).filter(
+        AIHomework.id == homework_id,
+        AIHomework.user_id == current_user.id
+    ).first()
+
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Homework not found"
+        )
+
+    path = cached_worksheet(owned.id, variant, fmt)
+    if path is None:
+        homework = db.query(AIHomework).filter(AIHomework.id == owned.id).first()
+        try:
+            path = render_to_cache(homework, variant, fmt)
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="PDF недоступен: не установлен пакет weasyprint. Используйте format=html",
+            )
+
+    return ranged_file_response(
+        request,
+        str(path),
+        media_type=WORKSHEET_MEDIA_TYPES[fmt],
+        etag=f'"{TEMPLATE_VERSION}-{owned.id}-{variant}-{fmt}"',
+        filename=f"worksheet-{owned.id}-{variant}.{fmt}",
+    )
+
+
+MAX_TELEGRAM_RECIPIENTS = 500
+
+
+@router.post(
+    "/{homework_id}/send",
+    response_model=HomeworkSendResult,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def send_homework_to_telegram(
+    homework_id: str,
+    send_data: HomeworkSend,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue the worksheet for delivery to the students' Telegram chats"""
+    if not settings.TELEGRAM_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Отправка в Telegram отключена. Укажите TELEGRAM_BOT_TOKEN в .env",
+        )
+
+    homework = db.query(AIHomework).filter(
+        AIHomework.id == homework_id,
+        AIHomework.user_id == current_user.id
+    ).first()
+
+    if not homework:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Homework not found"
+        )
+
+    student_ids = set(send_data.student_ids or [homework.student_id])
+    if len(student_ids) > MAX_TELEGRAM_RECIPIENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TELEGRAM_RECIPIENTS} recipients per request"
+        )
+
+    students = db.query(Student).filter(
+        Student.id.in_(list(student_ids)),
+        Student.user_id == current_user.id
+    ).all()
+
+    if len(students) != len(student_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    queued = enqueue_homework(db, homework, students, with_answers=send_data.with_answers)
+    db.commit()
+    if queued:
+        outbox_worker.notify()
+
+    return {
+        "queued": queued,
+        "skipped_student_ids": [student.id for student in students if not student.telegram_id]
+    }
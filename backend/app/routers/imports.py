@@ -0,0 +1,265 @@
+import csv
+import io
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Type
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User, SubscriptionTier
+from ..models.student import Student
+from ..models.lesson import Lesson
+from ..models.payment import Payment
+from ..schemas.student import StudentCreate
+from ..schemas.imports import LessonImportRow, PaymentImportRow, ImportRowError, ImportResult
+from ..services.lesson_payments import recalculate_payment_statuses
+from ..utils.security import get_current_user
+from ..utils.data_version import bump_data_version
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+MAX_IMPORT_ROWS = 5000
+FREE_TIER_STUDENT_LIMIT = 5
+
+
+async def read_import_rows(request: Request) -> List[Dict[str, Any]]:
+    """
+    Parse request body as a JSON array of objects or as CSV with a header row.
+
+    CSV is detected by Content-Type (text/csv); empty CSV cells become None.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded"
+        )
+
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(text))
+        rows = [
+            {
+                key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                for key, value in row.items()
+                if key
+            }
+            for row in reader
+        ]
+    else:
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid JSON: {e.msg} at position {e.pos}"
+            )
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of objects"
+            )
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import is empty"
+        )
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import is limited to {MAX_IMPORT_ROWS} rows"
+        )
+    return rows
+
+
+def _validate_rows(
+    rows: List[Dict[str, Any]],
+    schema: Type[BaseModel],
+) -> Tuple[List[Optional[BaseModel]], Dict[int, List[str]]]:
+    """Validate every row; return parsed rows (None if invalid) and errors keyed by 1-based row number."""
+    parsed: List[Optional[BaseModel]] = []
+    errors: Dict[int, List[str]] = {}
+    for index, row in enumerate(rows, start=1):
+        try:
+            parsed.append(schema.model_validate(row))
+        except ValidationError as e:
+            parsed.append(None)
+            errors[index] = [
+                f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            ]
+    return parsed, errors
+
+
+def _raise_if_errors(errors: Dict[int, List[str]]) -> None:
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": "Import rejected: fix the listed rows and retry. Nothing was saved.",
+                "errors": [
+                    ImportRowError(row=row, errors=row_errors).model_dump()
+                    for row, row_errors in sorted(errors.items())
+                ],
+            }
+        )
+
+
+def _resolve_students(
+    db: Session,
+    user_id: uuid.UUID,
+    parsed: List[Optional[BaseModel]],
+    errors: Dict[int, List[str]],
+) -> List[Optional[uuid.UUID]]:
+    """Resolve student_id / student_name references of all rows with a single query."""
+    ids = {row.student_id for row in parsed if row is not None and row.student_id}
+    names = {row.student_name.strip() for row in parsed if row is not None and not row.student_id}
+
+    conditions = []
+    if ids:
+        conditions.append(Student.id.in_(ids))
+    if names:
+        conditions.append(Student.name.in_(names))
+
+    known_ids = set()
+    ids_by_name: Dict[str, List[uuid.UUID]] = {}
+    if conditions:
+        for student_id, name in db.query(Student.id, Student.name).filter(
+            Student.user_id == user_id,
+            or_(*conditions)
+        ):
+            known_ids.add(student_id)
+            ids_by_name.setdefault(name, []).append(student_id)
+
+    resolved: List[Optional[uuid.UUID]] = []
+    for index, row in enumerate(parsed, start=1):
+        if row is None:
+            resolved.append(None)
+            continue
+        if row.student_id:
+            if row.student_id not in known_ids:
+                errors.setdefault(index, []).append("student_id: Student not found")
+            resolved.append(row.student_id)
+            continue
+        matches = ids_by_name.get(row.student_name.strip(), [])
+        if not matches:
+            errors.setdefault(index, []).append("student_name: Student not found")
+        elif len(matches) > 1:
+            errors.setdefault(index, []).append("student_name: Several students have this name, use student_id")
+        resolved.append(matches[0] if len(matches) == 1 else None)
+    return resolved
+
+
+@router.post("/students", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+def import_students(
+    rows: List[Dict[str, Any]] = Depends(read_import_rows),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk import students from a JSON array or CSV"""
+    parsed, errors = _validate_rows(rows, StudentCreate)
+    _raise_if_errors(errors)
+
+    # Apply FREE tier student limit to the batch as a whole
+    if current_user.subscription_tier == SubscriptionTier.FREE:
+        student_count = db.query(Student).filter(Student.user_id == current_user.id).count()
+        if student_count + len(parsed) > FREE_TIER_STUDENT_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=(
+                    f"Free tier limited to {FREE_TIER_STUDENT_LIMIT} students "
+                    f"({student_count} already added). Please upgrade your subscription."
+                )
+            )
+
+    values = [
+        {"id": uuid.uuid4(), "user_id": current_user.id, **row.model_dump()}
+        for row in parsed
+    ]
+    db.execute(insert(Student), values)
+    # Bulk INSERT bypasses the ORM flush, bump ETag version explicitly
+    bump_data_version(db, [current_user.id])
+    db.commit()
+
+    return {"created": len(values), "ids": [value["id"] for value in values]}
+
+
+@router.post("/lessons", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+def import_lessons(
+    rows: List[Dict[str, Any]] = Depends(read_import_rows),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk import lessons from a JSON array or CSV"""
+    parsed, errors = _validate_rows(rows, LessonImportRow)
+    student_ids = _resolve_students(db, current_user.id, parsed, errors)
+    _raise_if_errors(errors)
+
+    values = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": current_user.id,
+            "student_id": student_id,
+            **row.model_dump(exclude={"student_id", "student_name"}),
+        }
+        for row, student_id in zip(parsed, student_ids)
+    ]
+    db.execute(insert(Lesson), values)
+    # Bulk INSERT bypasses the ORM flush, bump ETag version explicitly
+    bump_data_version(db, [current_user.id])
+    db.commit()
+
+    return {"created": len(values), "ids": [value["id"] for value in values]}
+
+
+@router.post("/payments", response_model=ImportResult, status_code=status.HTTP_201_CREATED)
+def import_payments(
+    rows: List[Dict[str, Any]] = Depends(read_import_rows),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk import payments from a JSON array or CSV"""
+    parsed, errors = _validate_rows(rows, PaymentImportRow)
+    student_ids = _resolve_students(db, current_user.id, parsed, errors)
+
+    # Verify referenced lessons belong to user and student in one query
+    lesson_ids = {row.lesson_id for row in parsed if row is not None and row.lesson_id}
+    lesson_students: Dict[uuid.UUID, uuid.UUID] = {}
+    if lesson_ids:
+        lesson_students = dict(
+            db.query(Lesson.id, Lesson.student_id).filter(
+                Lesson.user_id == current_user.id,
+                Lesson.id.in_(lesson_ids)
+            ).all()
+        )
+    for index, (row, student_id) in enumerate(zip(parsed, student_ids), start=1):
+        if row is None or not row.lesson_id:
+            continue
+        if row.lesson_id not in lesson_students:
+            errors.setdefault(index, []).append("lesson_id: Lesson not found")
+        elif student_id and lesson_students[row.lesson_id] != student_id:
+            errors.setdefault(index, []).append("lesson_id: Lesson belongs to another student")
+    _raise_if_errors(errors)
+
+    values = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": current_user.id,
+            "student_id": student_id,
+            **row.model_dump(exclude={"student_id", "student_name"}),
+        }
+        for row, student_id in zip(parsed, student_ids)
+    ]
+    db.execute(insert(Payment), values)
+    recalculate_payment_statuses(db, lesson_ids)
+    # Bulk INSERT bypasses the ORM flush, bump ETag version explicitly
+    bump_data_version(db, [current_user.id])
+    db.commit()
+
+    return {"created": len(values), "ids": [value["id"] for value in values]}
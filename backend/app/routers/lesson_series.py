@@ -0,0 +1,197 @@
+from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..models.student import Student
+from ..models.lesson import Lesson, LessonStatus
+from ..models.lesson_series import LessonSeries
+from ..schemas.lesson import LessonResponse
+from ..schemas.lesson_series import (
+    LessonSeriesCreate,
+    LessonSeriesUpdate,
+    LessonSeriesResponse,
+    OccurrenceUpdate,
+)
+from ..services.lesson_series import series_until, materialize_occurrence
+from ..utils.security import get_current_user
+from ..utils.data_version import check_not_modified
+from ..utils.read_replicas import get_read_db
+
+router = APIRouter(prefix="/api/lesson-series", tags=["lesson-series"])
+
+
+def _get_series(db: Session, series_id: str, user: User) -> LessonSeries:
+    series = db.query(LessonSeries).filter(
+        LessonSeries.id == series_id,
+        LessonSeries.user_id == user.id
+    ).first()
+
+    if not series:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson series not found"
+        )
+    return series
+
+
+def _materialize(db: Session, series: LessonSeries, original_start: datetime) -> Lesson:
+    try:
+        return materialize_occurrence(db, series, original_start)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/", response_model=List[LessonSeriesResponse], dependencies=[Depends(check_not_modified)])
+def get_lesson_series(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get all lesson series for current user"""
+    return db.query(LessonSeries).filter(
+        LessonSeries.user_id == current_user.id
+    ).order_by(LessonSeries.dtstart).all()
+
+
+@router.post("/", response_model=LessonSeriesResponse, status_code=status.HTTP_201_CREATED)
+def create_lesson_series(
+    series_data: LessonSeriesCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create recurring lesson series"""
+    # Verify student belongs to user
+    student = db.query(Student).filter(
+        Student.id == series_data.student_id,
+        Student.user_id == current_user.id
+    ).first()
+
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    new_series = LessonSeries(
+        user_id=current_user.id,
+        until=series_until(series_data.rrule, series_data.dtstart),
+        exdates=[],
+        **series_data.model_dump()
+    )
+
+    db.add(new_series)
+    db.commit()
+    db.refresh(new_series)
+
+    return new_series
+
+
+@router.get("/{series_id}", response_model=LessonSeriesResponse, dependencies=[Depends(check_not_modified)])
+def get_single_lesson_series(
+    series_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get lesson series by ID"""
+    return _get_series(db, series_id, current_user)
+
+
+@router.put("/{series_id}", response_model=LessonSeriesResponse)
+def update_lesson_series(
+    series_id: str,
+    series_data: LessonSeriesUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update series rule or defaults; already materialized lessons are kept as is"""
+    series = _get_series(db, series_id, current_user)
+
+    update_data = series_data.model_dump(exclude_unset=True)
+    if "rrule" in update_data:
+        try:
+            series.until = series_until(update_data["rrule"], series.dtstart)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    for field, value in update_data.items():
+        setattr(series, field, value)
+
+    db.commit()
+    db.refresh(series)
+
+    return series
+
+
+@router.delete("/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_lesson_series(
+    series_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete series; materialized lessons stay as standalone lessons"""
+    series = _get_series(db, series_id, current_user)
+
+    db.delete(series)
+    db.commit()
+
+    return None
+
+
+@router.put("/{series_id}/occurrences", response_model=LessonResponse)
+def update_occurrence(
+    series_id: str,
+    occurrence_data: OccurrenceUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Edit a single occurrence (materializes it as a real lesson)"""
+    series = _get_series(db, series_id, current_user)
+    lesson = _materialize(db, series, occurrence_data.original_start)
+
+    update_data = occurrence_data.model_dump(exclude_unset=True, exclude={"original_start"})
+    for field, value in update_data.items():
+        setattr(lesson, field, value)
+
+    if lesson.datetime_start >= lesson.datetime_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="datetime_start must be before datetime_end"
+        )
+
+    db.commit()
+    db.refresh(lesson)
+
+    return lesson
+
+
+@router.delete("/{series_id}/occurrences", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_occurrence(
+    series_id: str,
+    original_start: datetime = Query(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Cancel a single occurrence of the series"""
+    series = _get_series(db, series_id, current_user)
+    original_start = original_start.replace(tzinfo=None)
+
+    lesson = db.query(Lesson).filter(
+        Lesson.series_id == series.id,
+        Lesson.original_start == original_start,
+    ).first()
+
+    if lesson is not None:
+        # Materialized lesson may already have payments, keep the row
+        lesson.status = LessonStatus.CANCELLED
+    elif original_start not in (series.exdates or []):
+        series.exdates = [*(series.exdates or []), original_start]
+
+    db.commit()
+
+    return None
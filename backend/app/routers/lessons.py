@@ -1,19 +1,47 @@
 from typing import List, Optional, Tuple
-from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime, date, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from decimal import Decimal
 from ..database import get_db
 from ..models.user import User
-from ..models.lesson import Lesson, PaymentStatus as LessonPaymentStatus
+from ..models.lesson import Lesson, LessonStatus, PaymentStatus as LessonPaymentStatus
 from ..models.student import Student
 from ..models.payment import Payment, PaymentStatusEnum as PaymentStatusEnum
-from ..schemas.lesson import LessonCreate, LessonUpdate, LessonResponse
+from ..schemas.lesson import FreeSlot, LessonConflict, LessonCreate, LessonUpdate, LessonResponse
+from ..schemas.serializers import LESSON_SERIALIZER
+from ..services.lesson_series import expand_series_window
+from ..services.scheduling import find_conflicts, free_slots, lock_schedule
 from ..utils.security import get_current_user
+from ..utils.data_version import check_not_modified
+from ..utils.read_replicas import get_read_db
+from ..utils.fast_json import trusted_response
 
 router = APIRouter(prefix="/api/lessons", tags=["lessons"])
 
+MAX_FREE_SLOTS_DAYS = 62
+
+
+def _check_overlap(
+    db: Session,
+    user_id,
+    datetime_start: datetime,
+    datetime_end: datetime,
+    exclude_lesson_id=None,
+) -> None:
+    """409 with the clashing lessons when the tutor is busy in the range"""
+    lock_schedule(db, user_id)
+    conflicts = find_conflicts(db, user_id, datetime_start, datetime_end, exclude_lesson_id)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Lesson overlaps other lessons; pass allow_overlap=true to save it anyway",
+                "conflicts": [LessonConflict(**conflict).model_dump(mode="json") for conflict in conflicts],
+            }
+        )
+
 def _compute_payment_fields(
     lesson: Lesson,
     paid_amount: Optional[Decimal],
@@ -48,16 +76,19 @@ def _serialize_lesson(
         "amount": lesson.amount,
         "remaining_amount": remaining_amount,
         "notes": lesson.notes,
+        "series_id": lesson.series_id,
+        "original_start": lesson.original_start,
     }
 
 
-@router.get("/", response_model=List[LessonResponse])
+@router.get("/", response_model=List[LessonResponse], dependencies=[Depends(check_not_modified)])
 def get_lessons(
+    response: Response,
     student_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get lessons with optional filters"""
     paid_amount = func.coalesce(func.sum(Payment.amount), 0).label("paid_amount")
@@ -71,7 +102,8 @@ def get_lessons(
             ),
         )
         .filter(Lesson.user_id == current_user.id)
-        .group_by(Lesson.id)
+        # The primary key of the partitioned table, so Lesson columns are grouped too
+        .group_by(Lesson.id, Lesson.datetime_start)
     )
 
     if student_id:
@@ -98,17 +130,22 @@ def get_lessons(
                 remaining_amount=remaining,
             )
         )
-    return result
+    # Trusted rows: skip response_model re-validation
+    return trusted_response(LESSON_SERIALIZER, result, response)
 
 
-@router.get("/calendar", response_model=List[LessonResponse])
+@router.get("/calendar", response_model=List[LessonResponse], dependencies=[Depends(check_not_modified)])
 def get_calendar_lessons(
+    response: Response,
     start_date: date = Query(...),
     end_date: date = Query(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get lessons for calendar view"""
+    """Get lessons for calendar view, including lazily expanded lesson series"""
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = datetime.combine(end_date, datetime.max.time())
+
     paid_amount = func.coalesce(func.sum(Payment.amount), 0).label("paid_amount")
     rows = (
         db.query(Lesson, paid_amount)
@@ -122,11 +159,12 @@ def get_calendar_lessons(
         .filter(
             and_(
                 Lesson.user_id == current_user.id,
-                Lesson.datetime_start >= datetime.combine(start_date, datetime.min.time()),
-                Lesson.datetime_start <= datetime.combine(end_date, datetime.max.time()),
+                Lesson.datetime_start >= window_start,
+                Lesson.datetime_start <= window_end,
             )
         )
-        .group_by(Lesson.id)
+        # The primary key of the partitioned table, so Lesson columns are grouped too
+        .group_by(Lesson.id, Lesson.datetime_start)
         .order_by(Lesson.datetime_start)
         .all()
     )
@@ -141,12 +179,17 @@ def get_calendar_lessons(
                 remaining_amount=remaining,
             )
         )
-    return result
+
+    # Merge virtual occurrences of recurring series that have no concrete override
+    result.extend(expand_series_window(db, current_user.id, window_start, window_end))
+    result.sort(key=lambda item: item["datetime_start"])
+    return trusted_response(LESSON_SERIALIZER, result, response)
 
 
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
 def create_lesson(
     lesson_data: LessonCreate,
+    allow_overlap: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -163,6 +206,9 @@ def create_lesson(
             detail="Student not found"
         )
 
+    if not allow_overlap and lesson_data.status != LessonStatus.CANCELLED:
+        _check_overlap(db, current_user.id, lesson_data.datetime_start, lesson_data.datetime_end)
+
     new_lesson = Lesson(
         user_id=current_user.id,
         **lesson_data.model_dump()
@@ -175,11 +221,45 @@ def create_lesson(
     return new_lesson
 
 
-@router.get("/{lesson_id}", response_model=LessonResponse)
+@router.get("/free-slots", response_model=List[FreeSlot])
+def get_free_slots(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    day_start: time = Query(time(9, 0)),
+    day_end: time = Query(time(21, 0)),
+    min_duration: int = Query(60, ge=5, le=24 * 60, description="Minutes"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Free windows within working hours for each day of the range, computed in the database"""
+    if end_date < start_date or (end_date - start_date).days >= MAX_FREE_SLOTS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"end_date must be within {MAX_FREE_SLOTS_DAYS} days after start_date"
+        )
+    if day_start >= day_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="day_start must be before day_end"
+        )
+
+    return free_slots(
+        db,
+        current_user.id,
+        start_date,
+        end_date,
+        day_start,
+        day_end,
+        timedelta(minutes=min_duration),
+        not_before=datetime.now(),
+    )
+
+
+@router.get("/{lesson_id}", response_model=LessonResponse, dependencies=[Depends(check_not_modified)])
 def get_lesson(
     lesson_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get lesson by ID"""
     lesson = db.query(Lesson).filter(
@@ -200,6 +280,7 @@ def get_lesson(
 def update_lesson(
     lesson_id: str,
     lesson_data: LessonUpdate,
+    allow_overlap: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -231,6 +312,10 @@ def update_lesson(
             detail="datetime_start must be before datetime_end"
         )
 
+    rescheduled = update_data.keys() & {"datetime_start", "datetime_end", "status"}
+    if rescheduled and not allow_overlap and lesson.status != LessonStatus.CANCELLED:
+        _check_overlap(db, current_user.id, datetime_start, datetime_end, exclude_lesson_id=lesson.id)
+
     db.commit()
     db.refresh(lesson)
 
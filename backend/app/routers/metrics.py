@@ -0,0 +1,21 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from ..config import settings
+from ..utils.metrics import render_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus exposition, aggregated across workers"""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not authorization or not hmac.compare_digest(authorization, expected):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token"
+            )
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
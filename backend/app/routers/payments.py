@@ -1,19 +1,45 @@
+import uuid
 from typing import List
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, extract, case
+from sqlalchemy import and_, func, insert
 from ..database import get_db
 from ..models.user import User
 from ..models.payment import Payment, PaymentStatusEnum
 from ..models.student import Student
 from ..models.lesson import Lesson, PaymentStatus as LessonPaymentStatus
-from ..schemas.payment import PaymentCreate, PaymentResponse, PaymentStats
+from ..schemas.lesson_series import OccurrenceRef
+from ..schemas.payment import PaymentAllocate, PaymentAllocation, PaymentCreate, PaymentResponse, PaymentStats
+from ..schemas.serializers import PAYMENT_SERIALIZER
+from ..services.dashboard import month_bounds
+from ..services.lesson_series import materialize_user_occurrence
+from ..services.lesson_payments import allocate_amount, list_debtors, lock_lesson_balances, recalculate_payment_statuses
 from ..utils.security import get_current_user
+from ..utils.data_version import bump_data_version, check_not_modified
+from ..utils.read_replicas import get_read_db
+from ..utils.fast_json import trusted_response
 
 router = APIRouter(prefix="/api/payments", tags=["payments"])
 
+def _occurrence_lesson(db: Session, user_id: uuid.UUID, occurrence: OccurrenceRef) -> Lesson:
+    """Lesson row of a series occurrence, created if it is not materialized yet"""
+    try:
+        lesson = materialize_user_occurrence(db, user_id, occurrence.series_id, occurrence.original_start)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if lesson is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson series not found"
+        )
+    return lesson
+
+
 def _recalculate_lesson_payment_status(db: Session, lesson: Lesson) -> None:
     """Persist recalculated lesson.payment_status based on completed payments."""
     if lesson.amount is None:
@@ -36,17 +62,18 @@ def _recalculate_lesson_payment_status(db: Session, lesson: Lesson) -> None:
         lesson.payment_status = LessonPaymentStatus.PARTIAL
 
 
-@router.get("/", response_model=List[PaymentResponse])
+@router.get("/", response_model=List[PaymentResponse], dependencies=[Depends(check_not_modified)])
 def get_payments(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all payments for current user"""
     payments = db.query(Payment).filter(
         Payment.user_id == current_user.id
     ).order_by(Payment.payment_date.desc()).all()
 
-    return payments
+    return trusted_response(PAYMENT_SERIALIZER, payments, response)
 
 
 @router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
@@ -81,42 +108,113 @@ def create_payment(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Lesson not found"
             )
+    elif payment_data.occurrence:
+        lesson = _occurrence_lesson(db, current_user.id, payment_data.occurrence)
+        if lesson.student_id != student.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Lesson belongs to another student"
+            )
 
     new_payment = Payment(
         user_id=current_user.id,
-        **payment_data.model_dump()
+        **payment_data.model_dump(exclude={"lesson_id", "occurrence"}),
+        lesson_id=lesson.id if lesson is not None else None,
     )
 
     db.add(new_payment)
-    db.commit()
-    db.refresh(new_payment)
+    db.flush()
 
-    # If payment is tied to a lesson, update lesson payment status
+    # If payment is tied to a lesson, update lesson payment status in the same transaction
     if lesson is not None:
         _recalculate_lesson_payment_status(db, lesson)
-        db.commit()
+    db.commit()
+    db.refresh(new_payment)
 
     return new_payment
 
 
-@router.get("/stats", response_model=PaymentStats)
+@router.post("/allocate", response_model=PaymentAllocation, status_code=status.HTTP_201_CREATED)
+def allocate_payment(
+    allocation_data: PaymentAllocate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Pay off several lessons of a student with one amount, atomically"""
+    lesson_ids = set(allocation_data.lesson_ids)
+    # Occurrences get their rows first; a wrong student shows up as a missing lesson below
+    for occurrence in allocation_data.occurrences:
+        lesson_ids.add(_occurrence_lesson(db, current_user.id, occurrence).id)
+    lessons = lock_lesson_balances(db, current_user.id, allocation_data.student_id, lesson_ids)
+
+    if len(lessons) != len(lesson_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson not found"
+        )
+    if any(lesson.amount is None for lesson in lessons):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Lessons without an amount cannot be paid in bulk"
+        )
+
+    try:
+        shares = allocate_amount(lessons, allocation_data.amount, allocation_data.order)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    values = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": current_user.id,
+            "student_id": allocation_data.student_id,
+            "lesson_id": lesson_id,
+            "amount": share,
+            "payment_method": allocation_data.payment_method,
+            "payment_date": allocation_data.payment_date,
+            "status": PaymentStatusEnum.COMPLETED,
+        }
+        for lesson_id, share in shares
+    ]
+    if values:
+        db.execute(insert(Payment).values(values))
+        recalculate_payment_statuses(db, [lesson_id for lesson_id, _ in shares])
+        # Bulk INSERT bypasses the ORM flush, bump ETag version explicitly
+        bump_data_version(db, [current_user.id])
+    db.commit()
+
+    return {"payments": values, "allocated": sum((share for _, share in shares), Decimal("0.00"))}
+
+
+@router.get("/stats", response_model=PaymentStats, dependencies=[Depends(check_not_modified)])
 def get_payment_stats(
     month: int = None,
     year: int = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get payment statistics for a specific month/year"""
     if not month or not year:
         now = datetime.now()
         month = now.month
         year = now.year
+    try:
+        month_start, next_month = month_bounds(date(year, month, 1))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month or year"
+        )
 
+    # A range on payment_date (not extract()) so only one partition is scanned
     total = db.query(func.sum(Payment.amount)).filter(
         and_(
             Payment.user_id == current_user.id,
-            extract('month', Payment.payment_date) == month,
-            extract('year', Payment.payment_date) == year
+            Payment.payment_date >= month_start,
+            Payment.payment_date < next_month
         )
     ).scalar()
 
@@ -126,56 +224,13 @@ def get_payment_stats(
     }
 
 
-@router.get("/debtors", response_model=List[dict])
+@router.get("/debtors", response_model=List[dict], dependencies=[Depends(check_not_modified)])
 def get_debtors(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of students with unpaid lessons"""
-    # Compute remaining per lesson (amount - sum(completed payments)), ignore lessons without amount
-    paid_amount = func.coalesce(func.sum(Payment.amount), 0).label("paid_amount")
-    remaining = func.greatest((Lesson.amount - paid_amount), 0).label("remaining_amount")
-
-    per_lesson = (
-        db.query(
-            Lesson.student_id.label("student_id"),
-            remaining,
-        )
-        .outerjoin(
-            Payment,
-            and_(
-                Payment.lesson_id == Lesson.id,
-                Payment.status == PaymentStatusEnum.COMPLETED,
-            ),
-        )
-        .filter(
-            Lesson.user_id == current_user.id,
-            Lesson.amount.isnot(None),
-        )
-        .group_by(Lesson.id)
-        .subquery()
-    )
-
-    unpaid_count = func.sum(
-        case(
-            (per_lesson.c.remaining_amount > 0, 1),
-            else_=0,
-        )
-    ).label("unpaid_lessons_count")
-
-    rows = (
-        db.query(
-            Student.id.label("student_id"),
-            Student.name.label("student_name"),
-            func.coalesce(func.sum(per_lesson.c.remaining_amount), 0).label("total_debt"),
-            unpaid_count,
-        )
-        .join(per_lesson, per_lesson.c.student_id == Student.id)
-        .filter(Student.user_id == current_user.id)
-        .group_by(Student.id, Student.name)
-        .having(func.sum(per_lesson.c.remaining_amount) > 0)
-        .all()
-    )
+    rows = list_debtors(db, current_user.id)
 
     return [
         {
@@ -1,25 +1,33 @@
-import random
-import string
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User, SubscriptionTier
 from ..models.student import Student
-from ..schemas.student import StudentCreate, StudentUpdate, StudentResponse, TelegramLinkCode
+from ..schemas.student import StudentCreate, StudentUpdate, StudentResponse, StudentProfile, TelegramLinkCode
+from ..schemas.serializers import STUDENT_SERIALIZER
+from ..services.link_codes import LinkCodeConflict, allocate_link_code
+from ..services.student_profile import build_profile
 from ..utils.security import get_current_user
+from ..utils.data_version import check_not_modified
+from ..utils.read_replicas import get_read_db
+from ..utils.fast_json import trusted_response
 
 router = APIRouter(prefix="/api/students", tags=["students"])
 
+PROFILE_PAGE_SIZE = 20
+PROFILE_MAX_PAGE_SIZE = 100
 
-@router.get("/", response_model=List[StudentResponse])
+
+@router.get("/", response_model=List[StudentResponse], dependencies=[Depends(check_not_modified)])
 def get_students(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all students for current user"""
     students = db.query(Student).filter(Student.user_id == current_user.id).all()
-    return students
+    return trusted_response(STUDENT_SERIALIZER, students, response)
 
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
@@ -50,11 +58,11 @@ def create_student(
     return new_student
 
 
-@router.get("/{student_id}", response_model=StudentResponse)
+@router.get("/{student_id}", response_model=StudentResponse, dependencies=[Depends(check_not_modified)])
 def get_student(
     student_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get student by ID"""
     student = db.query(Student).filter(
@@ -71,6 +79,36 @@ def get_student(
     return student
 
 
+@router.get("/{student_id}/profile", response_model=StudentProfile, dependencies=[Depends(check_not_modified)])
+def get_student_profile(
+    student_id: str,
+    limit: int = Query(PROFILE_PAGE_SIZE, ge=1, le=PROFILE_MAX_PAGE_SIZE),
+    lessons_offset: int = Query(0, ge=0),
+    payments_offset: int = Query(0, ge=0),
+    homework_offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Student with balance totals and the latest lessons, payments and homework (limit per section)"""
+    profile = build_profile(
+        db,
+        student_id,
+        current_user.id,
+        limit,
+        lessons_offset=lessons_offset,
+        payments_offset=payments_offset,
+        homework_offset=homework_offset,
+    )
+
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    return profile
+
+
 @router.put("/{student_id}", response_model=StudentResponse)
 def update_student(
     student_id: str,
@@ -132,44 +170,21 @@ def generate_telegram_link_code(
     db: Session = Depends(get_db)
 ):
     """Generate Telegram link code for student"""
-    student = db.query(Student).filter(
-        Student.id == student_id,
-        Student.user_id == current_user.id
-    ).first()
-
-    if not student:
+    try:
+        link_code = allocate_link_code(db, student_id, current_user.id)
+    except LinkCodeConflict:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
-        )
-
-    # Generate unique 6-digit code with max attempts
-    max_attempts = 100
-    code = None
-    for attempt in range(max_attempts):
-        code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        # Check if code is unique
-        existing = db.query(Student).filter(Student.telegram_link_code == code).first()
-        if not existing:
-            break
-    
-    # If we exhausted all attempts and still have a duplicate, raise error
-    if code is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Failed to generate code. Please try again."
         )
-    
-    # Double-check uniqueness before saving
-    existing_check = db.query(Student).filter(Student.telegram_link_code == code).first()
-    if existing_check:
+
+    if link_code is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate unique code after {max_attempts} attempts. Please try again."
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
         )
 
-    student.telegram_link_code = code
     db.commit()
-    db.refresh(student)
 
-    return {"link_code": code}
+    return link_code._asdict()
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
 from ..database import get_db
 from ..models.user import User, SubscriptionTier
 from ..utils.security import get_current_user
-from ..services.yukassa import create_payment, verify_payment
+from ..utils.data_version import check_not_modified
+from ..services.yukassa import create_payment
+from ..services.webhook_inbox import inbox_worker, store_event
 from ..config import settings
 
 router = APIRouter(prefix="/api/subscription", tags=["subscription"])
@@ -15,14 +18,8 @@ SUBSCRIPTION_PRICES = {
     SubscriptionTier.PREMIUM: 1990.00
 }
 
-SUBSCRIPTION_CREDITS = {
-    SubscriptionTier.FREE: 10,
-    SubscriptionTier.BASIC: 100,
-    SubscriptionTier.PREMIUM: 1000
-}
-
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(check_not_modified)])
 def get_current_subscription(
     current_user: User = Depends(get_current_user)
 ):
@@ -35,7 +32,7 @@ def get_current_subscription(
 
 
 @router.post("/upgrade")
-def upgrade_subscription(
+async def upgrade_subscription(
     tier: SubscriptionTier,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -79,7 +76,7 @@ def upgrade_subscription(
             SubscriptionTier.PREMIUM: "Премиум"
         }[tier]
 
-        payment_data = create_payment(
+        payment_data = await create_payment(
             amount=amount,
             description=f"Подписка TutorAI CRM - {tier_name}",
             return_url=f"{settings.FRONTEND_URL}/subscription/success",
@@ -110,7 +107,7 @@ async def yukassa_webhook(
     request: Request,
     db: Session = Depends(get_db)
 ):
-    """Handle YooKassa webhook for payment confirmation"""
+    """Accept a YooKassa webhook delivery into the inbox (services/webhook_inbox.py)"""
     if not settings.BILLING_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -119,38 +116,15 @@ async def yukassa_webhook(
 
     payload = await request.json()
 
-    event_type = payload.get("event")
     payment_object = payload.get("object")
+    if not payload.get("event") or not isinstance(payment_object, dict) or not payment_object.get("id"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook payload"
+        )
 
-    if event_type == "payment.succeeded" and payment_object:
-        payment_id = payment_object.get("id")
-
-        # Verify payment
-        try:
-            payment_info = verify_payment(payment_id)
-
-            if payment_info.get("status") == "succeeded":
-                # Extract metadata
-                metadata = payment_info.get("metadata", {})
-                user_id = metadata.get("user_id")
-                tier = metadata.get("tier")
-
-                if user_id and tier:
-                    user = db.query(User).filter(User.id == user_id).first()
-
-                    if user:
-                        # Upgrade subscription
-                        user.subscription_tier = SubscriptionTier(tier)
-                        user.ai_credits_left = SUBSCRIPTION_CREDITS[SubscriptionTier(tier)]
-
-                        db.commit()
-
-                        return {"status": "ok"}
-
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e)
-            )
+    # Only record the delivery; the inbox worker verifies and applies it
+    if await run_in_threadpool(store_event, db, payload):
+        inbox_worker.notify()
 
     return {"status": "ok"}
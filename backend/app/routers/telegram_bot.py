@@ -0,0 +1,68 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_db
+from ..schemas.student import TelegramLinkClaim, TelegramLinkedStudent
+from ..services.link_codes import LinkedStudent, claim_link_code, resolve_link_code
+
+
+def require_bot_secret(authorization: Optional[str] = Header(None)) -> None:
+    """Bot-facing endpoints are off until TELEGRAM_BOT_API_SECRET is set"""
+    if not settings.TELEGRAM_BOT_API_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    expected = f"Bearer {settings.TELEGRAM_BOT_API_SECRET}"
+    if not authorization or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid bot secret"
+        )
+
+
+router = APIRouter(prefix="/api/telegram", tags=["telegram"], dependencies=[Depends(require_bot_secret)])
+
+
+def _linked_student(student: LinkedStudent) -> dict:
+    return {
+        "student_id": student.id,
+        "name": student.name,
+        "subject": student.subject,
+        "telegram_id": student.telegram_id,
+    }
+
+
+@router.get("/link-codes/{code}", response_model=TelegramLinkedStudent)
+def get_link_code(code: str, db: Session = Depends(get_db)):
+    """Resolve a link code to its student"""
+    student = resolve_link_code(db, code)
+    if student is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Link code not found or expired"
+        )
+    return _linked_student(student)
+
+
+@router.post("/link-codes/{code}/claim", response_model=TelegramLinkedStudent)
+def claim_link(code: str, claim: TelegramLinkClaim, db: Session = Depends(get_db)):
+    """Link a Telegram chat to the student holding the code; the code is spent"""
+    try:
+        student = claim_link_code(db, code, claim.telegram_id)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This Telegram account is already linked to another student"
+        )
+    if student is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Link code not found or expired"
+        )
+    db.commit()
+    return _linked_student(student)
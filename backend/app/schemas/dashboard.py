@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+from ..models.lesson import LessonStatus, PaymentStatus
+from ..models.user import SubscriptionTier
+
+
+class DashboardLesson(BaseModel):
+    id: UUID
+    student_id: UUID
+    student_name: str
+    datetime_start: datetime
+    datetime_end: datetime
+    status: LessonStatus
+    payment_status: PaymentStatus
+    amount: Optional[Decimal]
+    series_id: Optional[UUID] = None
+    is_virtual: bool = False
+
+
+class DashboardDebtor(BaseModel):
+    student_id: UUID
+    student_name: str
+    total_debt: Decimal
+    unpaid_lessons_count: int
+
+
+class DashboardSummary(BaseModel):
+    students_count: int
+    today_lessons: List[DashboardLesson]
+    # Lessons from today through the next 6 days
+    week_lessons_count: int
+    upcoming_lessons: List[DashboardLesson]
+    monthly_income: Decimal
+    period: str
+    debtors_count: int
+    top_debtors: List[DashboardDebtor]
+    subscription_tier: SubscriptionTier
+    ai_credits_left: int
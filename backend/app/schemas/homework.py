@@ -33,6 +33,18 @@ class HomeworkResponse(BaseModel):
         from_attributes = True
 
 
+class HomeworkSend(BaseModel):
+    # Recipients; the homework's own student when omitted
+    student_ids: Optional[List[UUID]] = None
+    with_answers: bool = False
+
+
+class HomeworkSendResult(BaseModel):
+    queued: int
+    # Students without a linked Telegram chat
+    skipped_student_ids: List[UUID]
+
+
 class TaskItem(BaseModel):
     number: int
     text: str
@@ -0,0 +1,59 @@
+from pydantic import BaseModel, model_validator
+from typing import Optional, List
+from datetime import datetime, date
+from uuid import UUID
+from decimal import Decimal
+from ..models.lesson import LessonStatus
+from ..models.payment import PaymentMethod, PaymentStatusEnum
+
+
+class StudentReference(BaseModel):
+    """Row refers to a student either by id or by exact name."""
+    student_id: Optional[UUID] = None
+    student_name: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_student_reference(self):
+        if self.student_id is None and not (self.student_name and self.student_name.strip()):
+            raise ValueError('student_id or student_name is required')
+        return self
+
+
+class LessonImportRow(StudentReference):
+    datetime_start: datetime
+    datetime_end: datetime
+    status: Optional[LessonStatus] = LessonStatus.SCHEDULED
+    amount: Optional[Decimal] = None
+    notes: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_datetime_range(self):
+        if self.datetime_start >= self.datetime_end:
+            raise ValueError('datetime_start must be before datetime_end')
+        if self.status is None:
+            self.status = LessonStatus.SCHEDULED
+        return self
+
+
+class PaymentImportRow(StudentReference):
+    lesson_id: Optional[UUID] = None
+    amount: Decimal
+    payment_method: PaymentMethod
+    payment_date: date
+    status: Optional[PaymentStatusEnum] = PaymentStatusEnum.COMPLETED
+
+    @model_validator(mode='after')
+    def default_status(self):
+        if self.status is None:
+            self.status = PaymentStatusEnum.COMPLETED
+        return self
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    created: int
+    ids: List[UUID]
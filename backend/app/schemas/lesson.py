@@ -51,6 +51,24 @@ class LessonResponse(BaseModel):
     amount: Optional[Decimal]
     remaining_amount: Optional[Decimal] = None
     notes: Optional[str]
+    series_id: Optional[UUID] = None
+    original_start: Optional[datetime] = None
+    # True for a not yet materialized occurrence of a lesson series
+    is_virtual: bool = False
 
     class Config:
         from_attributes = True
+
+
+class LessonConflict(BaseModel):
+    id: UUID
+    student_id: UUID
+    datetime_start: datetime
+    datetime_end: datetime
+    series_id: Optional[UUID] = None
+    is_virtual: bool = False
+
+
+class FreeSlot(BaseModel):
+    start: datetime
+    end: datetime
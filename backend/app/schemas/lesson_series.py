@@ -0,0 +1,99 @@
+from pydantic import BaseModel, field_validator, model_validator
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+from decimal import Decimal
+from ..models.lesson import LessonStatus
+from ..utils.recurrence import parse_rrule
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Lessons are stored as naive wall-clock datetimes; drop the offset like the DB does."""
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+class LessonSeriesCreate(BaseModel):
+    student_id: UUID
+    dtstart: datetime
+    rrule: str
+    duration_minutes: int
+    amount: Optional[Decimal] = None
+    notes: Optional[str] = None
+
+    @field_validator('dtstart')
+    @classmethod
+    def normalize_dtstart(cls, v: datetime) -> datetime:
+        return _naive(v)
+
+    @model_validator(mode='after')
+    def validate_series(self):
+        if self.duration_minutes <= 0:
+            raise ValueError('duration_minutes must be positive')
+        parse_rrule(self.rrule, self.dtstart)
+        return self
+
+
+class LessonSeriesUpdate(BaseModel):
+    rrule: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    amount: Optional[Decimal] = None
+    notes: Optional[str] = None
+
+    @field_validator('duration_minutes')
+    @classmethod
+    def validate_duration(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and v <= 0:
+            raise ValueError('duration_minutes must be positive')
+        return v
+
+
+class LessonSeriesResponse(BaseModel):
+    id: UUID
+    user_id: UUID
+    student_id: UUID
+    dtstart: datetime
+    until: Optional[datetime]
+    rrule: str
+    duration_minutes: int
+    amount: Optional[Decimal]
+    notes: Optional[str]
+    exdates: List[datetime]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class OccurrenceRef(BaseModel):
+    """A series occurrence that may not be materialized yet."""
+    series_id: UUID
+    original_start: datetime
+
+    @field_validator('original_start')
+    @classmethod
+    def normalize_original_start(cls, v: datetime) -> datetime:
+        return _naive(v)
+
+
+class OccurrenceUpdate(BaseModel):
+    """Edit of a single occurrence; materializes it as a real lesson."""
+    original_start: datetime
+    datetime_start: Optional[datetime] = None
+    datetime_end: Optional[datetime] = None
+    status: Optional[LessonStatus] = None
+    amount: Optional[Decimal] = None
+    notes: Optional[str] = None
+
+    @field_validator('original_start')
+    @classmethod
+    def normalize_original_start(cls, v: datetime) -> datetime:
+        return _naive(v)
+
+    @model_validator(mode='after')
+    def validate_datetime_range(self):
+        if self.datetime_start is not None and self.datetime_end is not None:
+            if self.datetime_start >= self.datetime_end:
+                raise ValueError('datetime_start must be before datetime_end')
+        return self
@@ -1,19 +1,28 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 from datetime import date
 from uuid import UUID
 from decimal import Decimal
 from ..models.payment import PaymentMethod, PaymentStatusEnum
+from .lesson_series import OccurrenceRef
 
 
 class PaymentCreate(BaseModel):
     student_id: UUID
     lesson_id: Optional[UUID] = None
+    # Instead of lesson_id: a series occurrence, materialized as a lesson when paid
+    occurrence: Optional[OccurrenceRef] = None
     amount: Decimal
     payment_method: PaymentMethod
     payment_date: date
     status: Optional[PaymentStatusEnum] = PaymentStatusEnum.COMPLETED
 
+    @model_validator(mode='after')
+    def validate_lesson_reference(self):
+        if self.lesson_id is not None and self.occurrence is not None:
+            raise ValueError('Pass either lesson_id or occurrence')
+        return self
+
 
 class PaymentResponse(BaseModel):
     id: UUID
@@ -32,3 +41,26 @@ class PaymentResponse(BaseModel):
 class PaymentStats(BaseModel):
     total_amount: Decimal
     period: str
+
+
+class PaymentAllocate(BaseModel):
+    student_id: UUID
+    lesson_ids: List[UUID] = Field(default_factory=list, max_length=500)
+    # Series occurrences to pay, materialized as lessons first
+    occurrences: List[OccurrenceRef] = Field(default_factory=list, max_length=500)
+    # Total received; split over the lessons' remaining balances
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+    payment_method: PaymentMethod
+    payment_date: date
+    order: Literal["oldest_first", "largest_remaining"] = "oldest_first"
+
+    @model_validator(mode='after')
+    def validate_lessons(self):
+        if not self.lesson_ids and not self.occurrences:
+            raise ValueError('lesson_ids or occurrences must not be empty')
+        return self
+
+
+class PaymentAllocation(BaseModel):
+    payments: List[PaymentResponse]
+    allocated: Decimal
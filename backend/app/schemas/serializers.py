@@ -0,0 +1,11 @@
+"""Pre-built fast serializers for trusted list endpoints (see utils.fast_json)."""
+from ..utils.fast_json import build_serializer
+from .homework import HomeworkResponse
+from .lesson import LessonResponse
+from .payment import PaymentResponse
+from .student import StudentResponse
+
+LESSON_SERIALIZER = build_serializer(LessonResponse)
+PAYMENT_SERIALIZER = build_serializer(PaymentResponse)
+STUDENT_SERIALIZER = build_serializer(StudentResponse)
+HOMEWORK_SERIALIZER = build_serializer(HomeworkResponse)
@@ -1,8 +1,12 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
+from ..models.homework import DifficultyLevel
 from ..models.student import StudentLevel
+from .lesson import LessonResponse
+from .payment import PaymentResponse
 
 
 class StudentCreate(BaseModel):
@@ -32,6 +36,7 @@ class StudentResponse(BaseModel):
     phone: Optional[str]
     telegram_id: Optional[int]
     telegram_link_code: Optional[str]
+    telegram_link_code_expires_at: Optional[datetime] = None
     parent_name: Optional[str]
     parent_phone: Optional[str]
     subject: str
@@ -45,3 +50,59 @@ class StudentResponse(BaseModel):
 
 class TelegramLinkCode(BaseModel):
     link_code: str
+    expires_at: datetime
+
+
+class TelegramLinkClaim(BaseModel):
+    telegram_id: int
+
+
+class TelegramLinkedStudent(BaseModel):
+    student_id: UUID
+    name: str
+    subject: str
+    telegram_id: Optional[int]
+
+
+class HomeworkSummary(BaseModel):
+    """AIHomework without generated_tasks"""
+    id: UUID
+    subject: Optional[str]
+    topic: Optional[str]
+    difficulty: Optional[DifficultyLevel]
+    tasks_count: Optional[int]
+    sent_via_telegram: Optional[bool]
+    created_at: Optional[datetime]
+
+
+class LessonPage(BaseModel):
+    items: List[LessonResponse]
+    total: int
+
+
+class PaymentPage(BaseModel):
+    items: List[PaymentResponse]
+    total: int
+
+
+class HomeworkPage(BaseModel):
+    items: List[HomeworkSummary]
+    total: int
+
+
+class StudentBalance(BaseModel):
+    # Sum of lesson amounts
+    charged: Decimal
+    # Sum of completed payments
+    paid: Decimal
+    # Unpaid remainder of lessons, as in /api/payments/debtors
+    debt: Decimal
+    unpaid_lessons_count: int
+
+
+class StudentProfile(BaseModel):
+    student: StudentResponse
+    balance: StudentBalance
+    lessons: LessonPage
+    payments: PaymentPage
+    homework: HomeworkPage
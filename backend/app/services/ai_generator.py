@@ -1,12 +1,21 @@
 import json
+import sys
 import time
 import logging
-from typing import Dict, Any, List, Optional
-import httpx
-from openai import OpenAI, OpenAIError
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Type
 from ..config import settings
 from ..utils.prompts import HOMEWORK_PROMPT, PROBLEM_SECTION_TEMPLATE
 from ..utils.homework_validator import validate_homework_tasks
+from ..utils.metrics import record_ai_tokens, track_ai_call
+from ..utils.logging_config import truncate
+from ..utils.tracing import current_span, httpx_trace_hook, span, traced
+
+# The OpenAI SDK and httpx are imported on first use, so workers of deployments
+# without AI keys never load them
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +23,7 @@ OPENAI_DEFAULT_MODEL = settings.GPT_NANO_MODEL
 CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
 
 
+@traced("validate.structure")
 def validate_homework_structure(data: Dict[str, Any], expected_tasks: int) -> bool:
     """
     Validate that the homework JSON has the expected structure.
@@ -75,10 +85,21 @@ def validate_homework_structure(data: Dict[str, Any], expected_tasks: int) -> bo
     return True
 
 
-def get_openai_client() -> OpenAI:
+def _openai_errors() -> Tuple[Type[BaseException], ...]:
+    """OpenAIError once the SDK is loaded; before that no OpenAI call could have raised it"""
+    openai = sys.modules.get("openai")
+    return (openai.OpenAIError,) if openai is not None else ()
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> "OpenAI":
+    """Process-wide OpenAI client; reuses its connection pool across requests"""
     if not settings.OPENAI_API_KEY:
         raise ValueError("OpenAI API key is not configured")
 
+    import httpx
+    from openai import OpenAI
+
     if settings.OPENAI_PROXY:
         http_client = httpx.Client(
             proxies=settings.OPENAI_PROXY,
@@ -88,12 +109,33 @@ def get_openai_client() -> OpenAI:
 
     return OpenAI(api_key=settings.OPENAI_API_KEY)
 
-def get_http_client() -> httpx.Client:
+@lru_cache(maxsize=1)
+def get_http_client() -> "httpx.Client":
+    """Process-wide client for direct provider calls; do not close it"""
+    import httpx
+
     if settings.OPENAI_PROXY:
         return httpx.Client(proxies=settings.OPENAI_PROXY, timeout=300.0)
     return httpx.Client(timeout=300.0)
 
 
+def warm_up_clients() -> None:
+    """Build the provider clients of configured integrations ahead of the first request"""
+    if settings.OPENAI_API_KEY:
+        get_openai_client()
+    if settings.CLAUDE_API_KEY_EFFECTIVE:
+        get_http_client()
+
+
+def close_clients() -> None:
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+    if get_openai_client.cache_info().currsize:
+        get_openai_client().close()
+        get_openai_client.cache_clear()
+
+
 def _generate_homework_openai(
     subject: str,
     topic: str,
@@ -103,18 +145,25 @@ def _generate_homework_openai(
 ) -> Dict[str, Any]:
     client = get_openai_client()
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": "Ты опытный репетитор, который создаёт уникальные задачи для учеников. Всегда отвечай только валидным JSON.",
-            },
-            {"role": "user", "content": topic},
-        ],
-        temperature=1,
-        response_format={"type": "json_object"},
-    )
+    with span("provider.openai", model=model) as provider_span, track_ai_call("openai", model):
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Ты опытный репетитор, который создаёт уникальные задачи для учеников. Всегда отвечай только валидным JSON.",
+                },
+                {"role": "user", "content": topic},
+            ],
+            temperature=1,
+            response_format={"type": "json_object"},
+        )
+    if response.usage is not None:
+        provider_span.set(
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+        )
+        record_ai_tokens("openai", model, response.usage.prompt_tokens, response.usage.completion_tokens)
 
     content = response.choices[0].message.content
     if not content:
@@ -123,7 +172,8 @@ def _generate_homework_openai(
     
     # Validate and parse JSON with detailed error handling
     try:
-        result = json.loads(content)
+        with span("json.parse", chars=len(content)):
+            result = json.loads(content)
     except json.JSONDecodeError as e:
         logger.error(
             f"Failed to parse OpenAI response as JSON. "
@@ -171,9 +221,8 @@ def _generate_homework_claude(
         "}\n"
     )
 
-    http_client = get_http_client()
-    try:
-        resp = http_client.post(
+    with span("provider.claude", model=model) as provider_span, track_ai_call("claude", model):
+        resp = get_http_client().post(
             CLAUDE_API_URL,
             headers={
                 "x-api-key": api_key,
@@ -186,15 +235,17 @@ def _generate_homework_claude(
                 "temperature": 0.8,
                 "messages": [{"role": "user", "content": prompt}],
             },
+            extensions={"trace": httpx_trace_hook(provider_span)},
         )
-    finally:
-        http_client.close()
 
-    if resp.status_code >= 400:
-        logger.error(f"Claude API error: {resp.status_code}: {resp.text}")
-        raise ValueError("AI service temporarily unavailable. Please try again later.")
+        if resp.status_code >= 400:
+            logger.error(f"Claude API error: {resp.status_code}: {truncate(resp.text, 1000)}")
+            raise ValueError("AI service temporarily unavailable. Please try again later.")
 
     payload = resp.json()
+    usage = payload.get("usage") or {}
+    provider_span.set(prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"))
+    record_ai_tokens("claude", model, usage.get("input_tokens"), usage.get("output_tokens"))
     blocks = payload.get("content") or []
     text_parts: List[str] = []
     for b in blocks:
@@ -212,7 +263,8 @@ def _generate_homework_claude(
 
     # Validate and parse JSON with detailed error handling
     try:
-        parsed_json = json.loads(text)
+        with span("json.parse", chars=len(text)):
+            parsed_json = json.loads(text)
     except json.JSONDecodeError as e:
         logger.error(
             f"Failed to parse Claude response as JSON. "
@@ -232,6 +284,7 @@ def _generate_homework_claude(
     return parsed_json
 
 
+@traced("homework.generate")
 def generate_homework(
     subject: str,
     topic: str,
@@ -272,13 +325,15 @@ def generate_homework(
             problem_section = PROBLEM_SECTION_TEMPLATE.format(problem=topic)
             break
 
-    prompt = HOMEWORK_PROMPT.format(
-        subject=subject,
-        topic=topic,
-        level=level_text,
-        tasks_count=tasks_count,
-        problem_section=problem_section
-    )
+    current_span().set(provider=ai_provider, tasks_count=tasks_count)
+    with span("prompt.format"):
+        prompt = HOMEWORK_PROMPT.format(
+            subject=subject,
+            topic=topic,
+            level=level_text,
+            tasks_count=tasks_count,
+            problem_section=problem_section
+        )
 
     try:
         # Call selected provider
@@ -292,7 +347,7 @@ def generate_homework(
 
         # Validate structure
         if not validate_homework_structure(result, tasks_count):
-            logger.error(f"Invalid homework structure from AI({ai_provider}): {result}")
+            logger.error(f"Invalid homework structure from AI({ai_provider}): {truncate(result, 1000)}")
             raise ValueError("AI returned invalid homework structure")
 
         # Validate quality of tasks
@@ -324,7 +379,7 @@ def generate_homework(
 
         return result
 
-    except OpenAIError as e:
+    except _openai_errors() as e:
         logger.error(f"OpenAI API error: {type(e).__name__}: {str(e)}")
         raise ValueError("AI service temporarily unavailable. Please try again later.")
     except json.JSONDecodeError as e:
@@ -363,24 +418,20 @@ def test_connection(ai_provider: str = "gpt") -> Dict[str, Any]:
             
             model = settings.CLAUDE_SONNET_MODEL
             
-            http_client = get_http_client()
-            try:
-                resp = http_client.post(
-                    CLAUDE_API_URL,
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json",
-                    },
-                    json={
-                        "model": model,
-                        "max_tokens": 32,
-                        "temperature": 0,
-                        "messages": [{"role": "user", "content": "ping"}],
-                    },
-                )
-            finally:
-                http_client.close()
+            resp = get_http_client().post(
+                CLAUDE_API_URL,
+                headers={
+                    "x-api-key": api_key,
+                    "anthropic-version": "2023-06-01",
+                    "content-type": "application/json",
+                },
+                json={
+                    "model": model,
+                    "max_tokens": 32,
+                    "temperature": 0,
+                    "messages": [{"role": "user", "content": "ping"}],
+                },
+            )
             if resp.status_code >= 400:
                 raise ValueError("AI service connection failed")
             model_name = (resp.json() or {}).get("model") or model
@@ -404,7 +455,7 @@ def test_connection(ai_provider: str = "gpt") -> Dict[str, Any]:
             "latency_ms": latency_ms,
             "proxy_enabled": bool(settings.OPENAI_PROXY),
         }
-    except OpenAIError as e:
+    except _openai_errors() as e:
         logger.error(f"OpenAI connection test failed: {type(e).__name__}: {str(e)}")
         raise ValueError("AI service connection failed")
     except Exception as e:
@@ -0,0 +1,123 @@
+"""
+Dashboard summary in one request.
+
+Replaces the four list/aggregate calls the dashboard page used to make: the
+counters come from one SELECT of scalar subqueries, the week's lessons from one
+range query on (user_id, datetime_start) plus the series expansion for the same
+window, and the debtors from list_debtors limited to the top rows. Everything
+depends only on the user's data and the current date, so the endpoint can use
+the data-version ETag.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import List, Tuple
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..models.lesson import Lesson, LessonStatus
+from ..models.payment import Payment
+from ..models.student import Student
+from ..models.user import User
+from .lesson_payments import list_debtors
+from .lesson_series import expand_series_window
+
+WEEK_DAYS = 7
+UPCOMING_LIMIT = 5
+TOP_DEBTORS_LIMIT = 5
+
+
+def month_bounds(day: date) -> Tuple[date, date]:
+    """First day of the month and first day of the next one"""
+    start = day.replace(day=1)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def _week_lessons(db: Session, user_id: UUID, window_start: datetime, window_end: datetime) -> List[dict]:
+    rows = (
+        db.query(
+            Lesson.id,
+            Lesson.student_id,
+            Student.name.label("student_name"),
+            Lesson.datetime_start,
+            Lesson.datetime_end,
+            Lesson.status,
+            Lesson.payment_status,
+            Lesson.amount,
+            Lesson.series_id,
+        )
+        .join(Student, Student.id == Lesson.student_id)
+        .filter(
+            Lesson.user_id == user_id,
+            Lesson.datetime_start >= window_start,
+            Lesson.datetime_start <= window_end,
+            Lesson.status != LessonStatus.CANCELLED,
+        )
+        .all()
+    )
+    lessons = [dict(row._mapping) for row in rows]
+
+    occurrences = expand_series_window(db, user_id, window_start, window_end)
+    if occurrences:
+        names = dict(
+            db.query(Student.id, Student.name)
+            .filter(Student.id.in_({occurrence["student_id"] for occurrence in occurrences}))
+            .all()
+        )
+        for occurrence in occurrences:
+            occurrence["student_name"] = names.get(occurrence["student_id"], "")
+        lessons.extend(occurrences)
+
+    lessons.sort(key=lambda lesson: lesson["datetime_start"])
+    return lessons
+
+
+def build_summary(db: Session, user: User, today: date) -> dict:
+    """Dashboard data for the user as of the given date"""
+    month_start, next_month = month_bounds(today)
+    students_count = (
+        select(func.count(Student.id))
+        .where(Student.user_id == user.id)
+        .scalar_subquery()
+    )
+    # Same scope as /api/payments/stats, as a range on (user_id, payment_date)
+    monthly_income = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(
+            Payment.user_id == user.id,
+            Payment.payment_date >= month_start,
+            Payment.payment_date < next_month,
+        )
+        .scalar_subquery()
+    )
+    counters = db.execute(
+        select(students_count.label("students_count"), monthly_income.label("monthly_income"))
+    ).one()
+
+    window_start = datetime.combine(today, time.min)
+    window_end = datetime.combine(today + timedelta(days=WEEK_DAYS - 1), time.max)
+    lessons = _week_lessons(db, user.id, window_start, window_end)
+    today_end = datetime.combine(today, time.max)
+
+    debtors = list_debtors(db, user.id, limit=TOP_DEBTORS_LIMIT)
+
+    return {
+        "students_count": counters.students_count,
+        "today_lessons": [lesson for lesson in lessons if lesson["datetime_start"] <= today_end],
+        "week_lessons_count": len(lessons),
+        "upcoming_lessons": lessons[:UPCOMING_LIMIT],
+        "monthly_income": counters.monthly_income,
+        "period": f"{today.year}-{today.month:02d}",
+        "debtors_count": debtors[0].debtors_count if debtors else 0,
+        "top_debtors": [
+            {
+                "student_id": row.student_id,
+                "student_name": row.student_name,
+                "total_debt": row.total_debt,
+                "unpaid_lessons_count": int(row.unpaid_lessons_count or 0),
+            }
+            for row in debtors
+        ],
+        "subscription_tier": user.subscription_tier,
+        "ai_credits_left": user.ai_credits_left,
+    }
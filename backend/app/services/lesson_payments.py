@@ -0,0 +1,197 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from ..models.lesson import Lesson, PaymentStatus as LessonPaymentStatus
+from ..models.payment import Payment, PaymentStatusEnum
+from ..models.student import Student
+
+
+def compute_payment_status(
+    amount: Optional[Decimal],
+    paid_amount: Optional[Decimal],
+) -> LessonPaymentStatus:
+    """Derive lesson payment status from lesson amount and sum of completed payments."""
+    if amount is None:
+        return LessonPaymentStatus.UNPAID
+
+    paid = Decimal(paid_amount or 0)
+    remaining = Decimal(amount) - paid
+    if remaining <= 0:
+        return LessonPaymentStatus.PAID
+    if paid <= 0:
+        return LessonPaymentStatus.UNPAID
+    return LessonPaymentStatus.PARTIAL
+
+
+def recalculate_payment_statuses(db: Session, lesson_ids: Iterable[UUID]) -> int:
+    """
+    Recalculate payment_status for a set of lessons.
+
+    Uses one aggregate query for all lessons and one executemany UPDATE,
+    instead of a SUM query per lesson. Does not commit.
+
+    Returns:
+        Number of lessons updated
+    """
+    lesson_ids = list({lid for lid in lesson_ids if lid is not None})
+    if not lesson_ids:
+        return 0
+
+    paid_amount = func.coalesce(func.sum(Payment.amount), 0).label("paid_amount")
+    rows = (
+        db.query(Lesson.id, Lesson.datetime_start, Lesson.amount, paid_amount)
+        .outerjoin(
+            Payment,
+            and_(
+                Payment.lesson_id == Lesson.id,
+                Payment.status == PaymentStatusEnum.COMPLETED,
+            ),
+        )
+        .filter(Lesson.id.in_(lesson_ids))
+        # The primary key of the partitioned table, so Lesson columns are grouped too
+        .group_by(Lesson.id, Lesson.datetime_start)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    # Bulk UPDATE by primary key needs the whole table key (id, datetime_start)
+    db.execute(
+        update(Lesson),
+        [
+            {
+                "id": row.id,
+                "datetime_start": row.datetime_start,
+                "payment_status": compute_payment_status(row.amount, row.paid_amount),
+            }
+            for row in rows
+        ],
+    )
+    return len(rows)
+
+
+def list_debtors(db: Session, user_id: UUID, limit: Optional[int] = None) -> List[Row]:
+    """
+    Students with unpaid lesson amounts, largest debt first.
+
+    Rows carry student_id, student_name, total_debt, unpaid_lessons_count and
+    debtors_count (all debtors, also when limit cuts the list), in one query.
+    """
+    # Remaining per lesson (amount - sum(completed payments)), lessons without amount ignored
+    paid_amount = func.coalesce(func.sum(Payment.amount), 0).label("paid_amount")
+    remaining = func.greatest((Lesson.amount - paid_amount), 0).label("remaining_amount")
+
+    per_lesson = (
+        db.query(
+            Lesson.student_id.label("student_id"),
+            remaining,
+        )
+        .outerjoin(
+            Payment,
+            and_(
+                Payment.lesson_id == Lesson.id,
+                Payment.status == PaymentStatusEnum.COMPLETED,
+            ),
+        )
+        .filter(
+            Lesson.user_id == user_id,
+            Lesson.amount.isnot(None),
+        )
+        # The primary key of the partitioned table, so Lesson columns are grouped too
+        .group_by(Lesson.id, Lesson.datetime_start)
+        .subquery()
+    )
+
+    unpaid_count = func.sum(
+        case(
+            (per_lesson.c.remaining_amount > 0, 1),
+            else_=0,
+        )
+    ).label("unpaid_lessons_count")
+    total_debt = func.coalesce(func.sum(per_lesson.c.remaining_amount), 0).label("total_debt")
+
+    query = (
+        db.query(
+            Student.id.label("student_id"),
+            Student.name.label("student_name"),
+            total_debt,
+            unpaid_count,
+            func.count().over().label("debtors_count"),
+        )
+        .join(per_lesson, per_lesson.c.student_id == Student.id)
+        .filter(Student.user_id == user_id)
+        .group_by(Student.id, Student.name)
+        .having(func.sum(per_lesson.c.remaining_amount) > 0)
+        .order_by(total_debt.desc(), Student.name)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+class LessonBalance(NamedTuple):
+    id: UUID
+    datetime_start: datetime
+    amount: Optional[Decimal]
+    remaining: Optional[Decimal]
+
+
+def lock_lesson_balances(
+    db: Session,
+    user_id: UUID,
+    student_id: UUID,
+    lesson_ids: Iterable[UUID],
+) -> List[LessonBalance]:
+    """
+    Remaining amounts of the student's lessons, with the lesson rows locked
+    FOR UPDATE so concurrent payments for the same lessons are serialized.
+    """
+    paid_amount = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.lesson_id == Lesson.id, Payment.status == PaymentStatusEnum.COMPLETED)
+        .correlate(Lesson)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(Lesson.id, Lesson.datetime_start, Lesson.amount, (Lesson.amount - paid_amount).label("remaining"))
+        .where(
+            Lesson.user_id == user_id,
+            Lesson.student_id == student_id,
+            Lesson.id.in_(list(lesson_ids)),
+        )
+        .with_for_update(of=Lesson)
+    ).all()
+    return [LessonBalance(*row) for row in rows]
+
+
+def allocate_amount(
+    lessons: Sequence[LessonBalance],
+    amount: Decimal,
+    order: str = "oldest_first",
+) -> List[Tuple[UUID, Decimal]]:
+    """
+    Split amount over the lessons' remaining balances: oldest lesson first, or
+    largest remaining balance first. Fully paid lessons get nothing; raises
+    ValueError when amount exceeds the total remaining.
+    """
+    if order == "largest_remaining":
+        ordered = sorted(lessons, key=lambda lesson: (-lesson.remaining, lesson.datetime_start))
+    else:
+        ordered = sorted(lessons, key=lambda lesson: lesson.datetime_start)
+
+    left = Decimal(amount)
+    allocation = []
+    for lesson in ordered:
+        if left <= 0:
+            break
+        share = min(left, Decimal(lesson.remaining))
+        if share > 0:
+            allocation.append((lesson.id, share))
+            left -= share
+    if left > 0:
+        raise ValueError(f"Amount exceeds the remaining balance of the lessons by {left}")
+    return allocation
@@ -0,0 +1,145 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from ..models.lesson import Lesson, LessonStatus, PaymentStatus as LessonPaymentStatus
+from ..models.lesson_series import LessonSeries
+from ..utils.recurrence import parse_rrule, expand_occurrences, last_occurrence_bound
+
+
+def occurrence_id(series_id: uuid.UUID, original_start: datetime) -> uuid.UUID:
+    """
+    Stable id of a series occurrence.
+
+    The same id is used for the virtual occurrence and for the Lesson row
+    created when it is materialized, so clients keep a single identifier.
+    """
+    return uuid.uuid5(series_id, original_start.isoformat())
+
+
+def series_until(rrule: str, dtstart: datetime) -> Optional[datetime]:
+    """Upper bound of the series used to skip finished series in window queries."""
+    return last_occurrence_bound(parse_rrule(rrule, dtstart), dtstart)
+
+
+def is_occurrence(series: LessonSeries, original_start: datetime) -> bool:
+    """Check that original_start is a (not cancelled) occurrence of the series."""
+    rule = parse_rrule(series.rrule, series.dtstart)
+    return bool(expand_occurrences(
+        rule, series.dtstart, original_start, original_start, series.exdates or ()
+    ))
+
+
+def expand_series_window(
+    db: Session,
+    user_id: uuid.UUID,
+    window_start: datetime,
+    window_end: datetime,
+    student_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Expand the user's lesson series into virtual lessons for the given window.
+
+    Occurrences that were already materialized as Lesson rows are skipped:
+    those rows are returned by the regular lesson query. Cost is proportional
+    to the window, not to the length of the series.
+    """
+    query = db.query(LessonSeries).filter(
+        LessonSeries.user_id == user_id,
+        LessonSeries.dtstart <= window_end,
+        or_(LessonSeries.until.is_(None), LessonSeries.until >= window_start),
+    )
+    if student_id:
+        query = query.filter(LessonSeries.student_id == student_id)
+    series_list = query.all()
+    if not series_list:
+        return []
+
+    overridden = set(
+        db.query(Lesson.series_id, Lesson.original_start).filter(
+            Lesson.user_id == user_id,
+            Lesson.series_id.in_([series.id for series in series_list]),
+            Lesson.original_start >= window_start,
+            Lesson.original_start <= window_end,
+        ).all()
+    )
+
+    result: List[dict] = []
+    for series in series_list:
+        rule = parse_rrule(series.rrule, series.dtstart)
+        duration = timedelta(minutes=series.duration_minutes)
+        for start in expand_occurrences(
+            rule, series.dtstart, window_start, window_end, series.exdates or ()
+        ):
+            if (series.id, start) in overridden:
+                continue
+            result.append({
+                "id": occurrence_id(series.id, start),
+                "user_id": series.user_id,
+                "student_id": series.student_id,
+                "datetime_start": start,
+                "datetime_end": start + duration,
+                "status": LessonStatus.SCHEDULED,
+                "payment_status": LessonPaymentStatus.UNPAID,
+                "amount": series.amount,
+                "remaining_amount": series.amount,
+                "notes": series.notes,
+                "series_id": series.id,
+                "original_start": start,
+                "is_virtual": True,
+            })
+    return result
+
+
+def materialize_occurrence(db: Session, series: LessonSeries, original_start: datetime) -> Lesson:
+    """
+    Return the Lesson row for an occurrence, creating it from the series if needed.
+
+    Does not commit. Raises ValueError if original_start is not an occurrence.
+    """
+    lesson = db.query(Lesson).filter(
+        Lesson.series_id == series.id,
+        Lesson.original_start == original_start,
+    ).first()
+    if lesson is not None:
+        return lesson
+
+    if not is_occurrence(series, original_start):
+        raise ValueError("original_start is not an occurrence of this series")
+
+    lesson = Lesson(
+        id=occurrence_id(series.id, original_start),
+        user_id=series.user_id,
+        student_id=series.student_id,
+        datetime_start=original_start,
+        datetime_end=original_start + timedelta(minutes=series.duration_minutes),
+        status=LessonStatus.SCHEDULED,
+        payment_status=LessonPaymentStatus.UNPAID,
+        amount=series.amount,
+        notes=series.notes,
+        series_id=series.id,
+        original_start=original_start,
+    )
+    db.add(lesson)
+    db.flush()
+    return lesson
+
+
+def materialize_user_occurrence(
+    db: Session,
+    user_id: uuid.UUID,
+    series_id: uuid.UUID,
+    original_start: datetime,
+) -> Optional[Lesson]:
+    """
+    materialize_occurrence for a series of the user; None when the user has no
+    such series. Does not commit. Raises ValueError like materialize_occurrence.
+    """
+    series = db.query(LessonSeries).filter(
+        LessonSeries.id == series_id,
+        LessonSeries.user_id == user_id,
+    ).first()
+    if series is None:
+        return None
+    return materialize_occurrence(db, series, original_start)
@@ -0,0 +1,130 @@
+"""
+Telegram link codes: short codes a student types into the bot to link a chat.
+
+A code is assigned with one UPDATE ... RETURNING guarded by the unique index
+on students.telegram_link_code; a collision is an IntegrityError, retried with
+a fresh code inside a savepoint instead of probing for free codes with SELECTs
+first. Codes expire after TELEGRAM_LINK_CODE_TTL_MINUTES. An expired code keeps
+its index entry until it is claimed again: a collision with it releases it and
+the allocation retries the same code, so the 36^6 space never fills up with
+abandoned codes.
+"""
+import secrets
+import string
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.student import Student
+from ..utils.clock import utcnow
+from ..utils.data_version import bump_data_version
+
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 6
+# Each attempt collides with probability (codes in use) / 36^6
+MAX_ATTEMPTS = 5
+
+
+class LinkCodeConflict(Exception):
+    """No free code after MAX_ATTEMPTS collisions"""
+
+
+class LinkCode(NamedTuple):
+    link_code: str
+    expires_at: datetime
+
+
+class LinkedStudent(NamedTuple):
+    id: UUID
+    user_id: UUID
+    name: str
+    subject: str
+    telegram_id: Optional[int]
+
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper()
+
+
+def _new_code() -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def _release_expired(db: Session, code: str, now: datetime) -> bool:
+    """Free the code if its current holder has expired"""
+    result = db.execute(
+        update(Student)
+        .where(Student.telegram_link_code == code, Student.telegram_link_code_expires_at <= now)
+        .values(telegram_link_code=None, telegram_link_code_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def allocate_link_code(db: Session, student_id, user_id: UUID) -> Optional[LinkCode]:
+    """
+    Give the student a new link code, replacing any previous one. Returns None
+    when the student does not belong to the user; raises LinkCodeConflict after
+    MAX_ATTEMPTS collisions. Does not commit.
+    """
+    now = utcnow()
+    expires_at = now + timedelta(minutes=settings.TELEGRAM_LINK_CODE_TTL_MINUTES)
+    code = _new_code()
+    for _ in range(MAX_ATTEMPTS):
+        try:
+            with db.begin_nested():
+                assigned = db.execute(
+                    update(Student)
+                    .where(Student.id == student_id, Student.user_id == user_id)
+                    .values(telegram_link_code=code, telegram_link_code_expires_at=expires_at)
+                    .returning(Student.telegram_link_code, Student.telegram_link_code_expires_at)
+                    .execution_options(synchronize_session=False)
+                ).first()
+        except IntegrityError:
+            # The savepoint is rolled back; an expired holder gives the code up
+            if not _release_expired(db, code, now):
+                code = _new_code()
+            continue
+        if assigned is None:
+            return None
+        bump_data_version(db, [user_id])
+        return LinkCode(*assigned)
+    raise LinkCodeConflict(f"No free link code after {MAX_ATTEMPTS} attempts")
+
+
+def resolve_link_code(db: Session, code: str) -> Optional[LinkedStudent]:
+    """Student holding an unexpired code, in one indexed query"""
+    row = db.execute(
+        select(Student.id, Student.user_id, Student.name, Student.subject, Student.telegram_id)
+        .where(
+            Student.telegram_link_code == normalize_code(code),
+            Student.telegram_link_code_expires_at > utcnow(),
+        )
+    ).first()
+    return LinkedStudent(*row) if row else None
+
+
+def claim_link_code(db: Session, code: str, telegram_id: int) -> Optional[LinkedStudent]:
+    """
+    Link the chat to the student holding the code and spend the code. Returns
+    None for an unknown or expired code; raises IntegrityError when the chat is
+    already linked to another student. Does not commit.
+    """
+    row = db.execute(
+        update(Student)
+        .where(
+            Student.telegram_link_code == normalize_code(code),
+            Student.telegram_link_code_expires_at > utcnow(),
+        )
+        .values(telegram_id=telegram_id, telegram_link_code=None, telegram_link_code_expires_at=None)
+        .returning(Student.id, Student.user_id, Student.name, Student.subject, Student.telegram_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+    student = LinkedStudent(*row)
+    bump_data_version(db, [student.user_id])
+    return student
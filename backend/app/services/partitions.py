@@ -0,0 +1,183 @@
+"""
+Monthly range partitions of lessons (by datetime_start) and payments (by payment_date).
+
+Each month is a partition named {table}_pYYYY_MM; rows outside every month
+land in {table}_default. Queries with a range on the partition key (calendar
+week, monthly stats, this month's dashboard) are pruned to the partitions of
+that range by the planner.
+
+ensure_partitions creates the partitions of the current month and
+PARTITION_MONTHS_AHEAD months ahead. Rows that already fell into the default
+partition for such a month are moved into the new partition in the same
+transaction, since PostgreSQL refuses to attach a range the default
+partition has rows for.
+
+archive_partitions detaches whole months before a cut-off and moves them
+into the archive schema: they stay queryable as archive.{table}_pYYYY_MM but
+drop out of every application query, including debt and stats. Archive
+lessons and payments of the same months together.
+"""
+import logging
+import re
+from datetime import date
+from typing import List, NamedTuple, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.lesson import Lesson
+from ..models.payment import Payment
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = "archive"
+# Key of the transaction-level advisory lock serializing partition maintenance
+ADVISORY_LOCK_KEY = 4_902_117
+PARTITION_NAME_RE = re.compile(r"^(lessons|payments)_(p(\d{4})_(\d{2})|default)$")
+
+
+class PartitionSpec(NamedTuple):
+    table: str
+    column: str
+    # Columns to copy when moving rows; generated columns are recomputed
+    columns: List[str]
+
+
+PARTITIONED_TABLES = [
+    PartitionSpec(
+        model.__tablename__,
+        column,
+        [c.name for c in model.__table__.columns if c.computed is None],
+    )
+    for model, column in ((Lesson, "datetime_start"), (Payment, "payment_date"))
+]
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after the month of day"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partition(name: str) -> bool:
+    """Whether a table name is one of the partitions managed here"""
+    return PARTITION_NAME_RE.match(name) is not None
+
+
+def _attached_partitions(db: Session, table: str) -> List[str]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    ).scalars()
+    return list(rows)
+
+
+def _lock(db: Session) -> None:
+    """Serialize maintenance of all workers until the transaction ends"""
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+def _create_partition(db: Session, spec: PartitionSpec, month: date, has_default: bool) -> None:
+    name = partition_name(spec.table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    columns = ", ".join(spec.columns)
+    moved = 0
+    if has_default:
+        db.execute(text(
+            f"CREATE TEMPORARY TABLE partition_rows ON COMMIT DROP AS"
+            f" SELECT {columns} FROM {default_partition_name(spec.table)} WITH NO DATA"
+        ))
+        moved = db.execute(text(
+            f"WITH moved AS ("
+            f" DELETE FROM {default_partition_name(spec.table)}"
+            f" WHERE {spec.column} >= '{start}' AND {spec.column} < '{end}'"
+            f" RETURNING {columns})"
+            f" INSERT INTO partition_rows SELECT * FROM moved"
+        )).rowcount
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {spec.table}"
+        f" FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    if has_default:
+        db.execute(text(f"INSERT INTO {spec.table} ({columns}) SELECT {columns} FROM partition_rows"))
+        db.execute(text("DROP TABLE partition_rows"))
+    logger.info(f"Created partition {name} ({moved} row(s) moved from the default partition)")
+
+
+def ensure_partitions(db: Session, today: date, months_ahead: int) -> List[str]:
+    """
+    Create missing partitions from the month of today to months_ahead months
+    later. Returns the created names. Does not commit.
+    """
+    _lock(db)
+    created = []
+    for spec in PARTITIONED_TABLES:
+        attached = set(_attached_partitions(db, spec.table))
+        has_default = default_partition_name(spec.table) in attached
+        for offset in range(months_ahead + 1):
+            month = add_months(today, offset)
+            if partition_name(spec.table, month) not in attached:
+                _create_partition(db, spec, month, has_default)
+                created.append(partition_name(spec.table, month))
+    return created
+
+
+def archive_partitions(db: Session, before: date) -> List[str]:
+    """
+    Detach the monthly partitions of months before `before` and move them to
+    the archive schema. Returns the archived names. Does not commit.
+    """
+    _lock(db)
+    db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+    archived = []
+    for spec in PARTITIONED_TABLES:
+        for name in sorted(_attached_partitions(db, spec.table)):
+            match = PARTITION_NAME_RE.match(name)
+            if match is None or match.group(3) is None:
+                continue
+            if date(int(match.group(3)), int(match.group(4)), 1) >= before:
+                continue
+            db.execute(text(f"ALTER TABLE {spec.table} DETACH PARTITION {name}"))
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            archived.append(name)
+            logger.info(f"Archived partition {name}")
+    return archived
+
+
+def maintain_partitions(db: Session, today: Optional[date] = None) -> dict:
+    """
+    Create partitions ahead and, with PARTITION_ARCHIVE_AFTER_MONTHS set,
+    archive older months. Commits.
+    """
+    today = today or date.today()
+    created = ensure_partitions(db, today, settings.PARTITION_MONTHS_AHEAD)
+    archived = []
+    if settings.PARTITION_ARCHIVE_AFTER_MONTHS:
+        archived = archive_partitions(db, add_months(today, -settings.PARTITION_ARCHIVE_AFTER_MONTHS))
+    db.commit()
+    return {"created": created, "archived": archived}
+
+
+def run_startup_maintenance() -> None:
+    """Lifespan hook; a failure is logged and does not block startup"""
+    try:
+        with SessionLocal() as db:
+            result = maintain_partitions(db)
+    except Exception as e:
+        logger.warning(f"Partition maintenance failed: {type(e).__name__}: {e}")
+        return
+    logger.info(
+        f"Partition maintenance: {len(result['created'])} created, {len(result['archived'])} archived"
+    )
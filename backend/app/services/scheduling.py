@@ -0,0 +1,151 @@
+"""
+Overlap checks and free-slot search for a tutor's schedule.
+
+lessons.time_range is a generated tsrange(datetime_start, datetime_end, '[)')
+with a GiST index on (user_id, time_range), so both the conflict check and
+the busy-time aggregation are index range scans rather than calendar loads.
+Cancelled lessons never conflict. Occurrences of lesson series are not rows
+yet; they are expanded for the window (lesson_series.expand_series_window)
+and checked alongside.
+
+There is no exclusion constraint: existing data may already overlap and
+imports must not fail on it. Concurrent writers for one tutor are serialized
+by lock_schedule instead.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+import uuid
+from sqlalchemy import bindparam, cast, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.types import DateTime
+from ..models.lesson import Lesson, LessonStatus
+from ..models.user import User
+from .lesson_series import expand_series_window
+
+# Series occurrences starting this long before a window can still overlap it
+MAX_LESSON_DURATION = timedelta(days=1)
+MAX_REPORTED_CONFLICTS = 20
+
+
+def lock_schedule(db: Session, user_id: uuid.UUID) -> None:
+    """Serialize schedule changes of one tutor until the transaction ends"""
+    db.query(User.id).filter(User.id == user_id).with_for_update().scalar()
+
+
+def _series_busy(db: Session, user_id: uuid.UUID, start: datetime, end: datetime) -> List[dict]:
+    """Not yet materialized series occurrences overlapping [start, end)"""
+    return [
+        occurrence
+        for occurrence in expand_series_window(db, user_id, start - MAX_LESSON_DURATION, end)
+        if occurrence["datetime_start"] < end and occurrence["datetime_end"] > start
+    ]
+
+
+def find_conflicts(
+    db: Session,
+    user_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    exclude_lesson_id: Optional[uuid.UUID] = None,
+) -> List[dict]:
+    """Lessons and series occurrences of the tutor overlapping [start, end)"""
+    query = db.query(
+        Lesson.id,
+        Lesson.student_id,
+        Lesson.datetime_start,
+        Lesson.datetime_end,
+        Lesson.series_id,
+    ).filter(
+        Lesson.user_id == user_id,
+        Lesson.status != LessonStatus.CANCELLED,
+        # Cast like the column assignment does, also for timezone-aware input
+        Lesson.time_range.overlaps(func.tsrange(cast(start, DateTime), cast(end, DateTime), "[)")),
+    )
+    if exclude_lesson_id is not None:
+        query = query.filter(Lesson.id != exclude_lesson_id)
+    conflicts = [
+        {**row._mapping, "is_virtual": False}
+        for row in query.order_by(Lesson.datetime_start).limit(MAX_REPORTED_CONFLICTS)
+    ]
+    for occurrence in _series_busy(db, user_id, start, end):
+        conflicts.append({
+            "id": occurrence["id"],
+            "student_id": occurrence["student_id"],
+            "datetime_start": occurrence["datetime_start"],
+            "datetime_end": occurrence["datetime_end"],
+            "series_id": occurrence["series_id"],
+            "is_virtual": True,
+        })
+    conflicts.sort(key=lambda conflict: conflict["datetime_start"])
+    return conflicts[:MAX_REPORTED_CONFLICTS]
+
+
+# Working hours of every day minus the tutor's busy ranges, with multirange
+# arithmetic (PostgreSQL 14+). Busy time is the union of lessons (GiST range
+# scan) and series occurrences passed in as arrays.
+FREE_SLOTS_SQL = text("""
+WITH work AS (
+    SELECT tsrange(day + CAST(:day_start AS time), day + CAST(:day_end AS time), '[)') AS hours
+    FROM (
+        SELECT CAST(:first_day AS date) + offset_days AS day
+        FROM generate_series(0, :days - 1) AS offset_days
+    ) AS days
+),
+busy AS (
+    SELECT time_range AS span
+    FROM lessons
+    WHERE user_id = :user_id
+      AND status <> 'CANCELLED'
+      AND time_range && tsrange(:window_start, :window_end, '[)')
+    UNION ALL
+    SELECT tsrange(occurrence.starts_at, occurrence.ends_at, '[)')
+    FROM unnest(CAST(:series_starts AS timestamp[]), CAST(:series_ends AS timestamp[]))
+        AS occurrence(starts_at, ends_at)
+),
+taken AS (
+    SELECT coalesce(range_agg(span), '{}'::tsmultirange) AS spans FROM busy
+)
+SELECT greatest(lower(slot), :not_before) AS start, upper(slot) AS "end"
+FROM work, taken, unnest(tsmultirange(work.hours) - taken.spans) AS slot
+WHERE upper(slot) - greatest(lower(slot), :not_before) >= :min_duration
+ORDER BY lower(slot)
+""").bindparams(
+    bindparam("user_id", type_=UUID(as_uuid=True)),
+    bindparam("series_starts", type_=ARRAY(DateTime)),
+    bindparam("series_ends", type_=ARRAY(DateTime)),
+)
+
+
+def free_slots(
+    db: Session,
+    user_id: uuid.UUID,
+    first_day: date,
+    last_day: date,
+    day_start: time,
+    day_end: time,
+    min_duration: timedelta,
+    not_before: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    Free windows of at least min_duration within working hours
+    [day_start, day_end) of every day from first_day to last_day. Windows
+    are cut to start no earlier than not_before (usually now).
+    """
+    window_start = datetime.combine(first_day, day_start)
+    window_end = datetime.combine(last_day, day_end)
+    occurrences = _series_busy(db, user_id, window_start, window_end)
+    rows = db.execute(FREE_SLOTS_SQL, {
+        "user_id": user_id,
+        "first_day": first_day,
+        "days": (last_day - first_day).days + 1,
+        "day_start": day_start,
+        "day_end": day_end,
+        "window_start": window_start,
+        "window_end": window_end,
+        "series_starts": [occurrence["datetime_start"] for occurrence in occurrences],
+        "series_ends": [occurrence["datetime_end"] for occurrence in occurrences],
+        "min_duration": min_duration,
+        "not_before": not_before or window_start,
+    }).all()
+    return [{"start": row.start, "end": row.end} for row in rows]
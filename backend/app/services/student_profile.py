@@ -0,0 +1,158 @@
+"""
+One student's profile: the student, balance totals and paginated history.
+
+Every query is scoped by student_id and served by the (student_id, date)
+indexes, so the work and the payload grow with one student's history rather
+than the whole account. Paid amounts per lesson come from a correlated
+subquery, evaluated only for the rows on the requested page.
+"""
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..models.homework import AIHomework
+from ..models.lesson import Lesson
+from ..models.payment import Payment, PaymentStatusEnum
+from ..models.student import Student
+from .lesson_payments import compute_payment_status
+
+
+def _paid_per_lesson():
+    return (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.lesson_id == Lesson.id, Payment.status == PaymentStatusEnum.COMPLETED)
+        .correlate(Lesson)
+        .scalar_subquery()
+    )
+
+
+def _balance(db: Session, student_id: UUID) -> dict:
+    """Totals and section sizes in one SELECT of scalar subqueries"""
+    paid_per_lesson = _paid_per_lesson()
+    remaining = func.greatest(Lesson.amount - paid_per_lesson, 0)
+    per_lesson = (
+        select(Lesson.amount.label("amount"), remaining.label("remaining"))
+        .where(Lesson.student_id == student_id, Lesson.amount.isnot(None))
+        .subquery()
+    )
+    lessons = (
+        select(
+            func.coalesce(func.sum(per_lesson.c.amount), 0).label("charged"),
+            func.coalesce(func.sum(per_lesson.c.remaining), 0).label("debt"),
+            func.count().filter(per_lesson.c.remaining > 0).label("unpaid_lessons_count"),
+        )
+        .subquery()
+    )
+    row = db.execute(
+        select(
+            lessons.c.charged,
+            lessons.c.debt,
+            lessons.c.unpaid_lessons_count,
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(Payment.student_id == student_id, Payment.status == PaymentStatusEnum.COMPLETED)
+            .scalar_subquery()
+            .label("paid"),
+            select(func.count()).select_from(Lesson).where(Lesson.student_id == student_id)
+            .scalar_subquery()
+            .label("lessons_total"),
+            select(func.count()).select_from(Payment).where(Payment.student_id == student_id)
+            .scalar_subquery()
+            .label("payments_total"),
+            select(func.count()).select_from(AIHomework).where(AIHomework.student_id == student_id)
+            .scalar_subquery()
+            .label("homework_total"),
+        )
+    ).one()
+    return dict(row._mapping)
+
+
+def _lesson_page(db: Session, student_id: UUID, limit: int, offset: int) -> list:
+    rows = db.execute(
+        select(Lesson, _paid_per_lesson().label("paid_amount"))
+        .where(Lesson.student_id == student_id)
+        .order_by(Lesson.datetime_start.desc(), Lesson.id)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    items = []
+    for lesson, paid in rows:
+        if lesson.amount is None:
+            payment_status, remaining = lesson.payment_status, None
+        else:
+            payment_status = compute_payment_status(lesson.amount, paid)
+            remaining = max(Decimal(lesson.amount) - Decimal(paid or 0), Decimal("0.00"))
+        items.append({
+            "id": lesson.id,
+            "user_id": lesson.user_id,
+            "student_id": lesson.student_id,
+            "datetime_start": lesson.datetime_start,
+            "datetime_end": lesson.datetime_end,
+            "status": lesson.status,
+            "payment_status": payment_status,
+            "amount": lesson.amount,
+            "remaining_amount": remaining,
+            "notes": lesson.notes,
+            "series_id": lesson.series_id,
+            "original_start": lesson.original_start,
+        })
+    return items
+
+
+def build_profile(
+    db: Session,
+    student_id,
+    user_id: UUID,
+    limit: int,
+    lessons_offset: int = 0,
+    payments_offset: int = 0,
+    homework_offset: int = 0,
+) -> Optional[dict]:
+    """Profile of the user's student, or None when it does not exist"""
+    student = db.query(Student).filter(
+        Student.id == student_id,
+        Student.user_id == user_id
+    ).first()
+    if student is None:
+        return None
+
+    balance = _balance(db, student.id)
+    payments = (
+        db.query(Payment)
+        .filter(Payment.student_id == student.id)
+        .order_by(Payment.payment_date.desc(), Payment.id)
+        .limit(limit)
+        .offset(payments_offset)
+        .all()
+    )
+    homework = db.execute(
+        select(
+            AIHomework.id,
+            AIHomework.subject,
+            AIHomework.topic,
+            AIHomework.difficulty,
+            AIHomework.tasks_count,
+            AIHomework.sent_via_telegram,
+            AIHomework.created_at,
+        )
+        .where(AIHomework.student_id == student.id)
+        .order_by(AIHomework.created_at.desc(), AIHomework.id)
+        .limit(limit)
+        .offset(homework_offset)
+    ).all()
+
+    return {
+        "student": student,
+        "balance": {
+            "charged": balance["charged"],
+            "paid": balance["paid"],
+            "debt": balance["debt"],
+            "unpaid_lessons_count": balance["unpaid_lessons_count"],
+        },
+        "lessons": {
+            "items": _lesson_page(db, student.id, limit, lessons_offset),
+            "total": balance["lessons_total"],
+        },
+        "payments": {"items": payments, "total": balance["payments_total"]},
+        "homework": {"items": [dict(row._mapping) for row in homework], "total": balance["homework_total"]},
+    }
@@ -0,0 +1,159 @@
+"""
+Telegram Bot API client for outgoing worksheets.
+
+Messages go through one httpx.AsyncClient per worker. SendRateLimiter spaces
+sends to the global TELEGRAM_RATE_LIMIT and TELEGRAM_CHAT_INTERVAL per chat,
+and a 429 answer pauses all sends for the retry_after Telegram asks for.
+send_deliveries sends a batch concurrently across chats and in order within a
+chat; it has no database access, so the outbox (telegram_outbox.py) and the
+benchmark against a local Bot API stand-in share it.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence
+from uuid import UUID
+from ..config import settings
+
+# Imported lazily: only deployments with a bot token need httpx
+if TYPE_CHECKING:
+    import httpx
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+class TelegramError(Exception):
+    """
+    Failed sendMessage call. retry_after is set for flood-control (429) answers;
+    permanent errors (chat not found, bot blocked by the user) are not retried.
+    """
+
+    def __init__(self, description: str, retry_after: Optional[float] = None, permanent: bool = False):
+        super().__init__(description)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+def get_client() -> "httpx.AsyncClient":
+    """Worker-wide client; the bot token is part of the base URL"""
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            base_url=f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}",
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def send_message(chat_id: int, text: str) -> None:
+    """sendMessage with HTML formatting; raises TelegramError"""
+    import httpx
+
+    try:
+        response = await get_client().post(
+            "/sendMessage",
+            json={
+                "chat_id": chat_id,
+                "text": text,
+                "parse_mode": "HTML",
+                "disable_web_page_preview": True,
+            },
+        )
+        data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        raise TelegramError(f"{type(e).__name__}: {e}")
+
+    if data.get("ok"):
+        return
+    description = data.get("description") or f"HTTP {response.status_code}"
+    parameters = data.get("parameters") or {}
+    if response.status_code == 429 or "retry_after" in parameters:
+        raise TelegramError(description, retry_after=float(parameters.get("retry_after", 1)))
+    # 400 (chat not found, bad markup) and 403 (bot blocked) will not succeed on retry
+    raise TelegramError(description, permanent=response.status_code in (400, 403))
+
+
+class SendRateLimiter:
+    """Global messages/second plus a minimum interval per chat, within one process"""
+
+    MAX_TRACKED_CHATS = 10000
+
+    def __init__(self, rate: float, chat_interval: float):
+        self.interval = 1.0 / rate
+        self.chat_interval = chat_interval
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._next_chat: Dict[int, float] = {}
+
+    async def acquire(self, chat_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            wait = max(self._next_chat.get(chat_id, 0.0), self._paused_until) - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            self._next_chat[chat_id] = slot + self.chat_interval
+            if len(self._next_chat) > self.MAX_TRACKED_CHATS:
+                self._next_chat = {chat: ready for chat, ready in self._next_chat.items() if ready > now}
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            # A 429 during the wait pauses everyone: take a new slot after the pause
+            if self._paused_until <= loop.time():
+                return
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, asyncio.get_running_loop().time() + seconds)
+
+
+class Delivery(NamedTuple):
+    id: UUID
+    chat_id: int
+    chunks: List[str]
+    sent_chunks: int
+
+
+class DeliveryResult(NamedTuple):
+    sent_chunks: int
+    error: Optional[TelegramError]
+
+
+async def send_delivery(delivery: Delivery, limiter: SendRateLimiter) -> DeliveryResult:
+    """Send the remaining chunks in order; stops at the first failure"""
+    sent = delivery.sent_chunks
+    try:
+        for text in delivery.chunks[sent:]:
+            await limiter.acquire(delivery.chat_id)
+            await send_message(delivery.chat_id, text)
+            sent += 1
+    except TelegramError as e:
+        if e.retry_after:
+            limiter.pause(e.retry_after)
+        return DeliveryResult(sent, e)
+    return DeliveryResult(sent, None)
+
+
+async def send_deliveries(deliveries: Sequence[Delivery], limiter: SendRateLimiter) -> Dict[UUID, DeliveryResult]:
+    """Send a batch: chats in parallel, deliveries to the same chat one after another"""
+    by_chat: Dict[int, List[Delivery]] = {}
+    for delivery in deliveries:
+        by_chat.setdefault(delivery.chat_id, []).append(delivery)
+
+    results: Dict[UUID, DeliveryResult] = {}
+
+    async def send_chat(chat_deliveries: List[Delivery]) -> None:
+        for delivery in chat_deliveries:
+            results[delivery.id] = await send_delivery(delivery, limiter)
+
+    await asyncio.gather(*(send_chat(chat_deliveries) for chat_deliveries in by_chat.values()))
+    return results
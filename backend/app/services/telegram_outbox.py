@@ -0,0 +1,216 @@
+"""
+Persistent outbox for worksheets sent to Telegram.
+
+enqueue_homework renders the worksheet once and stores one telegram_deliveries
+row per recipient in a single multi-row INSERT. Every app process runs a
+PollingWorker, but only the one holding the outbox LeaderLock sends: Telegram
+limits are per bot, so the global and per-chat limits of its SendRateLimiter
+hold across all workers and hosts. The others keep polling for the lock and
+take over when the leader exits; rows queued by another process wait up to
+TELEGRAM_POLL_INTERVAL for the leader. The leader claims due rows with FOR
+UPDATE SKIP LOCKED, sends them through telegram.send_deliveries and writes
+the outcome back in bulk: one UPDATE for all sent rows, one for
+AIHomework.sent_via_telegram, one per failed row.
+
+Failures are retried with exponential backoff (or after Telegram's retry_after),
+resuming after the last delivered chunk; permanent errors and rows failing
+TELEGRAM_MAX_ATTEMPTS times are moved to DEAD.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.homework import AIHomework
+from ..models.student import Student
+from ..models.telegram_delivery import TelegramDelivery, TelegramDeliveryStatus
+from ..utils.clock import utcnow
+from ..utils.data_version import bump_data_version
+from ..utils.leader_lock import LeaderLock
+from ..utils.logging_config import truncate
+from ..utils.metrics import record_telegram_deliveries
+from ..utils.polling_worker import PollingWorker
+from ..utils.worksheet import render_telegram_chunks
+from . import telegram
+from .telegram import Delivery, DeliveryResult, SendRateLimiter
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_BASE = 10  # seconds, doubled on every failed attempt
+RETRY_BACKOFF_MAX = 900
+# A claimed batch not written back by then is picked up again
+CLAIM_TIMEOUT = 600
+# Key of the session-level advisory lock electing the sending process
+LEADER_LOCK_KEY = 4_902_118
+
+
+def enqueue_homework(
+    db: Session,
+    homework: AIHomework,
+    students: Iterable[Student],
+    with_answers: bool = False,
+) -> int:
+    """Queue the worksheet for students with a linked Telegram chat. Does not commit."""
+    chunks = render_telegram_chunks(homework.subject, homework.topic, homework.generated_tasks, with_answers)
+    now = utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": homework.user_id,
+            "homework_id": homework.id,
+            "student_id": student.id,
+            "chat_id": student.telegram_id,
+            "chunks": chunks,
+            "sent_chunks": 0,
+            "status": TelegramDeliveryStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        for student in students
+        if student.telegram_id
+    ]
+    if rows:
+        db.execute(insert(TelegramDelivery), rows)
+    return len(rows)
+
+
+def claim_batch(db: Session, limit: int) -> Tuple[List[Delivery], Dict[uuid.UUID, int]]:
+    """
+    Claim up to limit due deliveries (new, retried, or with an expired claim);
+    also returns the attempt number of each
+    """
+    now = utcnow()
+    rows = (
+        db.query(TelegramDelivery)
+        .filter(
+            TelegramDelivery.status.in_((TelegramDeliveryStatus.PENDING, TelegramDeliveryStatus.PROCESSING)),
+            TelegramDelivery.next_attempt_at <= now,
+        )
+        .order_by(TelegramDelivery.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed, attempts = [], {}
+    for row in rows:
+        row.status = TelegramDeliveryStatus.PROCESSING
+        row.attempts += 1
+        row.next_attempt_at = now + timedelta(seconds=CLAIM_TIMEOUT)
+        claimed.append(Delivery(row.id, row.chat_id, row.chunks, row.sent_chunks))
+        attempts[row.id] = row.attempts
+    db.commit()
+    return claimed, attempts
+
+
+def _fail(db: Session, delivery: Delivery, result: DeliveryResult, now: datetime, attempts: int) -> None:
+    error = result.error
+    if error.permanent or attempts >= settings.TELEGRAM_MAX_ATTEMPTS:
+        values = {"status": TelegramDeliveryStatus.DEAD, "next_attempt_at": now}
+        logger.error(f"Telegram delivery {delivery.id} to chat {delivery.chat_id} failed permanently: {error}")
+    else:
+        delay = error.retry_after or min(RETRY_BACKOFF_BASE * 2 ** (attempts - 1), RETRY_BACKOFF_MAX)
+        values = {"status": TelegramDeliveryStatus.PENDING, "next_attempt_at": now + timedelta(seconds=delay)}
+        logger.warning(f"Telegram delivery {delivery.id} attempt {attempts} failed, retry in {delay}s: {error}")
+    db.execute(
+        update(TelegramDelivery)
+        .where(TelegramDelivery.id == delivery.id, TelegramDelivery.status == TelegramDeliveryStatus.PROCESSING)
+        .values(sent_chunks=result.sent_chunks, last_error=truncate(str(error)), **values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finish_batch(
+    db: Session,
+    deliveries: List[Delivery],
+    attempts: Dict[uuid.UUID, int],
+    results: Dict[uuid.UUID, DeliveryResult],
+) -> None:
+    """Write a sent batch back: sent rows and their homework in bulk, failures one by one"""
+    now = utcnow()
+    sent_ids = [delivery.id for delivery in deliveries if results[delivery.id].error is None]
+    if sent_ids:
+        sent = db.execute(
+            update(TelegramDelivery)
+            .where(TelegramDelivery.id.in_(sent_ids), TelegramDelivery.status == TelegramDeliveryStatus.PROCESSING)
+            .values(
+                status=TelegramDeliveryStatus.SENT,
+                sent_chunks=func.jsonb_array_length(TelegramDelivery.chunks),
+                sent_at=now,
+                last_error=None,
+            )
+            .returning(TelegramDelivery.homework_id, TelegramDelivery.user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        homework_ids = {row.homework_id for row in sent}
+        if homework_ids:
+            db.execute(
+                update(AIHomework)
+                .where(AIHomework.id.in_(homework_ids), AIHomework.sent_via_telegram.is_not(True))
+                .values(sent_via_telegram=True)
+                .execution_options(synchronize_session=False)
+            )
+            # Bulk UPDATEs bypass the flush hook that versions user data
+            bump_data_version(db, {row.user_id for row in sent})
+        record_telegram_deliveries("sent", len(sent))
+
+    for delivery in deliveries:
+        result = results[delivery.id]
+        if result.error is not None:
+            _fail(db, delivery, result, now, attempts[delivery.id])
+            record_telegram_deliveries("failed", 1)
+    db.commit()
+
+
+def _claim_in_session(limit: int) -> Tuple[List[Delivery], Dict[uuid.UUID, int]]:
+    with SessionLocal() as db:
+        return claim_batch(db, limit)
+
+
+def _finish_in_session(
+    deliveries: List[Delivery],
+    attempts: Dict[uuid.UUID, int],
+    results: Dict[uuid.UUID, DeliveryResult],
+) -> None:
+    with SessionLocal() as db:
+        finish_batch(db, deliveries, attempts, results)
+
+
+_limiter: Optional[SendRateLimiter] = None
+leader = LeaderLock("Telegram outbox", LEADER_LOCK_KEY)
+
+
+async def process_batch(limit: Optional[int] = None) -> int:
+    """
+    Claim, send and record one batch; returns the number of claimed deliveries.
+    Does nothing unless this process is the outbox leader.
+    """
+    global _limiter
+    if not await run_in_threadpool(leader.try_acquire):
+        return 0
+    if _limiter is None:
+        _limiter = SendRateLimiter(settings.TELEGRAM_RATE_LIMIT, settings.TELEGRAM_CHAT_INTERVAL)
+    deliveries, attempts = await run_in_threadpool(_claim_in_session, limit or settings.TELEGRAM_BATCH_SIZE)
+    if not deliveries:
+        return 0
+    results = await telegram.send_deliveries(deliveries, _limiter)
+    await run_in_threadpool(_finish_in_session, deliveries, attempts, results)
+    return len(deliveries)
+
+
+outbox_worker = PollingWorker(
+    "Telegram outbox",
+    process_batch,
+    batch_size=settings.TELEGRAM_BATCH_SIZE,
+    poll_interval=settings.TELEGRAM_POLL_INTERVAL,
+)
+
+
+async def stop_worker() -> None:
+    """Stop after the current batch and hand the leadership over"""
+    await outbox_worker.stop()
+    await run_in_threadpool(leader.release)
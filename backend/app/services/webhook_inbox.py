@@ -0,0 +1,261 @@
+"""
+Inbox for YooKassa webhooks.
+
+The webhook endpoint only stores the delivery (store_event) and answers, so a
+burst of deliveries costs one INSERT each; repeated deliveries of an event hit
+the (payment_id, event_type) unique constraint and are acknowledged as is.
+
+A PollingWorker in every app process claims due events in batches with
+FOR UPDATE SKIP LOCKED, verifies them with YooKassa concurrently and applies
+them. An event is marked DONE in the same transaction that applies it, and only
+if the worker's claim still holds (status PROCESSING with the attempt number it
+claimed), so an event is applied at most once per claim even if a slow worker's
+claim expired and another worker took it over. A succeeded payment is applied
+once at all: applied_at records it, and later claims of the event (replays,
+reclaims) only mark it DONE. Failed events are retried with exponential
+backoff and moved to DEAD after WEBHOOK_MAX_ATTEMPTS attempts; replay_events
+puts events of a time range back into the queue.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.user import User, SubscriptionTier
+from ..models.webhook_event import WebhookEvent, WebhookEventStatus
+from ..utils.clock import utcnow
+from ..utils.logging_config import truncate
+from ..utils.metrics import record_webhook_event
+from ..utils.polling_worker import PollingWorker
+from . import yukassa
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_CREDITS = {
+    SubscriptionTier.FREE: 10,
+    SubscriptionTier.BASIC: 100,
+    SubscriptionTier.PREMIUM: 1000
+}
+
+# Event types that need a verification call and change data; others are only recorded
+PAYMENT_SUCCEEDED = "payment.succeeded"
+
+RETRY_BACKOFF_BASE = 30  # seconds, doubled on every failed attempt
+RETRY_BACKOFF_MAX = 3600
+
+
+class ClaimedEvent(NamedTuple):
+    id: uuid.UUID
+    attempts: int
+    payment_id: str
+    event_type: str
+
+
+def store_event(db: Session, payload: Dict[str, Any]) -> bool:
+    """
+    Store a delivery for the worker. Returns False for a duplicate delivery
+    of an already stored event.
+    """
+    now = utcnow()
+    result = db.execute(
+        insert(WebhookEvent)
+        .values(
+            id=uuid.uuid4(),
+            payment_id=payload["object"]["id"],
+            event_type=payload["event"],
+            payload=payload,
+            status=WebhookEventStatus.PENDING,
+            attempts=0,
+            next_attempt_at=now,
+            received_at=now,
+        )
+        .on_conflict_do_nothing(constraint="uq_webhook_events_payment_event")
+    )
+    db.commit()
+    stored = result.rowcount == 1
+    record_webhook_event("received" if stored else "duplicate")
+    return stored
+
+
+def claim_batch(db: Session, limit: int) -> List[ClaimedEvent]:
+    """Claim up to limit due events (new, retried, or with an expired claim)"""
+    now = utcnow()
+    rows = (
+        db.query(WebhookEvent)
+        .filter(
+            WebhookEvent.status.in_((WebhookEventStatus.PENDING, WebhookEventStatus.PROCESSING)),
+            WebhookEvent.next_attempt_at <= now,
+        )
+        .order_by(WebhookEvent.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for row in rows:
+        row.status = WebhookEventStatus.PROCESSING
+        row.attempts += 1
+        row.next_attempt_at = now + timedelta(seconds=settings.WEBHOOK_CLAIM_TIMEOUT)
+        claimed.append(ClaimedEvent(row.id, row.attempts, row.payment_id, row.event_type))
+    db.commit()
+    return claimed
+
+
+def _still_claimed(event: ClaimedEvent):
+    return (
+        (WebhookEvent.id == event.id)
+        & (WebhookEvent.status == WebhookEventStatus.PROCESSING)
+        & (WebhookEvent.attempts == event.attempts)
+    )
+
+
+def apply_paid_subscription(db: Session, payment_info: Dict[str, Any]) -> None:
+    """Upgrade the user from a succeeded payment's metadata. Does not commit."""
+    metadata = payment_info.get("metadata", {})
+    user_id = metadata.get("user_id")
+    tier = metadata.get("tier")
+
+    if user_id and tier:
+        user = db.query(User).filter(User.id == user_id).first()
+
+        if user:
+            # Upgrade subscription
+            user.subscription_tier = SubscriptionTier(tier)
+            user.ai_credits_left = SUBSCRIPTION_CREDITS[SubscriptionTier(tier)]
+
+
+def _complete(db: Session, event: ClaimedEvent, payment_info: Optional[Dict[str, Any]]) -> bool:
+    now = utcnow()
+    # Locks the row; applied_at is not changed here, so RETURNING gives its stored value
+    marked = db.execute(
+        update(WebhookEvent)
+        .where(_still_claimed(event))
+        .values(status=WebhookEventStatus.DONE, processed_at=now, last_error=None)
+        .returning(WebhookEvent.applied_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if marked is None:
+        # The claim expired and another worker took the event over
+        logger.warning(f"Webhook event {event.id} was reclaimed, skipping")
+        return False
+    if payment_info is not None and payment_info.get("status") == "succeeded":
+        if marked.applied_at is not None:
+            logger.info(f"Payment {event.payment_id} was applied at {marked.applied_at}, not applying again")
+            return True
+        apply_paid_subscription(db, payment_info)
+        db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == event.id)
+            .values(applied_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    return True
+
+
+def _fail(db: Session, event: ClaimedEvent, error: str) -> None:
+    now = utcnow()
+    if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        values = {"status": WebhookEventStatus.DEAD, "next_attempt_at": now}
+        outcome = "dead"
+        logger.error(f"Webhook event {event.id} ({event.event_type} {event.payment_id}) moved to dead letters: {error}")
+    else:
+        delay = min(RETRY_BACKOFF_BASE * 2 ** (event.attempts - 1), RETRY_BACKOFF_MAX)
+        values = {"status": WebhookEventStatus.PENDING, "next_attempt_at": now + timedelta(seconds=delay)}
+        outcome = "retry"
+        logger.warning(f"Webhook event {event.id} attempt {event.attempts} failed, retry in {delay}s: {error}")
+    db.execute(
+        update(WebhookEvent)
+        .where(_still_claimed(event))
+        .values(last_error=error, **values)
+        .execution_options(synchronize_session=False)
+    )
+    record_webhook_event(outcome)
+
+
+def finish_batch(db: Session, results: Iterable[Tuple[ClaimedEvent, Any]]) -> None:
+    """
+    Apply verified events and record failures in one transaction; each event
+    runs in a savepoint, so one failing apply does not undo the others.
+    """
+    for event, result in results:
+        if isinstance(result, BaseException):
+            with db.begin_nested():
+                _fail(db, event, truncate(f"{type(result).__name__}: {result}"))
+            continue
+        try:
+            with db.begin_nested():
+                completed = _complete(db, event, result)
+            if completed:
+                record_webhook_event("done")
+        except Exception as e:
+            logger.exception(f"Applying webhook event {event.id} failed")
+            with db.begin_nested():
+                _fail(db, event, truncate(f"{type(e).__name__}: {e}"))
+    db.commit()
+
+
+async def _verify(event: ClaimedEvent) -> Optional[Dict[str, Any]]:
+    if event.event_type != PAYMENT_SUCCEEDED:
+        return None
+    return await yukassa.verify_payment(event.payment_id)
+
+
+def _claim_in_session(limit: int) -> List[ClaimedEvent]:
+    with SessionLocal() as db:
+        return claim_batch(db, limit)
+
+
+def _finish_in_session(results: List[Tuple[ClaimedEvent, Any]]) -> None:
+    with SessionLocal() as db:
+        finish_batch(db, results)
+
+
+async def process_batch(limit: Optional[int] = None) -> int:
+    """Claim, verify and apply one batch; returns the number of claimed events"""
+    claimed = await run_in_threadpool(_claim_in_session, limit or settings.WEBHOOK_BATCH_SIZE)
+    if not claimed:
+        return 0
+    results = await asyncio.gather(*(_verify(event) for event in claimed), return_exceptions=True)
+    await run_in_threadpool(_finish_in_session, list(zip(claimed, results)))
+    return len(claimed)
+
+
+inbox_worker = PollingWorker(
+    "Webhook inbox",
+    process_batch,
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    poll_interval=settings.WEBHOOK_POLL_INTERVAL,
+)
+
+
+def replay_events(
+    db: Session,
+    since: datetime,
+    until: datetime,
+    statuses: Iterable[WebhookEventStatus] = (WebhookEventStatus.DEAD,),
+) -> int:
+    """Queue events received in [since, until) with the given statuses again; returns their count"""
+    result = db.execute(
+        update(WebhookEvent)
+        .where(
+            WebhookEvent.received_at >= since,
+            WebhookEvent.received_at < until,
+            WebhookEvent.status.in_(tuple(statuses)),
+        )
+        .values(
+            status=WebhookEventStatus.PENDING,
+            attempts=0,
+            next_attempt_at=utcnow(),
+            last_error=None,
+            processed_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,81 @@
+"""
+On-disk cache of rendered worksheets.
+
+Files live in WORKSHEET_CACHE_DIR/<TEMPLATE_VERSION>/<homework id>-<variant>.<format>.
+Generated homework does not change after creation, so a cached file stays
+valid until a template changes; the version directory then changes too, and
+directories of other versions are removed on the first render in the process.
+Files are written under a temporary name and renamed, so concurrent renders of
+the same worksheet (other threads or workers) never expose a partial file.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+from ..config import settings
+from ..models.homework import AIHomework
+from ..utils.metrics import record_worksheet_render
+from ..utils.worksheet import TEMPLATE_VERSION, render_pdf, render_worksheet_html
+
+logger = logging.getLogger(__name__)
+
+# Starlette appends "; charset=utf-8" to text/ types itself
+WORKSHEET_MEDIA_TYPES = {
+    "html": "text/html",
+    "pdf": "application/pdf",
+}
+
+_pruned = False
+_prune_lock = threading.Lock()
+
+
+def cache_path(homework_id: UUID, variant: str, fmt: str) -> Path:
+    return Path(settings.WORKSHEET_CACHE_DIR) / TEMPLATE_VERSION / f"{homework_id}-{variant}.{fmt}"
+
+
+def cached_worksheet(homework_id: UUID, variant: str, fmt: str) -> Optional[Path]:
+    path = cache_path(homework_id, variant, fmt)
+    if path.is_file():
+        record_worksheet_render(fmt, "hit")
+        return path
+    return None
+
+
+def _prune_stale_versions() -> None:
+    """Remove renders of previous template versions, once per process"""
+    global _pruned
+    with _prune_lock:
+        if _pruned:
+            return
+        _pruned = True
+    root = Path(settings.WORKSHEET_CACHE_DIR)
+    if not root.is_dir():
+        return
+    for entry in root.iterdir():
+        if entry.is_dir() and entry.name != TEMPLATE_VERSION:
+            logger.info(f"Removing worksheet cache of template version {entry.name}")
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def render_to_cache(homework: AIHomework, variant: str, fmt: str) -> Path:
+    """Render the worksheet and store it; raises ImportError for PDF without WeasyPrint"""
+    html = render_worksheet_html(homework.subject, homework.topic, homework.generated_tasks, variant)
+    data = render_pdf(html) if fmt == "pdf" else html.encode("utf-8")
+
+    _prune_stale_versions()
+    path = cache_path(homework.id, variant, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".render-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    record_worksheet_render(fmt, "miss")
+    return path
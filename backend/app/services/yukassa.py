@@ -1,12 +1,84 @@
+"""
+YooKassa API client.
+
+Calls are async and share one httpx.AsyncClient per worker, so the webhook and
+upgrade handlers never block the event loop and reuse keep-alive connections.
+Transport errors, 429 and 5xx responses are retried with exponential backoff;
+create_payment keeps its Idempotence-Key across retries, so a retried POST
+cannot create a second payment.
+"""
+import asyncio
+import random
 import uuid
 import hmac
 import hashlib
-from typing import Optional, Dict, Any
-import httpx
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from ..config import settings
 
-
-def create_payment(
+# Imported lazily: only deployments with billing enabled need httpx
+if TYPE_CHECKING:
+    import httpx
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 0.5  # seconds, doubled on every attempt
+BACKOFF_MAX = 8.0
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def get_client() -> "httpx.AsyncClient":
+    """Worker-wide client with a bounded connection pool; closed on shutdown"""
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            base_url=settings.YUKASSA_API_URL,
+            auth=(settings.YUKASSA_SHOP_ID or "", settings.YUKASSA_SECRET_KEY or ""),
+            timeout=httpx.Timeout(settings.YUKASSA_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _backoff_delay(attempt: int, response: Optional["httpx.Response"] = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    delay = min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def _request(method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+    """Send a request, retrying transient failures; raises httpx errors on the last one"""
+    import httpx
+
+    client = get_client()
+    for attempt in range(settings.YUKASSA_MAX_RETRIES):
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError:
+            await asyncio.sleep(_backoff_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES:
+            break
+        await asyncio.sleep(_backoff_delay(attempt, response))
+    else:
+        # Last attempt: its errors propagate
+        response = await client.request(method, path, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+
+async def create_payment(
     amount: float,
     description: str,
     return_url: str,
@@ -67,21 +139,13 @@ def create_payment(
     }
 
     try:
-        with httpx.Client() as client:
-            response = client.post(
-                "https://api.yookassa.ru/v3/payments",
-                json=payload,
-                headers=headers,
-                auth=(settings.YUKASSA_SHOP_ID, settings.YUKASSA_SECRET_KEY)
-            )
-            response.raise_for_status()
-            return response.json()
+        return await _request("POST", "/payments", json=payload, headers=headers)
 
     except Exception as e:
         raise ValueError(f"Failed to create payment: {str(e)}")
 
 
-def verify_payment(payment_id: str) -> Dict[str, Any]:
+async def verify_payment(payment_id: str) -> Dict[str, Any]:
     """
     Verify payment status via YooKassa API
 
@@ -98,13 +162,7 @@ def verify_payment(payment_id: str) -> Dict[str, Any]:
         raise ValueError("YooKassa credentials are not configured")
 
     try:
-        with httpx.Client() as client:
-            response = client.get(
-                f"https://api.yookassa.ru/v3/payments/{payment_id}",
-                auth=(settings.YUKASSA_SHOP_ID, settings.YUKASSA_SECRET_KEY)
-            )
-            response.raise_for_status()
-            return response.json()
+        return await _request("GET", f"/payments/{payment_id}")
 
     except Exception as e:
         raise ValueError(f"Failed to verify payment: {str(e)}")
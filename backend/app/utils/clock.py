@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, like the DateTime columns store it"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
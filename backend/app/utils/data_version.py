@@ -0,0 +1,108 @@
+"""
+Per-user data versioning for conditional GET (ETag / If-None-Match).
+
+Every flush that writes students, lessons, lesson series, payments, homework
+or user-visible user fields increments users.data_version. Read endpoints
+derive a weak ETag from that version and answer 304 before running any
+heavy query when the client already has the current representation.
+"""
+import hashlib
+from datetime import date
+from itertools import chain
+from typing import Iterable
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.user import User
+from ..models.student import Student
+from ..models.lesson import Lesson
+from ..models.lesson_series import LessonSeries
+from ..models.payment import Payment
+from ..models.homework import AIHomework
+from .read_replicas import WRITTEN_USERS_KEY, get_read_db
+from .security import get_current_user
+
+VERSIONED_MODELS = (Student, Lesson, LessonSeries, Payment, AIHomework)
+VERSIONED_USER_FIELDS = ("email", "name", "phone", "subscription_tier", "ai_credits_left", "last_login")
+
+
+def bump_data_version(db: Session, user_ids: Iterable[UUID]) -> None:
+    """Increment data_version for the given users. Does not commit."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    # Their reads stay on the primary for a while after commit (read_replicas)
+    db.info.setdefault(WRITTEN_USERS_KEY, set()).update(user_ids)
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _user_changed(user: User) -> bool:
+    state = inspect(user)
+    return any(state.attrs[field].history.has_changes() for field in VERSIONED_USER_FIELDS)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _bump_versions_on_flush(session: Session, flush_context, instances) -> None:
+    """Collect owners of changed rows and bump their versions in the same transaction."""
+    user_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, VERSIONED_MODELS):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, User) and obj not in session.new and _user_changed(obj):
+            user_ids.add(obj.id)
+    bump_data_version(session, user_ids)
+
+
+def get_data_version(db: Session, user_id: UUID) -> int:
+    """Current data version of a user (single primary key lookup)."""
+    return db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+
+def make_etag(user_id: UUID, version: int, request: Request) -> str:
+    """Weak ETag from user, data version, path, query parameters and current date."""
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    # Date is included because defaults like "current month" depend on it
+    raw = f"{user_id}:{version}:{date.today().isoformat()}:{request.url.path}?{query}"
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {item.strip() for item in if_none_match.split(",")}
+    # Weak comparison: W/"x" and "x" are equivalent
+    return etag in candidates or etag[2:] in candidates
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+) -> None:
+    """
+    Dependency for read endpoints: answer 304 when If-None-Match matches.
+
+    Runs before the handler, so the handler's queries are skipped entirely.
+    Uses the handler's read session, so the version is never newer than the
+    data the handler returns for it.
+    """
+    etag = make_etag(current_user.id, get_data_version(db, current_user.id), request)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(etag, if_none_match):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
@@ -0,0 +1,106 @@
+"""
+Fast JSON responses for large list endpoints.
+
+FastAPI normally validates a handler's return value against response_model and
+then runs jsonable_encoder before the stdlib json encoder, so a calendar of a few
+thousand lessons is converted three times. Trusted handlers (ones that build
+their output from our own ORM rows) can instead return
+trusted_response(LESSON_SERIALIZER, rows, response): a Response instance
+bypasses response_model validation, and the field lists are precomputed once
+per schema. response_model stays on the route for the OpenAPI docs.
+
+orjson is used when installed, otherwise the stdlib encoder with the same
+conversions. Output matches pydantic's JSON mode: Decimal as string, UUID as
+string, datetime/date in ISO 8601, enums by value.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+from uuid import UUID
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Conversions for types the encoder does not handle natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson when available, compact stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+Serializer = Callable[[Any], Dict[str, Any]]
+
+_MISSING = object()
+
+
+def build_serializer(schema: Type[BaseModel]) -> Serializer:
+    """
+    Serializer producing the same keys as schema from an ORM object or a dict.
+
+    Fields are read by name; fields with a default fall back to it when the
+    source does not have them (e.g. is_virtual for plain lessons).
+    """
+    fields = tuple(
+        (name, _MISSING if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in schema.model_fields.items()
+    )
+
+    def serialize(source: Any) -> Dict[str, Any]:
+        if isinstance(source, dict):
+            return {
+                name: source[name] if default is _MISSING else source.get(name, default)
+                for name, default in fields
+            }
+        return {
+            name: getattr(source, name) if default is _MISSING else getattr(source, name, default)
+            for name, default in fields
+        }
+
+    return serialize
+
+
+def serialize_many(serializer: Serializer, items: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [serializer(item) for item in items]
+
+
+def trusted_response(
+    serializer: Serializer,
+    items: Iterable[Any],
+    response: Optional[Response] = None,
+) -> FastJSONResponse:
+    """
+    List response that skips response_model validation.
+
+    Headers that dependencies set on the injected response (ETag, Cache-Control)
+    are carried over, since FastAPI does not merge them into returned Responses.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(serialize_many(serializer, items), headers=headers)
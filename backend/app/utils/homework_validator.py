@@ -15,6 +15,7 @@
 import re
 from typing import Dict, List, Tuple
 import logging
+from .tracing import current_span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -189,7 +190,8 @@ class HomeworkQualityValidator:
         )
         if len(set(date_terms)) > 1 and dates_in_solution:
             logger.warning(
-                f"Возможная терминологическая путаница дат: {date_terms}"
+                f"Возможная терминологическая путаница дат: {date_terms}",
+                extra={"sample_key": "homework_date_terms"}
             )
 
         return errors
@@ -259,7 +261,8 @@ class HomeworkQualityValidator:
 
         if has_options_ref and not has_exclusion:
             logger.warning(
-                "ДОКАЗАТЕЛЬНОСТЬ: Решение не объясняет, почему другие варианты неверны"
+                "ДОКАЗАТЕЛЬНОСТЬ: Решение не объясняет, почему другие варианты неверны",
+                extra={"sample_key": "homework_proof_options"}
             )
 
         # Проверка на "красивый текст" вместо доказательства
@@ -293,6 +296,7 @@ class HomeworkQualityValidator:
         return errors
 
 
+@traced("validate.tasks")
 def validate_homework_tasks(tasks: List[Dict], subject: str, level: str) -> Tuple[List[Dict], List[Dict]]:
     """
     Валидирует список заданий и возвращает валидные и невалидные.
@@ -321,11 +325,31 @@ def validate_homework_tasks(tasks: List[Dict], subject: str, level: str) -> Tupl
                 "errors": errors
             })
             logger.warning(
-                f"Task #{task.get('number')} failed validation: {errors}"
+                f"Task #{task.get('number')} failed validation: {errors}",
+                extra={"sample_key": "homework_task_rejected"}
             )
 
+    current_span().set(valid=len(valid_tasks), invalid=len(invalid_tasks))
     logger.info(
         f"Validation results: {len(valid_tasks)} valid, {len(invalid_tasks)} invalid"
     )
 
     return valid_tasks, invalid_tasks
+
+
+# Задание, проходящее через все ветки проверок (для прогрева кэша регулярных выражений)
+_WARM_UP_TASK = {
+    "number": 1,
+    "text": "Сопоставьте: 1) причина реформы 1861 года А) результат. Какая причина привела к отмене?",
+    "solution": "Вариант А верен, потому что манифест 1861 года исключает остальные варианты.",
+    "answer": "А",
+}
+
+
+def warm_up() -> None:
+    """
+    Прогоняет одно задание через все проверки, чтобы модуль re скомпилировал
+    и закэшировал шаблоны до первой генерации.
+    """
+    validator = HomeworkQualityValidator("история", "ЕГЭ")
+    validator.validate_task(_WARM_UP_TASK)
@@ -0,0 +1,80 @@
+"""
+Leader election between app processes with a PostgreSQL advisory lock.
+
+The lock is session-level and held on a dedicated connection of lock_engine,
+outside the request pool, so it covers every worker of every host sharing
+the database without taking a pool slot from request sessions. The holder
+stays leader until it releases the lock or its connection drops; the server
+then frees the lock and another process takes it on its next try_acquire.
+"""
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from ..database import lock_engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    def __init__(self, name: str, key: int):
+        self.name = name
+        self.key = key
+        self._connection: Optional[Connection] = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    def try_acquire(self) -> bool:
+        """Whether this process is the leader; takes the lock if it is free. Blocking."""
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except Exception as e:
+                logger.warning(f"{self.name}: leader connection lost: {type(e).__name__}: {e}")
+                self._discard()
+        try:
+            connection = lock_engine.connect()
+        except Exception as e:
+            logger.warning(f"{self.name}: database unavailable: {type(e).__name__}: {e}")
+            return False
+        try:
+            locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            # The lock outlives the transaction; do not leave it idle in transaction
+            connection.commit()
+        except Exception as e:
+            logger.warning(f"{self.name}: advisory lock failed: {type(e).__name__}: {e}")
+            connection.invalidate()
+            connection.close()
+            return False
+        if not locked:
+            connection.close()
+            return False
+        self._connection = connection
+        logger.info(f"{self.name}: this process is the leader")
+        return True
+
+    def release(self) -> None:
+        """Blocking"""
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+            self._connection.close()
+        except Exception as e:
+            logger.warning(f"{self.name}: advisory unlock failed: {type(e).__name__}: {e}")
+            self._discard()
+        self._connection = None
+
+    def _discard(self) -> None:
+        # Closing the DBAPI connection ends the session and frees the lock on the server
+        try:
+            self._connection.invalidate()
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
@@ -1,78 +1,247 @@
 """
 Centralized logging configuration for the application.
+
+Records are put on a bounded in-memory queue by the calling thread (request
+thread or event loop) and written by a background QueueListener thread, so
+slow stdout/file I/O never blocks a request. When the queue is full new records
+are dropped and counted instead of blocking.
+
+Output is one JSON object per line (or the classic text format) with the
+request id of the request that produced the record. Large messages are
+truncated, and records logged with extra={"sample_key": ...} are sampled.
 """
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, List, Optional
+from .request_context import get_request_id
+
+# Cap for the message and exception text of a single record
+MAX_FIELD_CHARS = 4000
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+def truncate(value: Any, limit: int = 500) -> str:
+    """Short preview of a large value for log messages (dict results, provider responses)"""
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... (+{len(text) - limit} chars)"
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id; runs in the calling thread, before queueing"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through 1 of every `every` records per sample_key (the first one always
+    passes); records without a sample_key are not affected.
+    """
+
+    def __init__(self, every: int = 10):
+        super().__init__()
+        self.every = every
+        self._seen: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or self.every <= 1:
+            return True
+        with self._lock:
+            seen = self._seen[key]
+            self._seen[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sampled_every = self.every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": truncate(record.getMessage(), MAX_FIELD_CHARS),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        sampled_every = getattr(record, "sampled_every", None)
+        if sampled_every:
+            entry["sampled_every"] = sampled_every
+        if record.exc_info:
+            entry["exc"] = truncate(self.formatException(record.exc_info), MAX_FIELD_CHARS)
+        elif record.exc_text:
+            entry["exc"] = truncate(record.exc_text, MAX_FIELD_CHARS)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        record.request_id = getattr(record, "request_id", None) or "-"
+        return truncate(super().format(record), MAX_FIELD_CHARS)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of raising"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message (args may reference mutable objects), keep the
+        # rest for the formatter on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 def setup_logging(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
-    backup_count: int = 5
+    backup_count: int = 5,
+    json_format: bool = True,
+    queue_size: int = 10000,
+    sample_every: int = 10
 ) -> None:
     """
     Configure centralized logging for the application.
-    
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional path to log file. If None, logs only to console.
         max_bytes: Maximum size of log file before rotation
         backup_count: Number of backup log files to keep
+        json_format: JSON lines (True) or the classic text format
+        queue_size: Records buffered for the writer thread; extra records are dropped
+        sample_every: Keep 1 of N records logged with a sample_key
     """
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Get root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level.upper()))
-    
-    # Remove existing handlers
-    root_logger.handlers.clear()
-    
+    global _listener, _queue_handler
+    stop_logging()
+
+    level = getattr(logging, log_level.upper())
+    if json_format:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter(
+            fmt='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+    # Handlers doing the actual I/O, run by the listener thread
+    handlers: List[logging.Handler] = []
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, log_level.upper()))
+    console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
+    handlers.append(console_handler)
+
     # File handler (if log_file is provided)
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
         file_handler = RotatingFileHandler(
             log_file,
             maxBytes=max_bytes,
             backupCount=backup_count,
             encoding='utf-8'
         )
-        file_handler.setLevel(getattr(logging, log_level.upper()))
+        file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.setLevel(level)
+    queue_handler.addFilter(SamplingFilter(sample_every))
+    queue_handler.addFilter(RequestIdFilter())
+
+    # Get root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+
+    # Remove existing handlers
+    root_logger.handlers.clear()
+    root_logger.addHandler(queue_handler)
+
+    _queue_handler = queue_handler
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
     # Set levels for third-party libraries
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
-    
+
     root_logger.info(f"Logging configured: level={log_level}, file={log_file or 'console only'}")
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """
+    Threads do not survive fork (gunicorn preload, process pools): give the
+    child a fresh queue, since the parent's may have been locked mid-operation,
+    and its own writer thread.
+    """
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for a module.
-    
+
     Args:
         name: Logger name (usually __name__)
-    
+
     Returns:
         Configured logger instance
     """
@@ -0,0 +1,270 @@
+"""
+Prometheus metrics.
+
+Multi-worker deployments set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does)
+so every worker writes its samples to mmap-ed files in that directory and
+/metrics aggregates all of them; without it the default in-process registry
+is used. Recording a sample is a dict lookup plus a float add, cheap enough to
+keep enabled under production load.
+
+Per-request DB statistics are collected through SQLAlchemy engine events into
+a RequestStats object held in a context variable; the middleware creates it,
+and sync endpoints share it through the threadpool's copied context.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from ..config import settings
+from ..database import engine, replica_engines
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+AI_LATENCY_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL time per HTTP request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency by statement type",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_in_use",
+    "DB connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_connections_max",
+    "Pool size plus max overflow",
+    multiprocess_mode="livesum",
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replay lag of a read replica behind the primary (-1 when unreachable)",
+    ["replica"],
+    multiprocess_mode="livemax",
+)
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions",
+    "Sessions of read-only endpoints by target: replica, or primary and why",
+    ["target"],
+)
+AI_CALL_DURATION = Histogram(
+    "ai_provider_request_duration_seconds",
+    "AI provider call latency",
+    ["provider", "model", "outcome"],
+    buckets=AI_LATENCY_BUCKETS,
+)
+AI_TOKENS = Counter(
+    "ai_provider_tokens",
+    "Tokens reported by AI providers",
+    ["provider", "model", "kind"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections",
+    "Requests rejected by the rate limiter",
+    ["rule", "scope"],
+)
+WEBHOOK_EVENTS = Counter(
+    "webhook_events",
+    "YooKassa webhook inbox events by outcome",
+    ["outcome"],
+)
+TELEGRAM_DELIVERIES = Counter(
+    "telegram_deliveries",
+    "Telegram worksheet deliveries written back by the outbox worker",
+    ["outcome"],
+)
+WORKSHEET_RENDERS = Counter(
+    "worksheet_downloads",
+    "Worksheet downloads served from the disk cache (hit) or rendered (miss)",
+    ["format", "cache"],
+)
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request_stats() -> RequestStats:
+    """Attach fresh stats to the current request context"""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def ensure_request_stats() -> RequestStats:
+    """Stats of the current request, started by an outer middleware or created here"""
+    return _request_stats.get() or start_request_stats()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[RequestStats]:
+    """
+    Count SQL statements run inside the block (same thread/context) and raise
+    QueryBudgetExceeded if there are more than max_queries.
+
+        with query_budget(3) as stats:
+            create_payment(payment_data, current_user, db)
+    """
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+    if stats.db_queries > max_queries:
+        raise QueryBudgetExceeded(f"{stats.db_queries} SQL queries, budget is {max_queries}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    DB_QUERY_DURATION.labels(statement.lstrip()[:6].upper()).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+# Statements on replicas count towards the request like primary ones
+for _engine in (engine, *replica_engines):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _handle_error)
+
+
+# Pool events registered on the engine follow it across engine.dispose()
+@event.listens_for(engine, "checkout")
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(engine, "checkin")
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def init_worker_metrics() -> None:
+    """Per-worker gauges; called from the lifespan handler after the fork"""
+    DB_POOL_CAPACITY.set(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+
+
+@contextmanager
+def track_ai_call(provider: str, model: str) -> Iterator[None]:
+    """Observe the latency of one provider call, labelled ok/error"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        AI_CALL_DURATION.labels(provider, model, outcome).observe(time.perf_counter() - started)
+
+
+def record_ai_tokens(provider: str, model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    if prompt_tokens:
+        AI_TOKENS.labels(provider, model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        AI_TOKENS.labels(provider, model, "completion").inc(completion_tokens)
+
+
+def record_rate_limit_rejection(rule: str, scope: str) -> None:
+    RATE_LIMIT_REJECTIONS.labels(rule, scope).inc()
+
+
+def record_webhook_event(outcome: str) -> None:
+    """outcome: received, duplicate, done, retry or dead"""
+    WEBHOOK_EVENTS.labels(outcome).inc()
+
+
+def record_telegram_deliveries(outcome: str, count: int) -> None:
+    """outcome: sent or failed"""
+    TELEGRAM_DELIVERIES.labels(outcome).inc(count)
+
+
+def record_replica_lag(replica: str, lag: Optional[float]) -> None:
+    DB_REPLICA_LAG.labels(replica).set(-1 if lag is None else lag)
+
+
+def record_read_session(target: str) -> None:
+    """target: replica, primary_recent_write, primary_replica_lag or primary_no_replica"""
+    DB_READ_SESSIONS.labels(target).inc()
+
+
+def record_worksheet_render(fmt: str, cache: str) -> None:
+    WORKSHEET_RENDERS.labels(fmt, cache).inc()
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposition for /metrics, aggregated across workers in multiprocess mode"""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
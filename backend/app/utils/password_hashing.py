@@ -0,0 +1,101 @@
+"""
+Password hashing offloaded to a dedicated, bounded process pool.
+
+bcrypt is CPU-bound: running it in the request threadpool lets a burst of
+logins starve other endpoints, and threads contend on the GIL. Hashing runs
+in a separate process pool instead; when too many operations are pending the
+request is rejected with 503 rather than queued indefinitely.
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# min/max rounds equal to the configured cost make needs_update() flag hashes
+# created with any other cost, so they are transparently rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def _ping() -> bool:
+    return True
+
+
+class PasswordHasher:
+    """Bounded process-pool executor for password hashing."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            logger.warning(f"Password hashing queue is full ({self.pending} pending), shedding load")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Please try again in a few seconds.",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash password with the configured cost"""
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify password against hash.
+
+        Returns:
+            (is_valid, new_hash): new_hash is set when the stored hash uses an
+            outdated scheme or cost and should be replaced
+        """
+        return await self._run(_verify_and_update, password, hashed)
+
+    def warm_up(self) -> None:
+        """Start worker processes ahead of the first login"""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_ping)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,74 @@
+"""
+Background task draining a database-backed queue (webhook inbox, Telegram outbox).
+
+process_batch() is called again right away while it returns full batches; once
+the queue is drained the task sleeps until the next poll or until notify() is
+called after a new row is committed. Each app worker process runs its own task;
+queues claim their rows with FOR UPDATE SKIP LOCKED so workers do not overlap.
+A queue that must be drained by a single process (the Telegram outbox, for its
+rate limits) returns 0 from process_batch unless it holds a LeaderLock.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PollingWorker:
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[], Awaitable[int]],
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stopping = False
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start on the running loop (lifespan startup)"""
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    def notify(self) -> None:
+        """Wake the worker now; safe to call from threadpool (sync endpoint) threads"""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let the current batch finish, then stop"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name} worker did not stop in time; claimed rows will be retried")
+        self._task = None
+
+    async def _run(self) -> None:
+        logger.info(f"{self.name} worker started")
+        while not self._stopping:
+            try:
+                processed = await self.process_batch()
+            except Exception:
+                logger.exception(f"{self.name} batch failed")
+                processed = 0
+            if processed < self.batch_size and not self._stopping:
+                # Queue drained: sleep until the next poll or a new row
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        logger.info(f"{self.name} worker stopped")
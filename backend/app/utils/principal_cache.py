@@ -0,0 +1,194 @@
+"""
+Cache of authenticated principals for get_current_user.
+
+Two levels: an in-process LRU with a short TTL and an optional shared backend
+(Redis, see redis_client) so multi-worker deployments share entries and
+invalidations. Entries are invalidated after commit whenever a User row is
+changed (subscription_tier, ai_credits_left, password_hash, ...).
+
+The cached principal is a transient User that is not attached to any session.
+password_hash is never cached and is None on it; login reads the row itself.
+Handlers that need a fresh row for locking must query it explicitly, e.g.
+db.query(User).filter(User.id == current_user.id).with_for_update().
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Protocol
+from uuid import UUID
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.user import User, SubscriptionTier
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHED_FIELDS = (
+    "id", "email", "name", "phone",
+    "subscription_tier", "ai_credits_left", "created_at", "last_login",
+)
+
+
+class PrincipalCacheBackend(Protocol):
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class InMemoryLRUBackend:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Shared backend on top of a redis-py compatible client (get/setex/delete)."""
+
+    def __init__(self, client, prefix: str = "principal:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        self.client.setex(self.prefix + key, ttl, json.dumps(value))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+def _to_snapshot(user: User) -> Dict[str, Any]:
+    snapshot = {field: getattr(user, field) for field in CACHED_FIELDS}
+    snapshot["id"] = str(user.id)
+    snapshot["subscription_tier"] = SubscriptionTier(user.subscription_tier).value
+    for field in ("created_at", "last_login"):
+        if snapshot[field] is not None:
+            snapshot[field] = snapshot[field].isoformat()
+    return snapshot
+
+
+def _from_snapshot(snapshot: Dict[str, Any]) -> User:
+    # Entries written before a field was dropped from CACHED_FIELDS keep it until they expire
+    values = {field: snapshot[field] for field in CACHED_FIELDS}
+    values["id"] = UUID(values["id"])
+    values["subscription_tier"] = SubscriptionTier(values["subscription_tier"])
+    for field in ("created_at", "last_login"):
+        if values[field] is not None:
+            values[field] = datetime.fromisoformat(values[field])
+    return User(**values)
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        ttl: int,
+        local: InMemoryLRUBackend,
+        shared: Optional[PrincipalCacheBackend] = None,
+    ):
+        self.ttl = ttl
+        self.local = local
+        self.shared = shared
+
+    def get(self, user_id: str) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        snapshot = self.local.get(user_id)
+        if snapshot is None and self.shared is not None:
+            try:
+                snapshot = self.shared.get(user_id)
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {type(e).__name__}: {e}")
+            if snapshot is not None:
+                self.local.set(user_id, snapshot, self.ttl)
+        return _from_snapshot(snapshot) if snapshot is not None else None
+
+    def set(self, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        snapshot = _to_snapshot(user)
+        user_id = snapshot["id"]
+        self.local.set(user_id, snapshot, self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(user_id, snapshot, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {type(e).__name__}: {e}")
+
+    def invalidate(self, user_id: Any) -> None:
+        key = str(user_id)
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except Exception as e:
+                logger.warning(f"Shared principal cache unavailable: {type(e).__name__}: {e}")
+
+
+def _create_shared_backend() -> Optional[PrincipalCacheBackend]:
+    client = get_redis()
+    return RedisBackend(client) if client is not None else None
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    local=InMemoryLRUBackend(settings.PRINCIPAL_CACHE_MAX_SIZE),
+    shared=_create_shared_backend(),
+)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = session.info.setdefault("principal_cache_invalidate", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop("principal_cache_invalidate", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("principal_cache_invalidate", None)
@@ -0,0 +1,188 @@
+"""
+Sliding-window-counter rate limiter with pluggable storage.
+
+Each key keeps two counters: the current fixed window and the previous one.
+The request rate is estimated as previous * (1 - elapsed / window) + current,
+so every check is O(1) in time and memory regardless of traffic.
+"""
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult: ...
+
+
+def _estimate(previous: int, current: int, elapsed: float, window: int) -> float:
+    return previous * (1 - elapsed / window) + current
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process backend with bounded memory.
+
+    Keeps at most max_keys entries; the least recently used key is evicted,
+    which at worst forgets the history of an idle client.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [window_index, current_count, previous_count]
+        self._counters: "OrderedDict[str, list]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        window_index = int(now // window)
+        elapsed = now - window_index * window
+
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [window_index, 0, 0]
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != window_index:
+                # Roll windows; anything older than the previous window is dropped
+                counter[2] = counter[1] if counter[0] == window_index - 1 else 0
+                counter[1] = 0
+                counter[0] = window_index
+
+        estimated = _estimate(counter[2], counter[1], elapsed, window)
+        reset_after = int(window - elapsed) + 1
+        if estimated >= limit:
+            return RateLimitResult(False, limit, 0, reset_after)
+
+        counter[1] += 1
+        return RateLimitResult(True, limit, max(0, int(limit - estimated - 1)), reset_after)
+
+
+# KEYS[1] = current window key, KEYS[2] = previous window key
+# ARGV[1] = limit, ARGV[2] = window seconds, ARGV[3] = elapsed in current window
+_SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local window = tonumber(ARGV[2])
+local estimated = previous * (1 - tonumber(ARGV[3]) / window) + current
+if estimated >= tonumber(ARGV[1]) then
+    return {0, tostring(estimated)}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], window * 2)
+return {1, tostring(estimated)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Shared backend for multi-worker deployments.
+
+    Works with any redis.asyncio-compatible client; the check-and-increment
+    runs atomically in a Lua script, one round trip per request.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        window_index = int(now // window)
+        elapsed = now - window_index * window
+        allowed, estimated = await self.client.eval(
+            _SLIDING_WINDOW_LUA,
+            2,
+            f"{self.prefix}{key}:{window_index}",
+            f"{self.prefix}{key}:{window_index - 1}",
+            limit,
+            window,
+            elapsed,
+        )
+        reset_after = int(window - elapsed) + 1
+        if not int(allowed):
+            return RateLimitResult(False, limit, 0, reset_after)
+        return RateLimitResult(True, limit, max(0, int(limit - float(estimated) - 1)), reset_after)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Limit for a group of routes; ip/user limits are per window, None disables the scope."""
+    name: str
+    path_prefixes: Tuple[str, ...]
+    window: int
+    ip_limit: Optional[int] = None
+    user_limit: Optional[int] = None
+
+
+class RateLimiter:
+    """Applies route rules per IP and per user; falls back to memory if the shared backend fails."""
+
+    def __init__(
+        self,
+        rules: Tuple[RateLimitRule, ...],
+        backend: RateLimitBackend,
+        fallback: Optional[RateLimitBackend] = None,
+        on_rejection: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.rules = rules
+        self.backend = backend
+        self.fallback = fallback
+        # (rule name, scope) -> number of rejected requests in this process
+        self.rejections: Counter = Counter()
+        # Called with (rule name, scope) on every rejection, e.g. to export a metric
+        self.on_rejection = on_rejection
+
+    def match(self, path: str) -> RateLimitRule:
+        """First rule whose prefix matches; the last rule is the catch-all."""
+        for rule in self.rules:
+            if any(path.startswith(prefix) for prefix in rule.path_prefixes):
+                return rule
+        return self.rules[-1]
+
+    async def _hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        try:
+            return await self.backend.hit(key, limit, window)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Shared rate limit backend unavailable, using local state: {type(e).__name__}: {e}")
+            return await self.fallback.hit(key, limit, window)
+
+    async def check(self, path: str, client_ip: str, user_id: Optional[str]) -> Tuple[RateLimitRule, RateLimitResult]:
+        """
+        Check and count a request against its rule.
+
+        Returns the most restrictive result among the applicable scopes.
+        """
+        rule = self.match(path)
+        checks: Dict[str, Tuple[str, int]] = {}
+        if rule.ip_limit is not None:
+            checks["ip"] = (f"{rule.name}:ip:{client_ip}", rule.ip_limit)
+        if rule.user_limit is not None and user_id:
+            checks["user"] = (f"{rule.name}:user:{user_id}", rule.user_limit)
+
+        result = RateLimitResult(True, 0, 0, 0)
+        for scope, (key, limit) in checks.items():
+            scope_result = await self._hit(key, limit, rule.window)
+            if not scope_result.allowed:
+                self.rejections[(rule.name, scope)] += 1
+                if self.on_rejection is not None:
+                    self.on_rejection(rule.name, scope)
+                return rule, scope_result
+            if result.limit == 0 or scope_result.remaining < result.remaining:
+                result = scope_result
+        return rule, result
@@ -0,0 +1,188 @@
+"""
+Read replica routing for read-only endpoints.
+
+Handlers that only read take get_read_db instead of get_db and get a session
+on a replica (hot standby) from DATABASE_REPLICA_URLS. Writes always use
+SessionLocal on the primary.
+
+Read-your-writes: every committed write of a user's data bumps their
+data_version (utils.data_version), which also marks the user as a recent
+writer for READ_YOUR_WRITES_SECONDS; meanwhile their reads stay on the
+primary. The marks are shared through Redis when REDIS_URL is set, so the
+next request may land on any worker.
+
+After the window a replica is only used if it is known to be fresh enough:
+ReplicaMonitor compares the replay LSN of every replica with the current WAL
+LSN of the primary every REPLICA_LAG_CHECK_INTERVAL seconds, reports the lag
+as db_replica_lag_seconds and leaves out replicas lagging more than
+READ_YOUR_WRITES_SECONDS - REPLICA_LAG_CHECK_INTERVAL (or unreachable ones).
+Without usable replicas reads go to the primary.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import ReplicaSessionLocal, SessionLocal, engine, replica_engines
+from ..models.user import User
+from .metrics import record_read_session, record_replica_lag
+from .polling_worker import PollingWorker
+from .redis_client import get_redis
+from .security import get_current_user
+
+logger = logging.getLogger(__name__)
+
+# session.info key filled by bump_data_version
+WRITTEN_USERS_KEY = "written_user_ids"
+
+REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) THEN 0"
+    " ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+class RecentWriters:
+    """Users who wrote within the last `window` seconds, per process and in Redis"""
+
+    def __init__(self, window: float, shared=None, prefix: str = "recent_write:"):
+        self.window = window
+        self.shared = shared
+        self.prefix = prefix
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_ids: Iterable[UUID]) -> None:
+        keys = [str(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        expires_at = time.monotonic() + self.window
+        with self._lock:
+            now = time.monotonic()
+            # Expired marks are dropped on writes so the dict stays small
+            for key in [key for key, deadline in self._local.items() if deadline < now]:
+                del self._local[key]
+            for key in keys:
+                self._local[key] = expires_at
+        if self.shared is not None:
+            try:
+                pipeline = self.shared.pipeline(transaction=False)
+                for key in keys:
+                    pipeline.set(self.prefix + key, 1, px=int(self.window * 1000))
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Shared recent writes unavailable: {type(e).__name__}: {e}")
+
+    def contains(self, user_id: UUID) -> bool:
+        key = str(user_id)
+        with self._lock:
+            deadline = self._local.get(key)
+        if deadline is not None and deadline >= time.monotonic():
+            return True
+        if self.shared is None:
+            return False
+        try:
+            return bool(self.shared.exists(self.prefix + key))
+        except Exception as e:
+            # Unknown: the primary is always consistent
+            logger.warning(f"Shared recent writes unavailable: {type(e).__name__}: {e}")
+            return True
+
+
+class Replica:
+    def __init__(self, bind: Engine):
+        self.engine = bind
+        url = bind.url
+        self.name = f"{url.host}:{url.port or 5432}/{url.database}"
+        # Seconds behind the primary; None until measured or while unreachable
+        self.lag: Optional[float] = None
+
+
+class ReplicaMonitor:
+    def __init__(self, replicas: List[Replica], max_lag: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+
+    def usable(self) -> List[Replica]:
+        return [replica for replica in self.replicas if replica.lag is not None and replica.lag <= self.max_lag]
+
+    def pick(self) -> Optional[Replica]:
+        usable = self.usable()
+        return random.choice(usable) if usable else None
+
+    def check(self) -> None:
+        """Measure the lag of every replica against the primary's current LSN"""
+        try:
+            with engine.connect() as connection:
+                primary_lsn = connection.execute(text("SELECT CAST(pg_current_wal_lsn() AS text)")).scalar()
+        except Exception as e:
+            logger.warning(f"Replica lag check: primary unavailable: {type(e).__name__}: {e}")
+            return
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    lag = connection.execute(REPLICA_LAG_SQL, {"primary_lsn": primary_lsn}).scalar()
+            except Exception as e:
+                logger.warning(f"Replica {replica.name} unavailable: {type(e).__name__}: {e}")
+                lag = None
+            # NULL: not a standby, or nothing replayed yet
+            replica.lag = max(float(lag), 0.0) if lag is not None else None
+            record_replica_lag(replica.name, replica.lag)
+
+    async def check_batch(self) -> int:
+        await run_in_threadpool(self.check)
+        # Nothing is queued: the worker sleeps a full interval between checks
+        return 0
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS, shared=get_redis())
+replica_monitor = ReplicaMonitor(
+    [Replica(bind) for bind in replica_engines],
+    max_lag=settings.READ_YOUR_WRITES_SECONDS - settings.REPLICA_LAG_CHECK_INTERVAL,
+)
+lag_worker = PollingWorker(
+    "Replica lag monitor",
+    replica_monitor.check_batch,
+    batch_size=1,
+    poll_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_recent_writers(session: Session) -> None:
+    recent_writers.mark(session.info.pop(WRITTEN_USERS_KEY, ()))
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_recent_writers(session: Session) -> None:
+    session.info.pop(WRITTEN_USERS_KEY, None)
+
+
+def get_read_db(current_user: User = Depends(get_current_user)):
+    """
+    Dependency for read-only endpoints: a replica session, or a primary one
+    while the user has recent writes or no replica is fresh enough.
+    """
+    replica = None
+    if not replica_monitor.replicas:
+        target = "primary_no_replica"
+    elif recent_writers.contains(current_user.id):
+        target = "primary_recent_write"
+    else:
+        replica = replica_monitor.pick()
+        target = "replica" if replica is not None else "primary_replica_lag"
+    record_read_session(target)
+
+    db = ReplicaSessionLocal(bind=replica.engine) if replica is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,181 @@
+"""
+Minimal RRULE (RFC 5545) support for recurring lesson series.
+
+Supports FREQ=DAILY|WEEKLY with INTERVAL, BYDAY (weekly only), COUNT and UNTIL.
+Expansion works on the requested window only: the first period is computed
+arithmetically instead of iterating from the start of the series.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+SUPPORTED_FREQS = ("DAILY", "WEEKLY")
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    freq: str
+    interval: int = 1
+    byday: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+
+def parse_rrule(rule: str, dtstart: datetime) -> RecurrenceRule:
+    """
+    Parse an RRULE string like "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;COUNT=30".
+
+    Raises:
+        ValueError: If the rule is malformed or uses unsupported parts
+    """
+    if not rule or not rule.strip():
+        raise ValueError("RRULE is empty")
+
+    text = rule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+
+    parts = {}
+    for item in text.split(";"):
+        if not item:
+            continue
+        key, sep, value = item.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Invalid RRULE part: {item!r}")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in SUPPORTED_FREQS:
+        raise ValueError(f"Unsupported FREQ: {freq!r}. Supported: {', '.join(SUPPORTED_FREQS)}")
+
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+    except ValueError:
+        raise ValueError("INTERVAL and COUNT must be integers")
+    parts.pop("COUNT", None)
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+
+    until = None
+    if "UNTIL" in parts:
+        raw_until = parts.pop("UNTIL").rstrip("Z")
+        for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+            try:
+                until = datetime.strptime(raw_until, fmt)
+                break
+            except ValueError:
+                continue
+        if until is None:
+            raise ValueError(f"Invalid UNTIL: {raw_until!r}")
+        if len(raw_until) == 8:
+            until = until.replace(hour=23, minute=59, second=59)
+
+    if count is not None and until is not None:
+        raise ValueError("COUNT and UNTIL are mutually exclusive")
+
+    byday: Tuple[int, ...] = ()
+    if "BYDAY" in parts:
+        if freq != "WEEKLY":
+            raise ValueError("BYDAY is supported only with FREQ=WEEKLY")
+        days = parts.pop("BYDAY").split(",")
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError(f"Invalid BYDAY: {','.join(days)}")
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+    elif freq == "WEEKLY":
+        byday = (dtstart.weekday(),)
+
+    if parts:
+        raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(parts))}")
+
+    return RecurrenceRule(freq=freq, interval=interval, byday=byday, count=count, until=until)
+
+
+def _period_occurrences(rule: RecurrenceRule, dtstart: datetime, period: int) -> List[datetime]:
+    """Occurrence starts inside the given period (not filtered by dtstart)."""
+    if rule.freq == "DAILY":
+        return [dtstart + timedelta(days=period * rule.interval)]
+
+    week_start = dtstart - timedelta(days=dtstart.weekday())
+    base = week_start + timedelta(weeks=period * rule.interval)
+    return [base + timedelta(days=day) for day in rule.byday]
+
+
+def _period_length(rule: RecurrenceRule) -> timedelta:
+    if rule.freq == "DAILY":
+        return timedelta(days=rule.interval)
+    return timedelta(weeks=rule.interval)
+
+
+def _occurrences_in_first_period(rule: RecurrenceRule, dtstart: datetime) -> int:
+    return sum(1 for occ in _period_occurrences(rule, dtstart, 0) if occ >= dtstart)
+
+
+def last_occurrence_bound(rule: RecurrenceRule, dtstart: datetime) -> Optional[datetime]:
+    """Upper bound for the start of the last occurrence, or None if the series is infinite."""
+    if rule.until is not None:
+        return rule.until
+    if rule.count is None:
+        return None
+
+    first = _occurrences_in_first_period(rule, dtstart)
+    if rule.count <= first:
+        return _period_length(rule) + dtstart
+    per_period = len(rule.byday) or 1
+    periods = (rule.count - first + per_period - 1) // per_period
+    return dtstart + _period_length(rule) * (periods + 1)
+
+
+def expand_occurrences(
+    rule: RecurrenceRule,
+    dtstart: datetime,
+    window_start: datetime,
+    window_end: datetime,
+    exdates: Iterable[datetime] = (),
+) -> List[datetime]:
+    """
+    Return occurrence starts within [window_start, window_end], excluding exdates.
+
+    Cost is proportional to the number of periods in the window,
+    not to the age of the series.
+    """
+    if window_end < dtstart or window_end < window_start:
+        return []
+
+    excluded = set(exdates or ())
+    period_length = _period_length(rule)
+    per_period = len(rule.byday) or 1
+    first_period_count = _occurrences_in_first_period(rule, dtstart)
+
+    # Jump straight to the period that contains window_start
+    period = 0
+    if window_start > dtstart:
+        anchor = dtstart
+        if rule.freq == "WEEKLY":
+            anchor = (dtstart - timedelta(days=dtstart.weekday())).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+        period = max(0, (window_start - anchor) // period_length - 1)
+
+    # Ordinal (0-based) of the first occurrence in `period`, needed for COUNT
+    ordinal = 0 if period == 0 else first_period_count + (period - 1) * per_period
+
+    result: List[datetime] = []
+    while True:
+        occurrences = _period_occurrences(rule, dtstart, period)
+        if occurrences[0] > window_end:
+            break
+        for occ in occurrences:
+            if occ < dtstart:
+                continue
+            if rule.count is not None and ordinal >= rule.count:
+                return result
+            if rule.until is not None and occ > rule.until:
+                return result
+            ordinal += 1
+            if occ < window_start or occ > window_end or occ in excluded:
+                continue
+            result.append(occ)
+        period += 1
+    return result
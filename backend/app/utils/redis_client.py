@@ -0,0 +1,41 @@
+"""
+Optional Redis clients for state shared between worker processes.
+
+Redis is enabled by REDIS_URL and requires the redis package; when either is
+missing the callers fall back to per-process state.
+"""
+import logging
+from functools import lru_cache
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _import_redis():
+    if not settings.REDIS_URL:
+        return None
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using per-process state")
+        return None
+    return redis
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Synchronous client, or None if Redis is not configured"""
+    redis = _import_redis()
+    if redis is None:
+        return None
+    return redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.2)
+
+
+@lru_cache(maxsize=1)
+def get_async_redis():
+    """asyncio client, or None if Redis is not configured"""
+    redis = _import_redis()
+    if redis is None:
+        return None
+    import redis.asyncio as redis_asyncio
+    return redis_asyncio.Redis.from_url(settings.REDIS_URL, socket_timeout=0.2)
@@ -0,0 +1,14 @@
+"""
+Request id shared by logs and traces.
+
+Set by RequestIdMiddleware for every HTTP request; sync endpoints and
+dependencies see it through the threadpool's copied context.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
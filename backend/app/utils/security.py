@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -9,8 +8,9 @@ from ..config import settings
 from ..database import get_db
 from ..models.user import User
 from ..schemas.user import TokenData
+from .principal_cache import principal_cache
+from .password_hashing import pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -41,7 +41,12 @@ async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get current authenticated user from JWT token"""
+    """
+    Get current authenticated user from JWT token.
+
+    Served from the principal cache when possible; the returned User is then
+    detached from the session. Lock a fresh row explicitly when updating it.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,8 +62,13 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    user = principal_cache.get(token_data.user_id)
+    if user is not None:
+        return user
+
     user = db.query(User).filter(User.id == token_data.user_id).first()
     if user is None:
         raise credentials_exception
 
+    principal_cache.set(user)
     return user
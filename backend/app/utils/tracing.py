@@ -0,0 +1,264 @@
+"""
+Lightweight span tracing for multi-stage operations (homework generation).
+
+    @traced("homework.request")
+    def handler(...):
+        with span("provider.openai", model=model):
+            ...
+
+Spans nest through a context variable; a span opened without a parent starts
+a trace whose id is the current request id (see RequestIdMiddleware), so a
+trace can be matched with the request's log lines. When the root span ends:
+
+- if it took longer than TRACE_SLOW_MS, the whole span tree is logged;
+- if an exporter is configured (TRACE_EXPORT_FILE or TRACE_OTLP_ENDPOINT),
+  the spans are exported in OTLP/JSON on a background thread.
+
+Recording a span is two clock reads and a small object, so tracing stays
+enabled in production; only export is optional.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol
+from ..config import settings
+from .request_context import get_request_id
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "tutorai-crm-api"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent: Optional["Span"] = field(repr=False)
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[tuple] = field(default_factory=list)
+    children: List["Span"] = field(default_factory=list, repr=False)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Record a span around the block; nests under the current span if any"""
+    parent = _current_span.get()
+    trace_id = parent.trace_id if parent is not None else (get_request_id() or uuid.uuid4().hex)
+    current = Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=uuid.uuid4().hex[:16],
+        parent=parent,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        if parent is None:
+            _finish_trace(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for sync functions (FastAPI handlers included)"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def httpx_trace_hook(target: Span) -> Callable[[str, dict], None]:
+    """
+    Callback for httpx's "trace" request extension: records connection setup
+    (TCP/TLS) and the wait for response headers as events on the span.
+    """
+
+    def hook(event_name: str, info: dict) -> None:
+        if event_name.startswith("connection.") or "receive_response_headers" in event_name:
+            target.add_event(event_name)
+
+    return hook
+
+
+def format_tree(root: Span) -> str:
+    """Indented span tree with durations, for logs"""
+    lines: List[str] = []
+
+    def walk(node: Span, depth: int) -> None:
+        parts = [f"{node.name} {node.duration_ms:.1f} ms"]
+        parts.extend(f"{key}={value}" for key, value in node.attributes.items())
+        if node.error:
+            parts.append(f"ERROR {node.error}")
+        lines.append("  " * depth + " ".join(parts))
+        for child in node.children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+def _flatten(root: Span) -> List[Span]:
+    spans, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        spans.append(node)
+        stack.extend(node.children)
+    return spans
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(root: Span) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for one trace"""
+    # OTLP trace ids are 16 bytes; request ids are hex uuids or proxy ids
+    trace_id = root.trace_id if len(root.trace_id) == 32 else uuid.uuid5(uuid.NAMESPACE_OID, root.trace_id).hex
+    spans = []
+    for node in _flatten(root):
+        otlp_span = {
+            "traceId": trace_id,
+            "spanId": node.span_id,
+            "name": node.name,
+            "kind": 1,
+            "startTimeUnixNano": str(node.start_ns),
+            "endTimeUnixNano": str(node.end_ns),
+            "attributes": _otlp_attributes({**node.attributes, "request_id": root.trace_id}),
+            "events": [
+                {"name": name, "timeUnixNano": str(ts), "attributes": _otlp_attributes(attrs)}
+                for name, ts, attrs in node.events
+            ],
+            "status": {"code": 2, "message": node.error} if node.error else {"code": 1},
+        }
+        if node.parent is not None:
+            otlp_span["parentSpanId"] = node.parent.span_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class SpanExporter(Protocol):
+    def export(self, payload: Dict[str, Any]) -> None: ...
+
+
+class FileSpanExporter:
+    """Appends one OTLP/JSON request per line (readable by the collector's file receiver)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OTLPHttpExporter:
+    """POSTs OTLP/JSON to a collector, e.g. http://localhost:4318/v1/traces"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        import httpx
+
+        httpx.post(self.endpoint, json=payload, timeout=self.timeout).raise_for_status()
+
+
+def _create_exporters() -> List[SpanExporter]:
+    exporters: List[SpanExporter] = []
+    if settings.TRACE_EXPORT_FILE:
+        exporters.append(FileSpanExporter(settings.TRACE_EXPORT_FILE))
+    if settings.TRACE_OTLP_ENDPOINT:
+        exporters.append(OTLPHttpExporter(settings.TRACE_OTLP_ENDPOINT))
+    return exporters
+
+
+_exporters = _create_exporters()
+_export_executor: Optional[ThreadPoolExecutor] = None
+_export_pid: Optional[int] = None
+
+
+def _get_export_executor() -> ThreadPoolExecutor:
+    # Created lazily per process: executor threads do not survive fork
+    global _export_executor, _export_pid
+    if _export_executor is None or _export_pid != os.getpid():
+        _export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        _export_pid = os.getpid()
+    return _export_executor
+
+
+def _export(root: Span) -> None:
+    payload = to_otlp(root)
+    for exporter in _exporters:
+        try:
+            exporter.export(payload)
+        except Exception as e:
+            logger.warning(f"Trace export via {type(exporter).__name__} failed: {type(e).__name__}: {e}")
+
+
+def _finish_trace(root: Span) -> None:
+    if settings.TRACE_SLOW_MS and root.duration_ms >= settings.TRACE_SLOW_MS:
+        logger.warning(f"Slow trace {root.trace_id} ({root.duration_ms:.0f} ms):\n{format_tree(root)}")
+    if _exporters:
+        _get_export_executor().submit(_export, root)
@@ -0,0 +1,186 @@
+"""
+Worksheet rendering for generated homework (AIHomework.generated_tasks).
+
+Printable pages come in two variants: "student" (tasks with space for the
+work) and "tutor" (with solutions and answers). TEMPLATE_VERSION is derived
+from the templates below, so cached renders (services/worksheet_cache.py) are
+invalidated whenever a template changes; bump RENDER_REVISION when the
+rendering code changes the output without touching a template.
+"""
+import hashlib
+from html import escape
+from string import Template
+from typing import Any, Dict, List
+
+# Telegram rejects messages longer than 4096 characters
+TELEGRAM_MESSAGE_LIMIT = 4096
+# subject/topic may carry long generation instructions; the header shows a preview
+HEADER_FIELD_LIMIT = 200
+
+
+def homework_tasks(generated_tasks: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return (generated_tasks or {}).get("tasks") or []
+
+
+def _preview(value: str) -> str:
+    value = " ".join((value or "").split())
+    if len(value) <= HEADER_FIELD_LIMIT:
+        return value
+    return value[:HEADER_FIELD_LIMIT - 1] + "…"
+
+
+def _split_block(block: str, limit: int) -> List[str]:
+    """Split an oversized block at line breaks or spaces, never inside a tag or an entity"""
+    parts = []
+    while len(block) > limit:
+        window = block[:limit]
+        cut = max(window.rfind("\n"), window.rfind(" "))
+        if cut <= 0:
+            cut = limit
+            # Back off to before an unterminated tag or entity
+            for opener, closer in (("<", ">"), ("&", ";")):
+                start = window.rfind(opener)
+                if start > window.rfind(closer):
+                    cut = min(cut, start)
+            cut = cut or limit
+        parts.append(block[:cut].rstrip())
+        block = block[cut:].lstrip()
+    if block:
+        parts.append(block)
+    return parts
+
+
+def render_telegram_chunks(
+    subject: str,
+    topic: str,
+    generated_tasks: Dict[str, Any],
+    with_answers: bool = False,
+    limit: int = TELEGRAM_MESSAGE_LIMIT,
+) -> List[str]:
+    """
+    Worksheet as Telegram messages (parse_mode HTML), each at most limit
+    characters. Tasks are packed whole into messages where they fit; the
+    student variant (with_answers=False) leaves out solutions and answers.
+    """
+    blocks = [f"<b>{escape(_preview(subject))}</b>\n{escape(_preview(topic))}"]
+    for index, task in enumerate(homework_tasks(generated_tasks), start=1):
+        block = f"<b>{escape(str(task.get('number', index)))}.</b> {escape(str(task.get('text', '')))}"
+        if with_answers:
+            block += (
+                f"\n<i>Решение:</i> {escape(str(task.get('solution', '')))}"
+                f"\n<i>Ответ:</i> {escape(str(task.get('answer', '')))}"
+            )
+        blocks.append(block)
+
+    chunks: List[str] = []
+    current = ""
+    for block in blocks:
+        for part in _split_block(block, limit):
+            if current and len(current) + 2 + len(part) <= limit:
+                current += "\n\n" + part
+            else:
+                if current:
+                    chunks.append(current)
+                current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+WORKSHEET_VARIANTS = ("student", "tutor")
+RENDER_REVISION = 1
+
+WORKSHEET_CSS = """
+@page { size: A4; margin: 18mm 16mm; }
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 12pt; line-height: 1.45; color: #111; }
+header { border-bottom: 1px solid #999; margin-bottom: 14pt; padding-bottom: 6pt; }
+h1 { font-size: 16pt; margin: 0 0 4pt; }
+.meta { color: #555; font-size: 10pt; }
+.task { break-inside: avoid; margin-bottom: 14pt; }
+.task-number { font-weight: bold; }
+.text { white-space: pre-wrap; }
+.work { border-bottom: 1px dotted #aaa; height: 18pt; }
+.solution { margin-top: 6pt; padding-left: 10pt; border-left: 3px solid #4a7; white-space: pre-wrap; }
+.answer { font-weight: bold; }
+"""
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>$css</style>
+</head>
+<body>
+<header>
+<h1>$title</h1>
+<div class="meta">$topic</div>
+<div class="meta">$meta</div>
+</header>
+$tasks
+</body>
+</html>
+""")
+
+TASK_TEMPLATE = Template("""<section class="task">
+<div><span class="task-number">$number.</span> <span class="text">$text</span></div>
+$extra
+</section>""")
+
+STUDENT_EXTRA = '<div class="work"></div><div class="work"></div><div class="work"></div>'
+
+SOLUTION_TEMPLATE = Template("""<div class="solution">$solution
+<div class="answer">Ответ: $answer</div></div>""")
+
+TEMPLATE_VERSION = hashlib.sha256(
+    "\0".join((
+        str(RENDER_REVISION),
+        WORKSHEET_CSS,
+        PAGE_TEMPLATE.template,
+        TASK_TEMPLATE.template,
+        STUDENT_EXTRA,
+        SOLUTION_TEMPLATE.template,
+    )).encode()
+).hexdigest()[:12]
+
+
+def render_worksheet_html(
+    subject: str,
+    topic: str,
+    generated_tasks: Dict[str, Any],
+    variant: str,
+) -> str:
+    """Printable HTML page of the worksheet in the given variant"""
+    with_solutions = variant == "tutor"
+    tasks = []
+    for index, task in enumerate(homework_tasks(generated_tasks), start=1):
+        if with_solutions:
+            extra = SOLUTION_TEMPLATE.substitute(
+                solution=escape(str(task.get("solution", ""))),
+                answer=escape(str(task.get("answer", ""))),
+            )
+        else:
+            extra = STUDENT_EXTRA
+        tasks.append(TASK_TEMPLATE.substitute(
+            number=escape(str(task.get("number", index))),
+            text=escape(str(task.get("text", ""))),
+            extra=extra,
+        ))
+    meta = "Вариант с решениями" if with_solutions else "Ученик: ________________"
+    return PAGE_TEMPLATE.substitute(
+        title=escape(_preview(subject)),
+        topic=escape(_preview(topic)),
+        meta=escape(meta),
+        css=WORKSHEET_CSS,
+        tasks="\n".join(tasks),
+    )
+
+
+def render_pdf(html: str) -> bytes:
+    """
+    HTML to PDF with WeasyPrint (optional dependency, needs the Pango system
+    libraries). Raises ImportError when it is not installed.
+    """
+    from weasyprint import HTML
+
+    return HTML(string=html).write_pdf()
@@ -0,0 +1,53 @@
+"""
+Per-worker warm-up, run from the lifespan handler before traffic is accepted.
+
+With gunicorn preload the app is imported once in the master and forked, so
+this must not run at import time: connections opened before the fork would be
+shared between workers.
+"""
+import logging
+import time
+from typing import Callable, List
+from sqlalchemy import text
+from .config import settings
+from .database import engine
+from .services.ai_generator import warm_up_clients
+from .utils.homework_validator import warm_up as warm_up_validator
+from .utils.password_hashing import password_hasher
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_db_pool() -> None:
+    """Open DB_POOL_SIZE connections at once so none is created on a request"""
+    connections = []
+    try:
+        for _ in range(settings.DB_POOL_SIZE):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+WARM_UP_STEPS: List[Callable[[], None]] = [
+    warm_up_db_pool,
+    warm_up_clients,
+    warm_up_validator,
+    password_hasher.warm_up,
+]
+
+
+def warm_up() -> None:
+    """Run every step; a failing step is logged and does not block startup"""
+    started = time.perf_counter()
+    for step in WARM_UP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Warm-up step {step.__name__} failed: {type(e).__name__}: {e}")
+            continue
+        logger.info(f"Warm-up step {step.__name__}: {(time.perf_counter() - step_started) * 1000:.0f} ms")
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms")
@@ -0,0 +1,115 @@
+"""
+Request latency with INFO logging under load: synchronous handler vs queue pipeline.
+
+The sink simulates a slow stdout (journald/docker log driver under pressure)
+by sleeping on every write. "sync" attaches a StreamHandler directly to the
+root logger, as before; "queue" is utils.logging_config.setup_logging, where
+the request thread only enqueues the record.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_logging --requests 2000 --sink-latency-ms 0.5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.middleware import RequestIdMiddleware
+from app.utils.logging_config import setup_logging, stop_logging, truncate
+
+logger = logging.getLogger("bench")
+
+
+class SlowSink:
+    """File-like object whose writes block for a fixed time"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        self.lines += 1
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    payload = {"tasks": [{"number": i, "text": "x" * 200} for i in range(25)]}
+
+    @app.get("/work")
+    def work():
+        logger.info("Loaded 20 lessons for calendar")
+        logger.info(f"Homework payload: {truncate(payload, 1000)}")
+        for number in range(5):
+            logger.warning(f"Task #{number} failed validation", extra={"sample_key": "task_rejected"})
+        return {"status": "ok"}
+
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+def configure(mode: str, sink: SlowSink) -> None:
+    if mode == "sync":
+        stop_logging()
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root = logging.getLogger()
+        root.handlers.clear()
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        stdout, sys.stdout = sys.stdout, sink
+        try:
+            setup_logging(log_level="INFO")
+        finally:
+            sys.stdout = stdout
+
+
+async def measure(requests: int, concurrency: int) -> list:
+    transport = httpx.ASGITransport(app=build_app())
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/work")
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--sink-latency-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for mode in ("sync", "queue"):
+        sink = SlowSink(args.sink_latency_ms / 1000)
+        configure(mode, sink)
+        latencies = sorted(asyncio.run(measure(args.requests, args.concurrency)))
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{mode:>5}: p50 {statistics.median(latencies):7.2f} ms  p99 {p99:7.2f} ms  "
+            f"lines written during run {sink.lines}"
+        )
+    stop_logging()
+
+
+if __name__ == "__main__":
+    main()
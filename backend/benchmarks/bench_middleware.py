@@ -0,0 +1,134 @@
+"""
+Requests per second through the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Runs in-process via httpx.ASGITransport against /health and a typical
+authenticated GET (bearer token decoded in a dependency, small JSON list).
+The "legacy" stack reproduces the previous BaseHTTPMiddleware implementations.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_middleware --requests 3000
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.middleware import RateLimitMiddleware, SecurityHeadersMiddleware
+from app.utils.rate_limiter import InMemoryRateLimitBackend, RateLimiter, RateLimitRule
+from app.utils.security import create_access_token
+
+BENCH_RULES = (RateLimitRule("general", ("/",), window=60, ip_limit=10**9, user_limit=10**9),)
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        forwarded_proto = request.headers.get("X-Forwarded-Proto", "")
+        is_https = request.url.scheme == "https" or forwarded_proto == "https"
+        enforce_https = settings.FRONTEND_URL.startswith("https://")
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Content-Security-Policy"] = (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+            "style-src 'self' 'unsafe-inline'; "
+            "img-src 'self' data: https:; "
+            "font-src 'self' data:; "
+            "connect-src 'self'"
+        )
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
+        if is_https or enforce_https:
+            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Same limiter, wrapped in BaseHTTPMiddleware, to isolate the wrapper overhead."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = RateLimiter(BENCH_RULES, InMemoryRateLimitBackend())
+
+    async def dispatch(self, request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        _, result = await self.limiter.check(request.url.path, client_ip, None)
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        return response
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+    oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+    def current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["sub"]
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "ok"}
+
+    @app.get("/api/items")
+    def items(user_id: str = Depends(current_user_id)):
+        return [{"id": i, "owner": user_id, "name": f"Item {i}"} for i in range(20)]
+
+    if stack == "legacy":
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyRateLimitMiddleware)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=RateLimiter(BENCH_RULES, InMemoryRateLimitBackend()),
+        )
+    return app
+
+
+async def measure(stack: str, path: str, requests: int, concurrency: int, headers: dict) -> float:
+    transport = httpx.ASGITransport(app=build_app(stack))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main_async(requests: int, concurrency: int) -> None:
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000001"}, timedelta(hours=1))
+    auth = {"Authorization": f"Bearer {token}"}
+    for path, headers in (("/health", {}), ("/api/items", auth)):
+        for stack in ("legacy", "asgi"):
+            rps = await measure(stack, path, requests, concurrency, headers)
+            print(f"{path:<12} {stack:>6}: {rps:8.0f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Login throughput under contention: request threadpool vs dedicated process pool.
+
+Simulates a burst of logins while "light" sync endpoints keep running in the
+same request threadpool, and reports login throughput and light-request latency.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_password_hashing --logins 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.password_hashing import PasswordHasher, pwd_context
+
+# Starlette/anyio default threadpool size for sync endpoints
+REQUEST_THREADS = 40
+
+
+def _light_request() -> None:
+    # Stand-in for a cheap sync endpoint (a few microseconds of Python work)
+    sum(range(1000))
+
+
+async def _light_traffic(pool: ThreadPoolExecutor, stop: asyncio.Event, latencies: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = time.perf_counter()
+        await loop.run_in_executor(pool, _light_request)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def _run(mode: str, logins: int, workers: int) -> None:
+    loop = asyncio.get_running_loop()
+    request_pool = ThreadPoolExecutor(max_workers=REQUEST_THREADS)
+    hasher = PasswordHasher(workers=workers, max_pending=logins)
+    hashed = pwd_context.hash("correct horse battery staple")
+    if mode == "process":
+        hasher.warm_up()
+        await hasher.verify_and_update("warm-up", hashed)
+
+    async def login() -> None:
+        if mode == "threadpool":
+            await loop.run_in_executor(request_pool, pwd_context.verify, "correct horse battery staple", hashed)
+        else:
+            await hasher.verify_and_update("correct horse battery staple", hashed)
+
+    stop = asyncio.Event()
+    latencies: list = []
+    traffic = [asyncio.create_task(_light_traffic(request_pool, stop, latencies)) for _ in range(5)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*traffic)
+    hasher.shutdown()
+    request_pool.shutdown()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(
+        f"{mode:>10}: {logins / elapsed:7.1f} logins/s | light requests: "
+        f"n={len(latencies)} p50={statistics.median(latencies or [0]):.2f}ms p95={p95:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2, help="process pool size")
+    args = parser.parse_args()
+
+    for mode in ("threadpool", "process"):
+        asyncio.run(_run(mode, args.logins, args.workers))
+
+
+if __name__ == "__main__":
+    main()
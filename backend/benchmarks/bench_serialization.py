@@ -0,0 +1,87 @@
+"""
+Serialization cost of large lesson lists: response_model path vs fast path.
+
+"model" reproduces what FastAPI does with response_model=List[LessonResponse]:
+validate the returned dicts, dump them in JSON mode, then json.dumps.
+"fast" is utils.fast_json: precomputed field list + orjson (stdlib if missing).
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_serialization --rows 1000 10000
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.models.lesson import LessonStatus, PaymentStatus
+from app.schemas.lesson import LessonResponse
+from app.schemas.serializers import LESSON_SERIALIZER
+from app.utils.fast_json import dumps, orjson, serialize_many
+
+
+def make_rows(count: int) -> list:
+    user_id = uuid.uuid4()
+    student_id = uuid.uuid4()
+    start = datetime(2025, 1, 6, 10, 0)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "student_id": student_id,
+            "datetime_start": start + timedelta(hours=i),
+            "datetime_end": start + timedelta(hours=i, minutes=60),
+            "status": LessonStatus.SCHEDULED,
+            "payment_status": PaymentStatus.PARTIAL,
+            "amount": Decimal("1500.00"),
+            "remaining_amount": Decimal("500.00"),
+            "notes": "Квадратные уравнения",
+            "series_id": None,
+            "original_start": None,
+        }
+        for i in range(count)
+    ]
+
+
+def via_response_model(adapter: TypeAdapter, rows: list) -> bytes:
+    validated = adapter.validate_python(rows)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def via_fast_path(rows: list) -> bytes:
+    return dumps(serialize_many(LESSON_SERIALIZER, rows))
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[LessonResponse])
+    print(f"encoder: {'orjson' if orjson is not None else 'stdlib json'}")
+    for count in args.rows:
+        rows = make_rows(count)
+        assert json.loads(via_fast_path(rows)) == json.loads(via_response_model(adapter, rows))
+        model_ms = best_of(lambda: via_response_model(adapter, rows), args.repeat)
+        fast_ms = best_of(lambda: via_fast_path(rows), args.repeat)
+        print(f"{count:>6} rows  model: {model_ms:8.1f} ms  fast: {fast_ms:8.1f} ms  x{model_ms / fast_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Cold start and first-request latency, with and without startup warm-up.
+
+Each run is a fresh interpreter: import app.main, run the lifespan startup,
+then time the first and second request to each path in-process.
+Authenticated paths need a valid token for an existing user (--token) and a
+reachable database.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_startup --runs 3 --token <jwt>
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+import httpx
+
+async def main(paths, token):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    result = {"import_ms": (imported - started) * 1000}
+    async with app.router.lifespan_context(app):
+        result["startup_ms"] = (time.perf_counter() - imported) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in paths:
+                timings = []
+                for _ in range(2):
+                    t = time.perf_counter()
+                    await client.get(path, headers=headers)
+                    timings.append((time.perf_counter() - t) * 1000)
+                result[path] = timings
+    print(json.dumps(result))
+
+asyncio.run(main(sys.argv[1:-1], sys.argv[-1]))
+"""
+
+
+def run_once(warm: bool, paths: list, token: str) -> dict:
+    env = dict(os.environ, WARM_UP_ON_STARTUP="true" if warm else "false", RATE_LIMIT_ENABLED="false")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, *paths, token],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--token", default="")
+    parser.add_argument("--paths", nargs="+", default=None)
+    args = parser.parse_args()
+    paths = args.paths or (["/health", "/api/students/", "/api/lessons/"] if args.token else ["/health"])
+
+    for warm in (False, True):
+        runs = [run_once(warm, paths, args.token) for _ in range(args.runs)]
+        print(f"warm-up {'on' if warm else 'off'}:")
+        for key in ("import_ms", "startup_ms"):
+            print(f"  {key:<16} {statistics.median(r[key] for r in runs):8.1f}")
+        for path in paths:
+            first = statistics.median(r[path][0] for r in runs)
+            second = statistics.median(r[path][1] for r in runs)
+            print(f"  {path:<16} first {first:8.1f} ms  second {second:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Telegram worksheet delivery throughput (messages per second) against a local Bot API stand-in.
+
+The stand-in (benchmarks/stand_in.py) answers sendMessage like Telegram does
+under flood control: 429 with parameters.retry_after once a bot exceeds
+--server-rate messages per second overall or sends to one chat more often than
+once per --server-chat-interval seconds. Worksheets are rendered with
+render_telegram_chunks and sent through telegram.send_deliveries, the code the
+outbox worker runs for every claimed batch; the database side is not involved.
+Message order within every chat is checked at the end.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_telegram --chats 200 --tasks 10 --rate 25
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict, deque
+
+from app.config import settings
+from app.services import telegram
+from app.services.telegram import Delivery, SendRateLimiter
+from app.utils.worksheet import render_telegram_chunks
+from benchmarks.stand_in import JsonStandIn
+
+
+class BotApiStandIn(JsonStandIn):
+    def __init__(self, latency: float, rate: float, chat_interval: float):
+        super().__init__()
+        self.latency = latency
+        self.rate = rate
+        self.chat_interval = chat_interval
+        self.recent: deque = deque()
+        self.last_by_chat: dict = {}
+        self.received = defaultdict(list)
+        self.rejected = 0
+
+    async def respond(self, method: str, target: str, headers: dict, body: bytes):
+        await asyncio.sleep(self.latency)
+        if not target.endswith("/sendMessage"):
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        message = json.loads(body)
+        chat_id = message["chat_id"]
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] >= 1.0:
+            self.recent.popleft()
+        # Small tolerance for timer jitter between client and server
+        chat_too_soon = now - self.last_by_chat.get(chat_id, -1e9) < self.chat_interval * 0.9
+        if len(self.recent) >= self.rate or chat_too_soon:
+            self.rejected += 1
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            }
+        self.recent.append(now)
+        self.last_by_chat[chat_id] = now
+        self.received[chat_id].append(message["text"])
+        return 200, {"ok": True, "result": {"message_id": len(self.received[chat_id]), "chat": {"id": chat_id}}}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chats", type=int, default=200, help="recipients (one worksheet each)")
+    parser.add_argument("--tasks", type=int, default=10, help="tasks per worksheet")
+    parser.add_argument("--task-chars", type=int, default=900, help="length of each task text")
+    parser.add_argument("--rate", type=float, default=25, help="client messages/second (TELEGRAM_RATE_LIMIT)")
+    parser.add_argument("--chat-interval", type=float, default=1.0, help="client TELEGRAM_CHAT_INTERVAL")
+    parser.add_argument("--server-rate", type=float, default=30)
+    parser.add_argument("--server-chat-interval", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    stand_in = BotApiStandIn(args.latency_ms / 1000, args.server_rate, args.server_chat_interval)
+    port = stand_in.start()
+    settings.TELEGRAM_API_URL = f"http://127.0.0.1:{port}"
+    settings.TELEGRAM_BOT_TOKEN = "123456:bench"
+
+    generated_tasks = {
+        "tasks": [
+            {"number": n, "text": "Решите уравнение x² − 5x + 6 = 0. " * (args.task_chars // 34), "solution": "", "answer": ""}
+            for n in range(1, args.tasks + 1)
+        ]
+    }
+    chunks = render_telegram_chunks("Математика", "Квадратные уравнения", generated_tasks)
+    deliveries = [Delivery(uuid.uuid4(), 10_000 + chat, chunks, 0) for chat in range(args.chats)]
+    total = len(deliveries) * len(chunks)
+    print(f"{args.chats} chats x {len(chunks)} message(s) = {total} messages")
+
+    limiter = SendRateLimiter(args.rate, args.chat_interval)
+    started = time.perf_counter()
+    pending = deliveries
+    rounds = 0
+    while pending:
+        # Failed deliveries are retried from their last sent chunk, like the outbox does
+        rounds += 1
+        results = await telegram.send_deliveries(pending, limiter)
+        pending = [
+            delivery._replace(sent_chunks=results[delivery.id].sent_chunks)
+            for delivery in pending
+            if results[delivery.id].error is not None
+        ]
+    elapsed = time.perf_counter() - started
+    await telegram.close_client()
+
+    in_order = all(stand_in.received[d.chat_id] == chunks for d in deliveries)
+    print(
+        f"sent {total} messages in {elapsed:.2f}s: {total / elapsed:.1f} msg/s, "
+        f"{stand_in.rejected} rejected with 429, {rounds} round(s), "
+        f"{stand_in.connections} connection(s), order {'ok' if in_order else 'BROKEN'}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
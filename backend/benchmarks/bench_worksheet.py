@@ -0,0 +1,72 @@
+"""
+Worksheet download cost: rendering HTML/PDF vs serving the cached file.
+
+Renders a 10-task worksheet in both variants through render_to_cache into a
+temporary WORKSHEET_CACHE_DIR, then times cache hits (lookup plus a full file
+read, as the download endpoint streams it). PDF is skipped when WeasyPrint is
+not installed.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_worksheet --repeat 200
+"""
+import argparse
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services.worksheet_cache import cached_worksheet, render_to_cache
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=10)
+    args = parser.parse_args()
+
+    settings.WORKSHEET_CACHE_DIR = tempfile.mkdtemp(prefix="bench-worksheets-")
+    homework = SimpleNamespace(
+        id=uuid.uuid4(),
+        subject="Математика",
+        topic="Квадратные уравнения и теорема Виета",
+        generated_tasks={"tasks": [
+            {
+                "number": n,
+                "text": "Решите уравнение x² − 5x + 6 = 0 и проверьте ответ подстановкой. " * 3,
+                "solution": "По теореме Виета x₁ + x₂ = 5, x₁·x₂ = 6, откуда x₁ = 2, x₂ = 3. " * 3,
+                "answer": "2; 3",
+            }
+            for n in range(1, args.tasks + 1)
+        ]},
+    )
+
+    for fmt in ("html", "pdf"):
+        for variant in ("student", "tutor"):
+            try:
+                render_ms = timed(lambda: render_to_cache(homework, variant, fmt), max(args.repeat // 20, 1))
+            except ImportError:
+                print(f"{fmt}: skipped (weasyprint is not installed)")
+                break
+            size = cached_worksheet(homework.id, variant, fmt).stat().st_size
+
+            def hit() -> None:
+                cached_worksheet(homework.id, variant, fmt).read_bytes()
+
+            hit_ms = timed(hit, args.repeat)
+            print(
+                f"{fmt:>4} {variant:>7}: render {render_ms:8.3f} ms, "
+                f"cache hit {hit_ms:6.3f} ms ({size} bytes), {render_ms / hit_ms:6.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+YooKassa client against a local stand-in: event loop stalls, retries, idempotency.
+
+Starts a local server (benchmarks/stand_in.py) emulating POST /v3/payments and
+GET /v3/payments/{id} with a fixed latency and failing every Nth request with 503.
+Concurrent create/verify calls go through app.services.yukassa while a ticker
+task measures how late the event loop wakes up. The "blocking" mode repeats
+the verify calls the way the webhook used to make them (a fresh sync
+httpx.Client inside the async handler) for comparison.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.bench_yukassa --calls 200 --latency-ms 50 --fail-every 5
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+from app.config import settings
+from app.services import yukassa
+from benchmarks.stand_in import JsonStandIn
+
+
+class YooKassaStandIn(JsonStandIn):
+    """Enough of the YooKassa payments API for the client"""
+
+    def __init__(self, latency: float, fail_every: int):
+        super().__init__()
+        self.latency = latency
+        self.fail_every = fail_every
+        self.failures = 0
+        self.payments: dict = {}
+        self.by_idempotence_key: dict = {}
+
+    async def respond(self, method: str, target: str, headers: dict, body: bytes):
+        await asyncio.sleep(self.latency)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            self.failures += 1
+            return 503, {"type": "error", "code": "internal_server_error"}
+        if method == "POST" and target == "/v3/payments":
+            key = headers["idempotence-key"]
+            if key not in self.by_idempotence_key:
+                payment_id = str(uuid.uuid4())
+                self.payments[payment_id] = {
+                    "id": payment_id,
+                    "status": "succeeded",
+                    "amount": json.loads(body)["amount"],
+                    "confirmation": {"type": "redirect", "confirmation_url": f"https://example.test/{payment_id}"},
+                    "metadata": {},
+                }
+                self.by_idempotence_key[key] = payment_id
+            return 200, self.payments[self.by_idempotence_key[key]]
+        if method == "GET" and target.startswith("/v3/payments/"):
+            payment = self.payments.get(target.rsplit("/", 1)[1])
+            return (200, payment) if payment else (404, {"type": "error", "code": "not_found"})
+        return 404, {"type": "error", "code": "not_found"}
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(mode: str, stand_in: YooKassaStandIn, calls: int, concurrency: int) -> None:
+    created = await yukassa.create_payment(990.0, "Подписка", "https://example.test/ok", "bench@example.test")
+    payment_id = created["id"]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def verify_async() -> None:
+        async with semaphore:
+            assert (await yukassa.verify_payment(payment_id))["status"] == "succeeded"
+
+    async def verify_blocking() -> None:
+        # Previous webhook behaviour: sync client inside an async handler
+        async with semaphore:
+            with httpx.Client() as client:
+                client.get(
+                    f"{settings.YUKASSA_API_URL}/payments/{payment_id}",
+                    auth=(settings.YUKASSA_SHOP_ID, settings.YUKASSA_SECRET_KEY),
+                )
+
+    call = verify_async if mode == "async" else verify_blocking
+    requests_before, connections_before = stand_in.requests, stand_in.connections
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag_task
+    print(
+        f"{mode:>8}: {calls} verifications in {elapsed:.2f}s, "
+        f"max loop stall {worst_lag * 1000:.0f} ms, "
+        f"{stand_in.requests - requests_before} HTTP requests, "
+        f"{stand_in.connections - connections_before} new connections"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--fail-every", type=int, default=5, help="answer every Nth request with 503 (0: never)")
+    args = parser.parse_args()
+
+    stand_in = YooKassaStandIn(args.latency_ms / 1000, args.fail_every)
+    port = stand_in.start()
+    settings.YUKASSA_API_URL = f"http://127.0.0.1:{port}/v3"
+    settings.YUKASSA_SHOP_ID = "bench"
+    settings.YUKASSA_SECRET_KEY = "bench"
+    yukassa.BACKOFF_BASE = 0.01
+
+    await run("async", stand_in, args.calls, args.concurrency)
+    print(f"          retried {stand_in.failures} injected 503s, "
+          f"{len(stand_in.payments)} payment(s) created for 1 create_payment call")
+    stand_in.fail_every = 0
+    await run("blocking", stand_in, args.calls, args.concurrency)
+    await yukassa.close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Import-time budget for `import app.main`, measured with `python -X importtime`.
+
+Exits with status 1 (failing the CI step) when the total import time exceeds
+the budget or when an optional integration is imported eagerly. Prints the
+top-level packages with the most self time to show where the time goes.
+tests/test_import_time.py runs the same check under pytest.
+
+The total is the fastest of --runs runs: scheduling noise only adds time, so
+the minimum is stable where single runs of the same tree vary by 30% and more.
+The default budget leaves about 2x headroom over the minimum measured on a
+developer machine (1100-1450 ms) and still catches an eager heavy import.
+
+Run from backend/:
+    SECRET_KEY=$(python -c 'import secrets; print(secrets.token_urlsafe(32))') \
+        python -m benchmarks.check_import_time
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Loaded on first use only (AI generation, billing)
+LAZY_MODULES = ("openai", "httpx")
+DEFAULT_BUDGET_MS = 2500
+
+
+def measure() -> Tuple[float, Dict[str, float], List[str]]:
+    """Total import time (ms), self time per top-level package (ms) and all imported modules"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stderr
+
+    total_us = 0
+    per_package: Dict[str, float] = defaultdict(float)
+    modules: List[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # Lines are "import time: self | cumulative | <indent>name". Self times
+        # add up to the total without counting nested imports twice, whatever
+        # module triggered them
+        self_us, _, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        modules.append(module)
+        total_us += int(self_us)
+        per_package[module.split(".")[0]] += int(self_us) / 1000
+    return total_us / 1000, per_package, modules
+
+
+def check(budget_ms: float, runs: int) -> Tuple[float, Dict[str, float], List[str]]:
+    """
+    Fastest total of runs, per-package times of that run and the list of
+    failures (empty when within budget)
+    """
+    total_ms, per_package, modules = min((measure() for _ in range(runs)), key=lambda run: run[0])
+    failures = []
+    eager = sorted({m for m in modules if m.split(".")[0] in LAZY_MODULES})
+    if eager:
+        failures.append(f"optional integrations imported at startup: {', '.join(eager[:5])}")
+    if total_ms > budget_ms:
+        failures.append(f"import time budget exceeded: {total_ms:.0f} ms > {budget_ms:.0f} ms")
+    return total_ms, per_package, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total_ms, per_package, failures = check(args.budget_ms, args.runs)
+    print(f"import app.main: {total_ms:.0f} ms (fastest of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for package, ms in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<24} {ms:8.1f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
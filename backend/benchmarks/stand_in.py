@@ -0,0 +1,62 @@
+"""
+Minimal local stand-in for third-party JSON HTTP APIs (YooKassa, Telegram Bot API).
+
+Subclasses implement respond(); the server speaks keep-alive HTTP/1.1 and runs
+on its own thread and event loop, so blocking clients in the benchmark cannot
+stall it.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Tuple
+
+
+class JsonStandIn:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections = 0
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        raise NotImplementedError
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                status, payload = await self.respond(method, target, headers, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+    def start(self) -> int:
+        """Serve on a daemon thread; returns the port"""
+        ready = threading.Event()
+        port = []
+
+        async def serve() -> None:
+            server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+            port.append(server.sockets[0].getsockname()[1])
+            ready.set()
+            async with server:
+                await server.serve_forever()
+
+        threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+        ready.wait()
+        return port[0]
@@ -0,0 +1,67 @@
+"""
+Production server profile.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Environment:
+    WEB_CONCURRENCY         number of worker processes (default: 2 * CPU + 1, max 8)
+    BIND                    listen address (default: 127.0.0.1:8000)
+    GRACEFUL_TIMEOUT        seconds a stopping worker may spend finishing in-flight
+                            requests, e.g. homework generation (default: 330,
+                            above the 300 s provider timeout)
+    KEEPALIVE               keep-alive seconds behind nginx (default: 5)
+    PROMETHEUS_MULTIPROC_DIR  directory for per-worker metric files, aggregated
+                            by /metrics (default: /tmp/tutorai-metrics)
+
+The app is imported once in the master (preload_app) and forked, so workers
+share the already imported code. Per-worker warm-up (DB pool, provider clients,
+validator patterns) runs in the app's lifespan handler after the fork.
+"""
+import multiprocessing
+import os
+import shutil
+
+# Must be set before the app (and prometheus_client) is imported by preload
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/tutorai-metrics")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+bind = os.getenv("BIND", "127.0.0.1:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# On SIGTERM/SIGHUP workers stop accepting connections and drain; after
+# graceful_timeout the master kills them
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 330))
+# Worker heartbeat timeout; async workers keep heartbeating during long requests
+timeout = 60
+keepalive = int(os.getenv("KEEPALIVE", 5))
+
+# Recycle workers occasionally to bound memory growth; jitter avoids simultaneous restarts
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def post_fork(server, worker):
+    # Drop any pooled connections inherited from the master without closing
+    # them (the master owns the sockets)
+    from app.database import engine
+
+    engine.dispose(close=False)
+
+
+def on_starting(server):
+    # Samples of a previous run must not leak into the new aggregate. Runs once,
+    # before workers are forked; workers reopen their files under their own pid
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,98 @@
+"""
+Shared fixtures.
+
+Endpoint tests run the app in-process against DATABASE_URL, a PostgreSQL
+database migrated to head (alembic upgrade head); they are skipped when it is
+unreachable. Every test user is registered with a unique email, so the
+database may be shared with development data.
+
+assert_max_queries guards endpoints against N+1 and round-trip regressions:
+
+    def test_students_list(client, auth_headers, assert_max_queries):
+        with assert_max_queries(3):
+            client.get("/api/students/", headers=auth_headers)
+"""
+import contextvars
+import os
+import secrets
+import uuid
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Dict, Iterator, List
+
+import pytest
+
+# Before the app (and its settings) is imported
+os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+os.environ["SQL_DEBUG_HEADERS"] = "true"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("WARM_UP_ON_STARTUP", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from app.database import engine
+    from app.main import app
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"database unavailable: {type(e).__name__}")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client) -> Dict[str, str]:
+    """Authorization header of a newly registered user"""
+    email = f"test-{uuid.uuid4().hex[:12]}@example.com"
+    password = secrets.token_urlsafe(12)
+    response = client.post("/api/auth/register", json={"email": email, "password": password, "name": "Test"})
+    assert response.status_code == 201, response.text
+    response = client.post("/api/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Cache the principal, so counts do not depend on which request comes first
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    return headers
+
+
+@pytest.fixture
+def assert_max_queries(client) -> Callable[[int], ContextManager[List[int]]]:
+    """
+    Context manager failing the test when the block runs more than
+    max_queries SQL statements: the X-DB-Queries of every response received
+    in it plus statements run by the test itself (utils.metrics.query_budget).
+    Yields the per-response counts.
+    """
+    from app.utils.metrics import QueryBudgetExceeded, query_budget
+
+    @contextmanager
+    def check(max_queries: int) -> Iterator[List[int]]:
+        counts: List[int] = []
+        send = client.send
+
+        def send_in_fresh_context(*args, **kwargs):
+            # A server starts every request in an empty context; the portal of
+            # TestClient would pass the test's query_budget stats into the app
+            response = contextvars.Context().run(send, *args, **kwargs)
+            counts.append(int(response.headers["x-db-queries"]))
+            return response
+
+        client.send = send_in_fresh_context
+        try:
+            with query_budget(max_queries) as stats:
+                yield counts
+        finally:
+            del client.send
+        total = stats.db_queries + sum(counts)
+        if total > max_queries:
+            raise QueryBudgetExceeded(
+                f"{total} SQL queries ({stats.db_queries} in the test, {counts} in responses), budget is {max_queries}"
+            )
+
+    return check
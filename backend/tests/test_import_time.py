@@ -0,0 +1,7 @@
+"""Import-time budget of app.main (benchmarks/check_import_time.py) as a test."""
+from benchmarks.check_import_time import DEFAULT_BUDGET_MS, check
+
+
+def test_import_time_within_budget():
+    total_ms, _, failures = check(DEFAULT_BUDGET_MS, runs=5)
+    assert not failures, f"import app.main took {total_ms:.0f} ms: {'; '.join(failures)}"
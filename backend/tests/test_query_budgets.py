@@ -0,0 +1,84 @@
+"""SQL statements per request of the read endpoints; counts must not grow with the data."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.utils.metrics import QueryBudgetExceeded
+
+STUDENTS = 4
+TODAY = date.today()
+
+
+@pytest.fixture
+def student_ids(client, auth_headers):
+    """Students with a partly paid lesson each, the first one with a weekly series"""
+    start = datetime.combine(TODAY, datetime.min.time()) + timedelta(days=1, hours=10)
+    ids = []
+    for i in range(STUDENTS):
+        response = client.post("/api/students/", json={"name": f"Student {i}", "subject": "Math"}, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        student_id = response.json()["id"]
+        ids.append(student_id)
+        response = client.post(
+            "/api/lessons/",
+            json={
+                "student_id": student_id,
+                "datetime_start": (start + timedelta(hours=i)).isoformat(),
+                "datetime_end": (start + timedelta(hours=i, minutes=50)).isoformat(),
+                "amount": "500",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201, response.text
+        response = client.post(
+            "/api/payments/",
+            json={
+                "student_id": student_id,
+                "lesson_id": response.json()["id"],
+                "amount": "200",
+                "payment_method": "cash",
+                "payment_date": TODAY.isoformat(),
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201, response.text
+    response = client.post(
+        "/api/lesson-series/",
+        json={
+            "student_id": ids[0],
+            "dtstart": (start + timedelta(hours=8)).isoformat(),
+            "rrule": "FREQ=WEEKLY;COUNT=4",
+            "duration_minutes": 60,
+            "amount": "500",
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 201, response.text
+    return ids
+
+
+@pytest.mark.parametrize(
+    "path, params, max_queries",
+    [
+        ("/api/auth/me", {}, 1),
+        ("/api/students/", {}, 2),
+        ("/api/students/{student_id}", {}, 2),
+        ("/api/students/{student_id}/profile", {}, 6),
+        ("/api/lessons/", {}, 2),
+        ("/api/lessons/calendar", {"start_date": TODAY, "end_date": TODAY + timedelta(days=30)}, 4),
+        ("/api/payments/", {}, 2),
+        ("/api/payments/stats", {}, 2),
+        ("/api/payments/debtors", {}, 2),
+        ("/api/dashboard/summary", {}, 7),
+    ],
+)
+def test_read_endpoint_query_budget(client, auth_headers, student_ids, assert_max_queries, path, params, max_queries):
+    with assert_max_queries(max_queries):
+        response = client.get(path.format(student_id=student_ids[0]), params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+
+def test_budget_exceeded(client, auth_headers, student_ids, assert_max_queries):
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_max_queries(1):
+            client.get("/api/students/", headers=auth_headers)
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { lessonsAPI, studentsAPI, paymentsAPI } from '../services/api';
+import { lessonsAPI, lessonSeriesAPI, studentsAPI, paymentsAPI } from '../services/api';
 import Calendar from '../components/Calendar';
 import { format, startOfMonth, endOfMonth, startOfWeek, endOfWeek, addMinutes } from 'date-fns';
 import { ru } from 'date-fns/locale';
@@ -170,13 +170,39 @@ const CalendarPage = () => {
     setShowModal(true);
   };
 
+  const saveLesson = (params) => {
+    if (selectedLesson?.is_virtual) {
+      // A series occurrence has no row yet: the series endpoint creates it
+      return lessonSeriesAPI.updateOccurrence(selectedLesson.series_id, {
+        original_start: selectedLesson.original_start,
+        datetime_start: formData.datetime_start,
+        datetime_end: formData.datetime_end,
+        amount: formData.amount === '' ? null : formData.amount,
+        notes: formData.notes,
+      });
+    }
+    return selectedLesson
+      ? lessonsAPI.update(selectedLesson.id, formData, params)
+      : lessonsAPI.create(formData, params);
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
-      if (selectedLesson) {
-        await lessonsAPI.update(selectedLesson.id, formData);
-      } else {
-        await lessonsAPI.create(formData);
+      try {
+        await saveLesson();
+      } catch (error) {
+        const conflicts = error.response?.status === 409 ? error.response.data?.detail?.conflicts : null;
+        if (!conflicts) {
+          throw error;
+        }
+        const times = conflicts
+          .map((lesson) => `${format(new Date(lesson.datetime_start), 'd MMMM HH:mm', { locale: ru })}–${format(new Date(lesson.datetime_end), 'HH:mm')}`)
+          .join('\n');
+        if (!confirm(`Занятие пересекается с другими:\n${times}\n\nСохранить всё равно?`)) {
+          return;
+        }
+        await saveLesson({ allow_overlap: true });
       }
       setShowModal(false);
       loadLessonsForMonth(currentMonth);
@@ -189,7 +215,12 @@ const CalendarPage = () => {
     if (!confirm('Удалить занятие?')) return;
 
     try {
-      await lessonsAPI.delete(selectedLesson.id);
+      if (selectedLesson.series_id && selectedLesson.original_start) {
+        // Deleting the row would bring the occurrence back from the series rule
+        await lessonSeriesAPI.cancelOccurrence(selectedLesson.series_id, selectedLesson.original_start);
+      } else {
+        await lessonsAPI.delete(selectedLesson.id);
+      }
       setShowModal(false);
       loadLessonsForMonth(currentMonth);
     } catch (error) {
@@ -236,7 +267,10 @@ const CalendarPage = () => {
     try {
       await paymentsAPI.create({
         student_id: selectedLesson.student_id,
-        lesson_id: selectedLesson.id,
+        // A series occurrence is materialized by the payment; the lesson keeps the same id
+        ...(selectedLesson.is_virtual
+          ? { occurrence: { series_id: selectedLesson.series_id, original_start: selectedLesson.original_start } }
+          : { lesson_id: selectedLesson.id }),
         amount: paymentForm.amount,
         payment_method: paymentForm.payment_method,
         payment_date: paymentForm.payment_date,
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { studentsAPI, lessonsAPI, paymentsAPI } from '../services/api';
-import { format, addDays, startOfWeek, endOfWeek } from 'date-fns';
+import { dashboardAPI } from '../services/api';
+import { format } from 'date-fns';
 import { ru } from 'date-fns/locale';
 import { Users, Calendar, DollarSign, FileText, TrendingUp, AlertCircle } from 'lucide-react';
 
@@ -9,6 +9,7 @@ const Dashboard = () => {
   const [stats, setStats] = useState({
     studentsCount: 0,
     upcomingLessons: [],
+    weekLessonsCount: 0,
     monthlyIncome: 0,
     debtorsCount: 0,
   });
@@ -20,21 +21,14 @@ const Dashboard = () => {
 
   const loadDashboardData = async () => {
     try {
-      const [studentsRes, lessonsRes, statsRes, debtorsRes] = await Promise.all([
-        studentsAPI.getAll(),
-        lessonsAPI.getAll({
-          start_date: format(new Date(), 'yyyy-MM-dd'),
-          end_date: format(addDays(new Date(), 7), 'yyyy-MM-dd'),
-        }),
-        paymentsAPI.getStats(),
-        paymentsAPI.getDebtors(),
-      ]);
+      const { data } = await dashboardAPI.getSummary();
 
       setStats({
-        studentsCount: studentsRes.data.length,
-        upcomingLessons: lessonsRes.data.slice(0, 5),
-        monthlyIncome: parseFloat(statsRes.data.total_amount),
-        debtorsCount: debtorsRes.data.length,
+        studentsCount: data.students_count,
+        upcomingLessons: data.upcoming_lessons,
+        weekLessonsCount: data.week_lessons_count,
+        monthlyIncome: parseFloat(data.monthly_income),
+        debtorsCount: data.debtors_count,
       });
     } catch (error) {
       console.error('Error loading dashboard:', error);
@@ -62,7 +56,7 @@ const Dashboard = () => {
     {
       icon: Calendar,
       label: 'Занятий на неделе',
-      value: stats.upcomingLessons.length,
+      value: stats.weekLessonsCount,
       color: 'bg-green-500',
       link: '/calendar',
     },
@@ -131,25 +131,14 @@ const Payments = () => {
           return;
         }
 
-        const lessonsToPay = lessons.filter((lesson) => selectedLessonIds.includes(lesson.id));
-        const remainingTotal = lessonsToPay.reduce((sum, lesson) => sum + getLessonRemaining(lesson), 0);
-        const useRemaining = remainingTotal > 0 && Math.abs(remainingTotal - totalAmount) < 0.01;
-        const perLessonAmount = useRemaining
-          ? null
-          : Number((totalAmount / lessonsToPay.length).toFixed(2));
-
-        await Promise.all(
-          lessonsToPay.map((lesson) => {
-            const amount = useRemaining ? getLessonRemaining(lesson) : perLessonAmount;
-            return paymentsAPI.create({
-              student_id: formData.student_id,
-              lesson_id: lesson.id,
-              amount,
-              payment_method: formData.payment_method,
-              payment_date: formData.payment_date,
-            });
-          })
-        );
+        // Allocated server-side in one transaction, oldest lesson first
+        await paymentsAPI.allocate({
+          student_id: formData.student_id,
+          lesson_ids: selectedLessonIds,
+          amount: totalAmount,
+          payment_method: formData.payment_method,
+          payment_date: formData.payment_date,
+        });
       } else {
         await paymentsAPI.create(formData);
       }
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { studentsAPI, lessonsAPI, paymentsAPI, homeworkAPI } from '../services/api';
+import { studentsAPI } from '../services/api';
 import { ArrowLeft, Phone, User, BookOpen, MessageSquare, Trash2 } from 'lucide-react';
 import { format } from 'date-fns';
 import { ru } from 'date-fns/locale';
@@ -13,6 +13,8 @@ const StudentDetail = () => {
   const [lessons, setLessons] = useState([]);
   const [payments, setPayments] = useState([]);
   const [homeworks, setHomeworks] = useState([]);
+  const [totals, setTotals] = useState({ lessons: 0, payments: 0, homework: 0 });
+  const [balance, setBalance] = useState(null);
   const [linkCode, setLinkCode] = useState(null);
   const [loading, setLoading] = useState(true);
 
@@ -22,18 +24,17 @@ const StudentDetail = () => {
 
   const loadStudentData = async () => {
     try {
-      const studentRes = await studentsAPI.getById(id);
-      setStudent(studentRes.data);
-
-      const [lessonsRes, paymentsRes, homeworkRes] = await Promise.all([
-        lessonsAPI.getAll({ student_id: id }),
-        paymentsAPI.getAll(),
-        homeworkAPI.getHistory(),
-      ]);
-
-      setLessons(lessonsRes.data.filter((l) => l.student_id === id));
-      setPayments(paymentsRes.data.filter((p) => p.student_id === id));
-      setHomeworks(homeworkRes.data.filter((h) => h.student_id === id));
+      const { data } = await studentsAPI.getProfile(id);
+      setStudent(data.student);
+      setBalance(data.balance);
+      setLessons(data.lessons.items);
+      setPayments(data.payments.items);
+      setHomeworks(data.homework.items);
+      setTotals({
+        lessons: data.lessons.total,
+        payments: data.payments.total,
+        homework: data.homework.total,
+      });
     } catch (error) {
       console.error('Error loading student:', error);
       alert('Ученик не найден');
@@ -43,6 +44,25 @@ const StudentDetail = () => {
     }
   };
 
+  const loadMore = async (section) => {
+    const loaded = { lessons, payments, homework: homeworks }[section];
+    try {
+      const { data } = await studentsAPI.getProfile(id, { [`${section}_offset`]: loaded.length });
+      const setters = { lessons: setLessons, payments: setPayments, homework: setHomeworks };
+      setters[section]((items) => [...items, ...data[section].items]);
+    } catch (error) {
+      alert('Ошибка загрузки: ' + error.message);
+    }
+  };
+
+  const LoadMoreButton = ({ section, loaded }) => (
+    loaded < totals[section] ? (
+      <button onClick={() => loadMore(section)} className="btn btn-secondary w-full mt-4">
+        Показать ещё
+      </button>
+    ) : null
+  );
+
   const handleGenerateLinkCode = async () => {
     try {
       const response = await studentsAPI.generateLinkCode(id);
@@ -73,9 +93,7 @@ const StudentDetail = () => {
     );
   }
 
-  const totalDebt = lessons
-    .filter((l) => l.payment_status !== 'paid')
-    .reduce((sum, l) => sum + parseFloat(l.amount || 0), 0);
+  const totalDebt = parseFloat(balance?.debt || 0);
 
   const tabs = [
     { id: 'info', label: 'Общее' },
@@ -203,7 +221,7 @@ const StudentDetail = () => {
 
         {activeTab === 'lessons' && (
           <div>
-            <h3 className="font-bold mb-4 text-gray-900 dark:text-slate-100">История занятий ({lessons.length})</h3>
+            <h3 className="font-bold mb-4 text-gray-900 dark:text-slate-100">История занятий ({totals.lessons})</h3>
             {lessons.length > 0 ? (
               <div className="space-y-2">
                 {lessons.map((lesson) => (
@@ -228,6 +246,7 @@ const StudentDetail = () => {
                     </div>
                   </div>
                 ))}
+                <LoadMoreButton section="lessons" loaded={lessons.length} />
               </div>
             ) : (
               <div className="text-center text-gray-500 dark:text-slate-500 py-8">Нет занятий</div>
@@ -238,7 +257,7 @@ const StudentDetail = () => {
         {activeTab === 'payments' && (
           <div>
             <div className="flex flex-col sm:flex-row sm:items-center justify-between gap-2 mb-4">
-              <h3 className="font-bold text-gray-900 dark:text-slate-100">Платежи ({payments.length})</h3>
+              <h3 className="font-bold text-gray-900 dark:text-slate-100">Платежи ({totals.payments})</h3>
               {totalDebt > 0 && (
                 <div className="text-red-600 dark:text-red-400 font-bold">Долг: {totalDebt.toFixed(2)} ₽</div>
               )}
@@ -256,6 +275,7 @@ const StudentDetail = () => {
                     <div className="font-bold text-green-600 dark:text-green-400">{payment.amount} ₽</div>
                   </div>
                 ))}
+                <LoadMoreButton section="payments" loaded={payments.length} />
               </div>
             ) : (
               <div className="text-center text-gray-500 dark:text-slate-500 py-8">Нет платежей</div>
@@ -265,7 +285,7 @@ const StudentDetail = () => {
 
         {activeTab === 'homework' && (
           <div>
-            <h3 className="font-bold mb-4 text-gray-900 dark:text-slate-100">Домашние задания ({homeworks.length})</h3>
+            <h3 className="font-bold mb-4 text-gray-900 dark:text-slate-100">Домашние задания ({totals.homework})</h3>
             {homeworks.length > 0 ? (
               <div className="space-y-4">
                 {homeworks.map((hw) => (
@@ -286,6 +306,7 @@ const StudentDetail = () => {
                     )}
                   </div>
                 ))}
+                <LoadMoreButton section="homework" loaded={homeworks.length} />
               </div>
             ) : (
               <div className="text-center text-gray-500 dark:text-slate-500 py-8">Нет заданий</div>
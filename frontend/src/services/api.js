@@ -57,10 +57,17 @@ export const authAPI = {
   refresh: () => api.post('api/auth/refresh'),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  getSummary: () => api.get('api/dashboard/summary'),
+};
+
 // Students API
 export const studentsAPI = {
   getAll: () => api.get('api/students/'),
   getById: (id) => api.get(`api/students/${id}`),
+  // params: limit, lessons_offset, payments_offset, homework_offset
+  getProfile: (id, params) => api.get(`api/students/${id}/profile`, { params }),
   create: (data) => api.post('api/students/', data),
   update: (id, data) => api.put(`api/students/${id}`, data),
   delete: (id) => api.delete(`api/students/${id}`),
@@ -72,15 +79,34 @@ export const lessonsAPI = {
   getAll: (params) => api.get('api/lessons/', { params }),
   getById: (id) => api.get(`api/lessons/${id}`),
   getCalendar: (params) => api.get('api/lessons/calendar', { params }),
-  create: (data) => api.post('api/lessons/', data),
-  update: (id, data) => api.put(`api/lessons/${id}`, data),
+  // params: start_date, end_date, day_start, day_end, min_duration (minutes)
+  getFreeSlots: (params) => api.get('api/lessons/free-slots', { params }),
+  // params.allow_overlap: save even when the tutor already has a lesson at that time (otherwise 409)
+  create: (data, params) => api.post('api/lessons/', data, { params }),
+  update: (id, data, params) => api.put(`api/lessons/${id}`, data, { params }),
   delete: (id) => api.delete(`api/lessons/${id}`),
 };
 
+// Lesson series API
+export const lessonSeriesAPI = {
+  getAll: () => api.get('api/lesson-series/'),
+  getById: (id) => api.get(`api/lesson-series/${id}`),
+  create: (data) => api.post('api/lesson-series/', data),
+  update: (id, data) => api.put(`api/lesson-series/${id}`, data),
+  delete: (id) => api.delete(`api/lesson-series/${id}`),
+  updateOccurrence: (id, data) => api.put(`api/lesson-series/${id}/occurrences`, data),
+  cancelOccurrence: (id, originalStart) => api.delete(`api/lesson-series/${id}/occurrences`, {
+    params: { original_start: originalStart },
+  }),
+};
+
 // Payments API
 export const paymentsAPI = {
   getAll: () => api.get('api/payments/'),
+  // data.lesson_id, or data.occurrence = { series_id, original_start } for a series occurrence
   create: (data) => api.post('api/payments/', data),
+  // One amount over several lessons: { student_id, lesson_ids, occurrences, amount, payment_method, payment_date, order }
+  allocate: (data) => api.post('api/payments/allocate', data),
   getStats: (params) => api.get('api/payments/stats', { params }),
   getDebtors: () => api.get('api/payments/debtors'),
 };
@@ -99,6 +125,19 @@ export const subscriptionAPI = {
   upgrade: (tier) => api.post('api/subscription/upgrade', null, { params: { tier } }),
 };
 
+// Bulk import API (rows: JSON array or CSV string)
+const importRequest = (path, rows) => (
+  typeof rows === 'string'
+    ? api.post(path, rows, { headers: { 'Content-Type': 'text/csv' } })
+    : api.post(path, rows)
+);
+
+export const importAPI = {
+  students: (rows) => importRequest('api/import/students', rows),
+  lessons: (rows) => importRequest('api/import/lessons', rows),
+  payments: (rows) => importRequest('api/import/payments', rows),
+};
+
 // Feature flags API
 export const featuresAPI = {
   get: () => api.get('api/features'),